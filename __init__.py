@@ -1,2 +0,0 @@
-# login_manager = LoginManager()
-# login_manager.login_view = "auth.login" 
\ No newline at end of file
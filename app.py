@@ -1,110 +1,50 @@
 import os
 from flask import Flask, redirect, url_for
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
 from extensions import close_db, get_db
 from datetime import datetime
 
-# Models
-from models.admin_model import create_admin_table, seed_default_admin
-from models.student_model import create_student_table, seed_test_student, ensure_student_profile_columns
-from models.reset_model import create_reset_table
-from models.hostel_model import create_hostel_table, create_room_table, create_bunk_table
-from models.room_swap_model import create_room_swap_table
-from models.cancellation_model import create_cancellation_table
-from models.student_reset_model import create_student_reset_table
-from models.booking_model import create_booking_table, ensure_bunk_booking_columns
-from models.swap_details_model import create_swap_details_table
-from models.rating_model import create_ratings_table
+# Schema migrations
+import migrations
+import sql_profiler
 
 
+# ---------------- APPLICATIONS ----------------
+# The admin and student sides are separate Flask apps. Each one imports only
+# its own route modules (and through them its own models); templates are
+# compiled on first render, so neither side holds the other's in memory.
+# Deployment:
+# - two services:  APP_MODE=admin / APP_MODE=student, each with its own
+#                  WEB_CONCURRENCY (see wsgi.py);
+# - one service:   APP_MODE=all, wsgi.py puts both behind HostDispatcher;
+# - local dev, the flask CLI and benchmarks: create_app(), one app with
+#   every blueprint.
 
-
-# Blueprints
-from routes.auth_routes import auth_bp
-from routes.admin_routes import admin_bp
-from routes.hostel_routes import hostel_bp
-from routes.hostel_api_routes import api as hostel_api_bp
-from routes.room_swap_routes import room_swap_bp
-from routes.cancellation_routes import cancellation_bp
-from routes.dashboard_routes import dashboard_bp
-from routes.student.student_routes import student_bp
-
-
-
-def create_app():
+def _create_base_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    # ---------------- REGISTER BLUEPRINTS ----------------
-    # APP_MODE controls which side gets registered in deployment:
-    # - admin service:   APP_MODE=admin
-    # - student service: APP_MODE=student
-    # - local dev:       APP_MODE=all
-    mode = os.getenv("APP_MODE", "all")  # "admin", "student", or "all"
-
-    # Shared/common blueprints (keep these if both sides need them)
-    # If your auth routes are ADMIN-only, move auth_bp into the admin block.
-    app.register_blueprint(hostel_bp)
-    app.register_blueprint(hostel_api_bp)
-
-    # Register admin side
-    if mode in ("all", "admin"):
-        app.register_blueprint(auth_bp)         # admin login currently here
-        app.register_blueprint(admin_bp)
-        app.register_blueprint(room_swap_bp)
-        app.register_blueprint(cancellation_bp)
-        app.register_blueprint(dashboard_bp)
-
-    # Register student side
-    if mode in ("all", "student"):
-        app.register_blueprint(student_bp)
-
-        # routes for deployment
-    from routes.host_guard import enforce_subdomain_rules
-
-    @app.before_request
-    def _guard_hosts():
-        resp = enforce_subdomain_rules()
-        if resp:
-            return resp
-
-
-    # ---------------- INITIALIZE DATABASE ----------------
-    with app.app_context():
-        create_admin_table()
-        seed_default_admin()
-        create_student_table()
-        ensure_student_profile_columns()  
-        seed_test_student()
-        create_reset_table()
-        create_hostel_table()
-        create_room_table()
-        create_bunk_table()
-        create_room_swap_table()
-        create_cancellation_table()
-        create_student_reset_table()
-        create_booking_table()
-        ensure_bunk_booking_columns()
-        create_swap_details_table()
-        create_ratings_table()
-
-
-        
+    # ---------------- CLIENT ADDRESS ----------------
+    # Behind Render's proxy remote_addr is the proxy; take the client from
+    # the trusted X-Forwarded-For hop (login throttling keys on it).
+    hops = app.config["TRUSTED_PROXY_HOPS"]
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
 
     # ---------------- CLOSE DATABASE ----------------
     @app.teardown_appcontext
     def shutdown_db(exception=None):
         close_db()
 
-    # ---------------- DEFAULT ROUTE ----------------
-    @app.route("/")
-    def home():
-        # For deployment:
-        # - if admin subdomain service, go to admin login
-        # - if student subdomain service, go to student login
-        if mode == "student":
-            return redirect(url_for("student.login_page"))
-        return redirect(url_for("auth.login"))
+    # ---------------- DATABASE SCHEMA ----------------
+    # Only compares schema_version with the newest migration; the DDL itself
+    # runs once per deploy through `flask db upgrade` (or AUTO_MIGRATE in dev).
+    migrations.init_app(app)
+
+    # ---------------- SQL PROFILER ----------------
+    # No-op unless PROFILE_SQL=1
+    sql_profiler.init_app(app)
 
     # Setting Datetime Filter Globally
     @app.template_filter("datetimeformat")
@@ -126,12 +66,119 @@ def create_app():
     return app
 
 
-# CREATE APP INSTANCE
-app = create_app()
+def _register_admin_blueprints(app):
+    from routes.auth_routes import auth_bp
+    from routes.admin_routes import admin_bp
+    from routes.hostel_routes import hostel_bp
+    from routes.hostel_api_routes import api as hostel_api_bp
+    from routes.room_swap_routes import room_swap_bp
+    from routes.cancellation_routes import cancellation_bp
+    from routes.dashboard_routes import dashboard_bp
+
+    app.register_blueprint(hostel_bp)
+    app.register_blueprint(hostel_api_bp)
+    app.register_blueprint(auth_bp)         # admin login currently here
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(room_swap_bp)
+    app.register_blueprint(cancellation_bp)
+    app.register_blueprint(dashboard_bp)
+
+
+def _register_student_blueprints(app):
+    from routes.student.student_routes import student_bp
+
+    app.register_blueprint(student_bp)
+
+
+def create_admin_app():
+    """Hostels, requests, dashboard and admin login; "/" goes to the admin login."""
+    app = _create_base_app()
+    _register_admin_blueprints(app)
+
+    @app.route("/")
+    def home():
+        return redirect(url_for("auth.login"))
+
+    return app
+
+
+def create_student_app():
+    """Everything under /student; "/" goes to the student login."""
+    app = _create_base_app()
+    _register_student_blueprints(app)
+
+    @app.route("/")
+    def home():
+        return redirect(url_for("student.login_page"))
+
+    return app
+
+
+def create_app():
+    """
+    The app for the flask CLI, `python app.py` and the benchmarks: every
+    blueprint (APP_MODE=all, the default) or one side, plus the CLI commands.
+    """
+    from commands import register_commands
+
+    mode = os.getenv("APP_MODE", "all")  # "admin", "student", or "all"
+    if mode == "admin":
+        app = create_admin_app()
+    elif mode == "student":
+        app = create_student_app()
+    else:
+        app = _create_base_app()
+        _register_admin_blueprints(app)
+        _register_student_blueprints(app)
+
+        @app.route("/")
+        def home():
+            return redirect(url_for("auth.login"))
+
+    register_commands(app)
+    return app
+
+
+# ---------------- HOST DISPATCHER ----------------
+
+class HostDispatcher:
+    """
+    WSGI app serving both sides from one process: the Host header picks the
+    admin or student app with one dict lookup. Other hosts (localhost,
+    preview URLs) are split by path: /student... goes to the student app,
+    the rest to the admin app.
+    """
+
+    def __init__(self, admin_app, student_app, admin_host="", student_host=""):
+        self.admin_app = admin_app
+        self.student_app = student_app
+        self.apps_by_host = {}
+        if admin_host:
+            self.apps_by_host[admin_host.lower()] = admin_app
+        if student_host:
+            self.apps_by_host[student_host.lower()] = student_app
+
+    def __call__(self, environ, start_response):
+        host = environ.get("HTTP_HOST", "").partition(":")[0].lower()
+        app = self.apps_by_host.get(host)
+        if app is None:
+            app = self.student_app if environ.get("PATH_INFO", "").startswith("/student") else self.admin_app
+        return app(environ, start_response)
+
+
+def create_host_dispatcher():
+    return HostDispatcher(
+        create_admin_app(), create_student_app(),
+        admin_host=Config.ADMIN_HOST, student_host=Config.STUDENT_HOST,
+    )
+
+
+# The production instances live in wsgi.py (served by gunicorn with
+# gunicorn.conf.py); the flask CLI finds create_app() on its own.
 
 # RUN SERVER
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
 
 
 # For accessing and updating student profile
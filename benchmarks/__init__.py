@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+# Load, stress and micro-benchmark scripts. Run them as modules from the
+# project root, e.g. `python -m benchmarks.booking_stress`.
@@ -0,0 +1,175 @@
+# benchmarks/auto_allocation_bench.py
+"""
+Auto-allocation engine benchmark.
+
+Builds a throwaway database with a campus of single-gender hostels (some
+reserved for one faculty), part of the bunks already taken, and a crowd of
+unallocated students spread over faculties and departments. Then it times
+the preview (load + plan) and the single-transaction commit, and checks
+that every placement respects gender/faculty and no bunk was double-booked.
+
+    python -m benchmarks.auto_allocation_bench --students 20000 --bunks 15000
+
+Exits with status 1 if any invariant is violated.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+FACULTIES = {
+    "Science": ["Computer Science", "Physics", "Chemistry", "Mathematics", "Biology", "Geology"],
+    "Engineering": ["Civil", "Electrical", "Mechanical", "Chemical", "Petroleum"],
+    "Arts": ["English", "History", "Philosophy", "Linguistics", "Music"],
+    "Social Sciences": ["Economics", "Sociology", "Political Science", "Psychology"],
+    "Management": ["Accounting", "Finance", "Marketing", "Business Administration"],
+    "Medicine": ["Medicine", "Nursing", "Pharmacy", "Physiotherapy"],
+}
+
+
+def _setup(args):
+    from app import create_app
+    from extensions import get_db
+    from models.allocation_model import book_bunks, BOOKING
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    with app.app_context():
+        db = get_db()
+
+        # hostels: alternate genders with every fifth one mixed, every third
+        # one reserved for a faculty
+        faculties = list(FACULTIES)
+        hostels = []
+        for n in range(args.hostels):
+            faculty = faculties[(n // 3) % len(faculties)] if n % 3 == 0 else None
+            gender = "mixed" if n % 5 == 4 else ("male" if n % 2 == 0 else "female")
+            hostels.append((f"Hall {n + 1}", gender, faculty))
+        db.executemany("INSERT INTO hostels (name, gender, faculty, created_at) VALUES (?, ?, ?, 0)", hostels)
+        hostel_ids = [r[0] for r in db.execute("SELECT id FROM hostels ORDER BY id")]
+
+        rooms_needed = (args.bunks + 3) // 4
+        db.executemany(
+            "INSERT INTO rooms (hostel_id, room_number, capacity) VALUES (?, ?, 4)",
+            [(hostel_ids[n % len(hostel_ids)], f"R{n + 1:05d}") for n in range(rooms_needed)]
+        )
+        room_ids = [r[0] for r in db.execute("SELECT id FROM rooms ORDER BY id")]
+        db.executemany(
+            "INSERT INTO bunks (room_id, bunk_label) VALUES (?, ?)",
+            [(room_ids[i // 4], "ABCD"[i % 4]) for i in range(args.bunks)]
+        )
+
+        departments = [(f, d) for f, ds in FACULTIES.items() for d in ds]
+        students = []
+        for i in range(args.students):
+            faculty, department = rng.choice(departments)
+            students.append((
+                f"auto{i:06d}", f"Auto {i}", f"auto{i}@example.test",
+                rng.choice(("male", "female")), faculty, department,
+            ))
+        db.executemany(
+            "INSERT INTO students (matric_no, full_name, email, password, gender, faculty, department) "
+            "VALUES (?, ?, ?, 'x', ?, ?, ?)",
+            students
+        )
+
+        # a share of bunks is already booked by students who booked themselves
+        booked = int(args.bunks * args.prebooked)
+        takers = [r[0] for r in db.execute(
+            "SELECT id FROM students WHERE matric_no LIKE 'auto%' ORDER BY RANDOM() LIMIT ?", (booked,)
+        )]
+        bunks = [tuple(r) for r in db.execute("SELECT id FROM bunks ORDER BY RANDOM() LIMIT ?", (booked,))]
+        book_bunks(db, [(s, b[0], None) for s, b in zip(takers, bunks)], BOOKING)
+        db.commit()
+    return app
+
+
+def _verify(app, after_booking_id):
+    from extensions import get_db
+    from models.hostel_model import recount_occupancy
+    from models.allocation_model import rebuild_current_allocations
+
+    with app.app_context():
+        db = get_db()
+        problems = []
+        wrong = db.execute("""
+            SELECT COUNT(*) FROM bookings b
+            JOIN students s ON s.id = b.student_id
+            JOIN hostels h ON h.id = b.hostel_id
+            WHERE b.status = 'active' AND b.id > ?
+              AND ((LOWER(h.gender) NOT IN ('mixed', 'all', 'any')
+                    AND LOWER(h.gender) != LOWER(COALESCE(s.gender, '')))
+                   OR (h.faculty IS NOT NULL AND h.faculty != COALESCE(s.faculty, '')))
+        """, (after_booking_id,)).fetchone()[0]
+        if wrong:
+            problems.append(f"{wrong} booking(s) break a gender/faculty rule")
+        mismatched = db.execute("""
+            SELECT COUNT(*) FROM bookings b
+            JOIN bunks k ON k.id = b.bunk_id
+            WHERE b.status = 'active' AND (k.occupied != 1 OR k.occupied_by != b.student_id)
+        """).fetchone()[0]
+        if mismatched:
+            problems.append(f"{mismatched} active booking(s) disagree with bunks")
+        doubled = db.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT student_id FROM bookings WHERE status = 'active' GROUP BY student_id HAVING COUNT(*) > 1
+            )
+        """).fetchone()[0]
+        if doubled:
+            problems.append(f"{doubled} student(s) have more than one active booking")
+        drift = recount_occupancy(fix=False)
+        if drift:
+            problems.append(f"{len(drift)} occupancy counter(s) drifted")
+        stale_rows = rebuild_current_allocations(fix=False)
+        if stale_rows:
+            problems.append(f"{len(stale_rows)} current_allocations row(s) disagree with bookings")
+        return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--bunks", type=int, default=15000)
+    parser.add_argument("--hostels", type=int, default=30)
+    parser.add_argument("--prebooked", type=float, default=0.2, help="Share of bunks booked before the run.")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--json", action="store_true", help="Print only the JSON result.")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="hostel-alloc-")
+    os.environ["DATABASE_PATH"] = os.path.join(workdir, "alloc.db")
+    os.environ["AUTO_MIGRATE"] = "1"
+
+    from extensions import get_db
+    from models.auto_allocation_model import preview_allocation, commit_allocation
+
+    app = _setup(args)
+    with app.app_context():
+        last_booking = get_db().execute("SELECT COALESCE(MAX(id), 0) FROM bookings").fetchone()[0]
+        started = time.perf_counter()
+        preview = preview_allocation()
+        previewed = time.perf_counter()
+        written = commit_allocation(preview["assignments"])
+        done = time.perf_counter()
+
+    report = {
+        "students_waiting": preview["students_waiting"],
+        "free_bunks": preview["free_bunks"],
+        "placed": written,
+        "unplaced": preview["unplaced"],
+        "department_cohesion": preview["department_cohesion"],
+        "load_ms": preview["load_ms"],
+        "plan_ms": preview["plan_ms"],
+        "preview_ms": round((previewed - started) * 1000, 2),
+        "commit_ms": round((done - previewed) * 1000, 2),
+        "problems": _verify(app, last_booking),
+    }
+    print(json.dumps(report, indent=None if args.json else 2))
+    return 1 if report["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
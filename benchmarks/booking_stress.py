@@ -0,0 +1,212 @@
+# benchmarks/booking_stress.py
+"""
+Booking contention stress test.
+
+Spawns several worker processes (like gunicorn workers), each running many
+threads of students racing for the same small set of bunks through
+models.booking_model.reserve_bunk, then checks the database for
+double-allocations. Uses a throwaway database file; never the real one.
+
+    python -m benchmarks.booking_stress --students 400 --bunks 60 --workers 4 --threads 16
+
+Exits with status 1 if any invariant is violated.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+def _setup(args):
+    from app import create_app
+    from extensions import get_db, dispose_pools
+
+    app = create_app()
+    with app.app_context():
+        db = get_db()
+        db.execute("INSERT INTO hostels (name, gender, created_at) VALUES ('Stress Hall', 'male', 0)")
+        hostel_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        rooms = (args.bunks + 3) // 4
+        for n in range(rooms):
+            db.execute(
+                "INSERT INTO rooms (hostel_id, room_number, capacity) VALUES (?, ?, 4)",
+                (hostel_id, f"S{n + 1:03d}")
+            )
+        room_ids = [r[0] for r in db.execute("SELECT id FROM rooms WHERE hostel_id = ?", (hostel_id,))]
+
+        bunks = []
+        for i in range(args.bunks):
+            bunks.append((room_ids[i // 4], "ABCD"[i % 4]))
+        db.executemany("INSERT INTO bunks (room_id, bunk_label) VALUES (?, ?)", bunks)
+
+        db.executemany(
+            "INSERT INTO students (matric_no, full_name, email, password) VALUES (?, ?, ?, 'x')",
+            [(f"stress{i:05d}", f"Stress {i}", f"stress{i}@example.test") for i in range(args.students)]
+        )
+        db.commit()
+
+        student_ids = [r[0] for r in db.execute("SELECT id FROM students WHERE matric_no LIKE 'stress%'")]
+        targets = [tuple(r) for r in db.execute("""
+            SELECT k.id, k.room_id FROM bunks k JOIN rooms r ON r.id = k.room_id WHERE r.hostel_id = ?
+        """, (hostel_id,))]
+
+    dispose_pools()   # nothing pooled may cross the fork
+    return hostel_id, student_ids, targets
+
+
+def _worker(worker_no, hostel_id, students, targets, threads, queue):
+    from app import create_app
+    from models.booking_model import reserve_bunk, BOOKED, TAKEN
+    from extensions import get_pool
+
+    app = create_app()
+    outcomes = Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    def run(chunk):
+        rng = random.Random(worker_no * 1000 + len(chunk))
+        for student_id in chunk:
+            # every student submits twice in a row to exercise "already booked"
+            for _ in range(2):
+                candidates = targets[:]
+                rng.shuffle(candidates)
+                for bunk_id, room_id in candidates:
+                    start = time.perf_counter()
+                    with app.app_context():
+                        outcome = reserve_bunk(student_id, hostel_id, room_id, bunk_id)
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+                        outcomes[outcome.status] += 1
+                    if outcome.status != TAKEN:
+                        break
+
+    chunks = [students[i::threads] for i in range(threads)]
+    pool = [threading.Thread(target=run, args=(chunk,)) for chunk in chunks]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    with app.app_context():
+        busy = get_pool().stats()["busy_retries"]
+    queue.put({"outcomes": dict(outcomes), "latencies": latencies, "busy_retries": busy})
+
+
+def _verify():
+    from app import create_app
+    from extensions import get_db
+
+    app = create_app()
+    with app.app_context():
+        db = get_db()
+        problems = []
+
+        dup_bunks = db.execute("""
+            SELECT bunk_id, COUNT(*) AS c FROM bookings WHERE status = 'active'
+            GROUP BY bunk_id HAVING c > 1
+        """).fetchall()
+        if dup_bunks:
+            problems.append(f"{len(dup_bunks)} bunk(s) with more than one active booking")
+
+        dup_students = db.execute("""
+            SELECT student_id, COUNT(*) AS c FROM bookings WHERE status = 'active'
+            GROUP BY student_id HAVING c > 1
+        """).fetchall()
+        if dup_students:
+            problems.append(f"{len(dup_students)} student(s) with more than one active booking")
+
+        mismatched = db.execute("""
+            SELECT COUNT(*) FROM bookings b
+            JOIN bunks k ON k.id = b.bunk_id
+            WHERE b.status = 'active' AND (k.occupied != 1 OR k.occupied_by != b.student_id)
+        """).fetchone()[0]
+        if mismatched:
+            problems.append(f"{mismatched} active booking(s) disagree with bunks.occupied_by")
+
+        occupied = db.execute("SELECT COUNT(*) FROM bunks WHERE occupied = 1").fetchone()[0]
+        active = db.execute("SELECT COUNT(*) FROM bookings WHERE status = 'active'").fetchone()[0]
+        if occupied != active:
+            problems.append(f"{occupied} occupied bunks but {active} active bookings")
+
+        allocated = db.execute("SELECT COUNT(*) FROM current_allocations").fetchone()[0]
+        if allocated != active:
+            problems.append(f"{allocated} current_allocations row(s) but {active} active bookings")
+
+        return {"occupied_bunks": occupied, "active_bookings": active, "problems": problems}
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=400)
+    parser.add_argument("--bunks", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--json", action="store_true", help="Print only the JSON result.")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="hostel-stress-")
+    os.environ["DATABASE_PATH"] = os.path.join(workdir, "stress.db")
+    os.environ["AUTO_MIGRATE"] = "1"
+
+    hostel_id, student_ids, targets = _setup(args)
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    shares = [student_ids[i::args.workers] for i in range(args.workers)]
+
+    started = time.perf_counter()
+    procs = [
+        ctx.Process(target=_worker, args=(n, hostel_id, share, targets, args.threads, queue))
+        for n, share in enumerate(shares)
+    ]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    outcomes = Counter()
+    latencies = []
+    for r in results:
+        outcomes.update(r["outcomes"])
+        latencies.extend(r["latencies"])
+
+    report = {
+        "students": args.students,
+        "bunks": args.bunks,
+        "workers": args.workers,
+        "threads_per_worker": args.threads,
+        "elapsed_s": round(elapsed, 3),
+        "attempts": sum(outcomes.values()),
+        "outcomes": dict(outcomes),
+        "busy_retries": sum(r["busy_retries"] for r in results),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 2),
+            "p95": round(_percentile(latencies, 95) * 1000, 2),
+            "p99": round(_percentile(latencies, 99) * 1000, 2),
+        },
+    }
+    report.update(_verify())
+
+    print(json.dumps(report, indent=None if args.json else 2))
+    return 1 if report["problems"] or report["active_bookings"] != min(args.students, args.bunks) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,667 @@
+# benchmarks/http_load.py
+"""
+HTTP load test: a booking-day rush against the real routes.
+
+Seeds a throwaway database, then replays scripted journeys over HTTP:
+
+  students  login -> book-hostel page -> rooms API -> bunks API
+            -> POST booking (retrying on "taken") -> dashboard
+  admins    work the room-swap and cancellation queues concurrently
+            (list page, then bulk JSON approve/reject in batches)
+
+By default the app runs in-process behind the Flask test client, in
+--workers forked processes (like gunicorn workers) of --threads threads:
+
+    python -m benchmarks.http_load --students 200 --bunks 150 --workers 2 --threads 8
+
+Run it as a module from the repository root, as above: started as a file
+(python benchmarks/http_load.py) it cannot import the app and fails with
+"ModuleNotFoundError: No module named 'app'".
+
+Students log in the way they do on campus: all behind one NAT address
+(--source-ips 1) and a share of them mistyping their password first
+(--typo-share), so the login throttle sees one busy IP. A valid login that
+gets throttled counts as a problem.
+
+Against a running server, point --database at the file the server uses
+(it is seeded on first run) and pass --url. With --source-ips > 1 the
+addresses are sent as X-Forwarded-For (the server must trust one proxy
+hop, TRUSTED_PROXY_HOPS=1, which gunicorn.conf.py sets). If the server
+hashes passwords slowly, relax login throttling:
+
+    DATABASE_PATH=/tmp/rush.db LOGIN_THROTTLE_ENABLED=0 WEB_CONCURRENCY=4 GUNICORN_THREADS=4 \\
+        gunicorn -c gunicorn.conf.py wsgi:app
+    python -m benchmarks.http_load --url http://127.0.0.1:8000 --database /tmp/rush.db
+
+Reports throughput, p50/p95/p99 latency per endpoint, booking outcomes and
+conflict rate, SQLITE_BUSY retries and admin decision outcomes as JSON
+(--out writes it to a file for comparing commits). Exits with status 1 on
+5xx responses or when bunks, bookings and current_allocations disagree.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from http.cookiejar import CookieJar
+
+PASSWORD = "load-test-pass"
+ADMIN_EMAIL = "load-admin@example.test"
+
+LOGIN = "POST /student/login"
+BOOK_PAGE = "GET /student/book-hostel"
+ROOMS_API = "GET /student/api/rooms/<hostel_id>"
+BUNKS_API = "GET /student/api/bunks/<room_id>"
+BOOK_SUBMIT = "POST /student/book-hostel"
+DASHBOARD = "GET /student/dashboard"
+ADMIN_LOGIN = "POST /login"
+SWAP_LIST = "GET /admin/room-swap-requests"
+SWAP_DECIDE = "POST /admin/room-swap-requests"
+CANCEL_LIST = "GET /admin/cancellation-requests"
+CANCEL_DECIDE = "POST /admin/cancellation-requests"
+
+
+# ---------- SETUP ----------
+
+def _setup(args):
+    """Seeds hostels, bunks, rush students and the admin queues unless already there."""
+    from app import create_app
+    from extensions import get_db, dispose_pools
+    from passwords import password_hasher_for_bulk
+    from models.allocation_model import book_bunks, BOOKING
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    with app.app_context():
+        db = get_db()
+        if db.execute("SELECT 1 FROM students WHERE matric_no LIKE 'load%' LIMIT 1").fetchone():
+            dispose_pools()
+            return
+
+        # one hash for everyone, with the configured method so logins never rehash
+        hashed = password_hasher_for_bulk(app.config)(PASSWORD)
+        db.execute(
+            "INSERT INTO admins (first_name, last_name, nickname, email, password) VALUES ('Load', 'Admin', 'Load Admin', ?, ?)",
+            (ADMIN_EMAIL, hashed)
+        )
+
+        db.executemany(
+            "INSERT INTO hostels (name, gender, created_at) VALUES (?, 'male', 0)",
+            [(f"Load Hall {n + 1}",) for n in range(args.hostels)]
+        )
+        hostel_ids = [r[0] for r in db.execute("SELECT id FROM hostels WHERE name LIKE 'Load Hall %' ORDER BY id")]
+
+        housed = args.swap_requests + args.cancellations
+        bunk_total = args.bunks + housed
+        rooms_needed = (bunk_total + 3) // 4
+        db.executemany(
+            "INSERT INTO rooms (hostel_id, room_number, capacity) VALUES (?, ?, 4)",
+            [(hostel_ids[n % len(hostel_ids)], f"L{n + 1:04d}") for n in range(rooms_needed)]
+        )
+        room_ids = [r[0] for r in db.execute(
+            "SELECT id FROM rooms WHERE hostel_id IN (SELECT value FROM json_each(?)) ORDER BY id",
+            (json.dumps(hostel_ids),)
+        )]
+        db.executemany(
+            "INSERT INTO bunks (room_id, bunk_label) VALUES (?, ?)",
+            [(room_ids[i // 4], "ABCD"[i % 4]) for i in range(bunk_total)]
+        )
+
+        db.executemany(
+            "INSERT INTO students (matric_no, full_name, email, password) VALUES (?, ?, ?, ?)",
+            [(f"load{i:05d}", f"Load {i}", f"load{i}@example.test", hashed) for i in range(args.students + housed)]
+        )
+        students = [r[0] for r in db.execute("SELECT id FROM students WHERE matric_no LIKE 'load%' ORDER BY id")]
+
+        # students already housed before the rush; they fill the admin queues
+        bunks = [r[0] for r in db.execute(
+            "SELECT k.id FROM bunks k WHERE k.room_id IN (SELECT value FROM json_each(?)) ORDER BY k.id",
+            (json.dumps(room_ids),)
+        )]
+        rng.shuffle(bunks)
+        residents = students[args.students:]
+        book_bunks(db, [(s, b, None) for s, b in zip(residents, bunks)], BOOKING)
+
+        rooms_of = {r["student_id"]: r["room_id"] for r in db.execute(
+            "SELECT student_id, room_id FROM current_allocations WHERE student_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(residents),)
+        )}
+        bunk_rooms = dict(db.execute("SELECT id, room_id FROM bunks WHERE room_id IN (SELECT value FROM json_each(?))",
+                                     (json.dumps(room_ids),)).fetchall())
+
+        swappers = residents[:args.swap_requests]
+        wanted = {}
+        for s in swappers:
+            bunk = rng.choice(bunks)
+            while bunk_rooms[bunk] == rooms_of[s]:
+                bunk = rng.choice(bunks)
+            wanted[s] = bunk
+        db.executemany(
+            "INSERT INTO room_swap_requests (student_id, current_room_id, requested_room_id, status) VALUES (?, ?, ?, 'pending')",
+            [(s, rooms_of[s], bunk_rooms[wanted[s]]) for s in swappers]
+        )
+        db.executemany(
+            "INSERT INTO room_swap_details (swap_request_id, requested_bunk_id) "
+            "SELECT id, ? FROM room_swap_requests WHERE student_id = ? AND status = 'pending'",
+            [(wanted[s], s) for s in swappers]
+        )
+        db.executemany(
+            "INSERT INTO cancellation_requests (student_id, room_id, status) VALUES (?, ?, 'pending')",
+            [(s, rooms_of[s]) for s in residents[args.swap_requests:]]
+        )
+        db.commit()
+
+    dispose_pools()   # nothing pooled may cross the fork
+
+
+def _load_plan(args):
+    """Reads back what the run needs, so a seeded server database can be reused."""
+    import sqlite3
+
+    conn = sqlite3.connect(args.database)
+    try:
+        hostels = [r[0] for r in conn.execute("SELECT id FROM hostels WHERE name LIKE 'Load Hall %' ORDER BY id")]
+        matrics = [r[0] for r in conn.execute("""
+            SELECT s.matric_no FROM students s
+            WHERE s.matric_no LIKE 'load%'
+              AND NOT EXISTS (SELECT 1 FROM bookings b WHERE b.student_id = s.id AND b.status = 'active')
+            ORDER BY s.id LIMIT ?
+        """, (args.students,))]
+        swaps = [r[0] for r in conn.execute("SELECT id FROM room_swap_requests WHERE status = 'pending' ORDER BY id")]
+        cancels = [r[0] for r in conn.execute("SELECT id FROM cancellation_requests WHERE status = 'pending' ORDER BY id")]
+        last_booking = conn.execute("SELECT COALESCE(MAX(id), 0) FROM bookings").fetchone()[0]
+    finally:
+        conn.close()
+    return {"hostels": hostels, "matrics": matrics, "swaps": swaps, "cancels": cancels, "last_booking": last_booking}
+
+
+# ---------- CLIENTS ----------
+
+class _TestClient:
+    """In-process client; each virtual user gets its own cookie jar."""
+
+    def __init__(self, app, remote_addr):
+        self._client = app.test_client()
+        self._environ = {"REMOTE_ADDR": remote_addr}
+
+    def request(self, method, path, form=None, json_body=None):
+        resp = self._client.open(path, method=method, data=form, json=json_body, environ_base=self._environ)
+        return resp.status_code, resp.headers, resp.get_data()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class _UrlClient:
+    """Real HTTP client (stdlib only); redirects are returned, not followed."""
+
+    def __init__(self, base_url, timeout, forwarded_for=None):
+        self._base = base_url.rstrip("/")
+        self._timeout = timeout
+        self._forwarded_for = forwarded_for
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, method, path, form=None, json_body=None):
+        data, headers = None, {}
+        if self._forwarded_for:
+            headers["X-Forwarded-For"] = self._forwarded_for
+        if form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(self._base + path, data=data, headers=headers, method=method)
+        try:
+            with self._opener.open(req, timeout=self._timeout) as resp:
+                return resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+
+# ---------- RECORDING ----------
+
+class _Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def call(self, client, label, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            status, headers, body = client.request(method, path, **kwargs)
+        except OSError as e:   # connection refused/reset, timeouts
+            status, headers, body = 0, {}, str(e).encode()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[label].append(elapsed)
+            self.statuses[label][status] += 1
+        return status, headers, body
+
+    def count(self, key, n=1):
+        with self._lock:
+            self.counters[key] += n
+
+    def dump(self):
+        return {
+            "latencies": dict(self.latencies),
+            "statuses": {k: dict(v) for k, v in self.statuses.items()},
+            "counters": dict(self.counters),
+        }
+
+
+def _retry_after(headers):
+    value = headers.get("Retry-After") if headers else None
+    return int(value) if value and str(value).isdigit() else None
+
+
+# ---------- JOURNEYS ----------
+
+def _admitted(rec, client, label, path, args):
+    """GETs a booking page/API, waiting in the booking queue while it says so."""
+    deadline = time.monotonic() + args.queue_timeout
+    while True:
+        status, headers, body = rec.call(client, label, "GET", path)
+        wait = _retry_after(headers)
+        if wait is None or status not in (200, 429):
+            return status, body
+        rec.count("queued_responses")
+        if time.monotonic() > deadline:
+            return 429, body
+        time.sleep(min(wait, args.queue_poll))
+
+
+def _student_journey(rec, client, matric, hostels, rng, args):
+    from models.booking_model import BOOKING_MESSAGES
+
+    if rng.random() < args.typo_share:
+        status, _, _ = rec.call(client, LOGIN, "POST", "/student/login",
+                                form={"matric_no": matric, "password": PASSWORD + "x"})
+        rec.count("login_typos")
+        if status == 429:
+            rec.count("typo_throttled")
+
+    status, headers, _ = rec.call(client, LOGIN, "POST", "/student/login",
+                                  form={"matric_no": matric, "password": PASSWORD})
+    location = headers.get("Location", "") if headers else ""
+    if status != 302 or "/student/dashboard" not in location:
+        rec.count({429: "login_throttled", 503: "login_shed"}.get(status, "login_failed"))
+        return
+
+    status, _ = _admitted(rec, client, BOOK_PAGE, "/student/book-hostel", args)
+    if status != 200:
+        rec.count("gave_up_in_queue" if status == 429 else "journey_errors")
+        return
+
+    outcome = None
+    for _ in range(args.max_attempts):
+        order = hostels[:]
+        rng.shuffle(order)
+        room = None
+        for hostel_id in order:
+            status, body = _admitted(rec, client, ROOMS_API, f"/student/api/rooms/{hostel_id}", args)
+            if status != 200:
+                break
+            free = [r for r in json.loads(body) if r["free_bunks"]]
+            if free:
+                room = rng.choice(free)
+                break
+        if room is None:
+            outcome = "sold_out" if status == 200 else "api_error"
+            break
+
+        status, body = _admitted(rec, client, BUNKS_API, f"/student/api/bunks/{room['id']}", args)
+        bunks = json.loads(body) if status == 200 else []
+        if not bunks:
+            rec.count("stale_room_listings")
+            continue
+        bunk = rng.choice(bunks)
+
+        status, _, _ = rec.call(client, BOOK_SUBMIT, "POST", "/student/book-hostel", form={
+            "hostel_id": hostel_id, "room_id": room["id"], "bunk_id": bunk["id"],
+        })
+        rec.count("booking_posts")
+        if status != 302:
+            outcome = "error"
+            break
+        # the outcome is the flash message on the page the browser is sent back to
+        _, body = _admitted(rec, client, BOOK_PAGE, "/student/book-hostel", args)
+        text = body.decode("utf-8", "replace")
+        outcome = next((key for key, msg in BOOKING_MESSAGES.items() if msg in text), "unknown")
+        if outcome != "taken":
+            break
+        rec.count("booking_taken")
+
+    rec.count(f"outcome_{outcome or 'gave_up'}")
+    rec.call(client, DASHBOARD, "GET", "/student/dashboard")
+
+
+def _admin_session(rec, client):
+    status, _, _ = rec.call(client, ADMIN_LOGIN, "POST", "/login",
+                            form={"email": ADMIN_EMAIL, "password": PASSWORD})
+    return status == 302
+
+
+def _admin_worker(rec, client, batches, rng, args):
+    """Works through every batch in its own order; batches another admin already decided come back skipped."""
+    if not _admin_session(rec, client):
+        rec.count("admin_login_failed")
+        return
+    batches = batches[:]
+    rng.shuffle(batches)
+    for kind, ids in batches:
+        list_label, decide_label, path = (
+            (SWAP_LIST, SWAP_DECIDE, "/admin/room-swap-requests") if kind == "swap"
+            else (CANCEL_LIST, CANCEL_DECIDE, "/admin/cancellation-requests")
+        )
+        rec.call(client, list_label, "GET", path)
+        action = "reject" if rng.random() < args.reject_share else "approve"
+        status, _, body = rec.call(client, decide_label, "POST", path,
+                                   json_body={"action": action, "request_ids": ids})
+        if status == 200:
+            for o in json.loads(body):
+                rec.count(f"{kind}_{o['status']}")
+        else:
+            rec.count(f"{kind}_batch_errors")
+
+
+# ---------- PROCESSES ----------
+
+def _source_ip(args, n):
+    n %= args.source_ips
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255 or 1}"
+
+
+def _make_client_factory(args):
+    """Clients for user n; users share args.source_ips addresses (1 = one campus NAT)."""
+    if args.url:
+        return lambda n: _UrlClient(args.url, args.timeout,
+                                    _source_ip(args, n) if args.source_ips > 1 else None)
+
+    from app import create_app
+    app = create_app()
+    return lambda n: _TestClient(app, _source_ip(args, n))
+
+
+def _finish_process(args):
+    """Busy retries seen by this process' pool; stops its hashing pool so the process can exit."""
+    if args.url:
+        return 0
+    from extensions import get_pool_stats
+    from passwords import shutdown_hashers
+    shutdown_hashers(wait=True)
+    return sum(s["busy_retries"] for s in get_pool_stats())
+
+
+def _student_process(worker_no, matrics, hostels, args, queue):
+    rec = _Recorder()
+    make_client = _make_client_factory(args)
+
+    def run(thread_no, share):
+        rng = random.Random(args.seed * 7919 + worker_no * 101 + thread_no)
+        for matric in share:
+            user_no = int(matric[4:]) + 1
+            _student_journey(rec, make_client(user_no), matric, hostels, rng, args)
+
+    shares = [matrics[i::args.threads] for i in range(args.threads)]
+    threads = [threading.Thread(target=run, args=(i, share)) for i, share in enumerate(shares)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    result = rec.dump()
+    result["busy_retries"] = _finish_process(args)
+    queue.put(result)
+
+
+def _admin_process(batches, args, queue):
+    rec = _Recorder()
+    make_client = _make_client_factory(args)
+
+    threads = [
+        threading.Thread(target=_admin_worker,
+                         args=(rec, make_client(200000 + i), batches, random.Random(args.seed + i), args))
+        for i in range(args.admins)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    result = rec.dump()
+    result["busy_retries"] = _finish_process(args)
+    queue.put(result)
+
+
+def _server_busy_retries(args, samples):
+    """Under gunicorn each worker has its own pool: sample /admin/_health until every worker answered."""
+    rec = _Recorder()
+    client = _UrlClient(args.url, args.timeout)
+    if not _admin_session(rec, client):
+        return {}
+    seen = {}
+    for _ in range(samples):
+        status, _, body = client.request("GET", "/admin/_health")
+        if status == 200:
+            pool = json.loads(body)["db_pool"]
+            seen[pool["pid"]] = max(seen.get(pool["pid"], 0), pool["busy_retries"])
+    return seen
+
+
+# ---------- REPORT ----------
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def _endpoint_report(latencies, statuses, elapsed):
+    report = {}
+    for label in sorted(latencies):
+        values = latencies[label]
+        report[label] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(_percentile(values, 50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 99) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+            "statuses": {str(k): v for k, v in sorted(statuses[label].items())},
+        }
+    return report
+
+
+def _verify(args, last_booking):
+    from app import create_app
+    from extensions import get_db
+    from models.hostel_model import recount_occupancy
+    from models.allocation_model import rebuild_current_allocations
+
+    app = create_app()
+    with app.app_context():
+        db = get_db()
+        problems = []
+        doubled = db.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT bunk_id FROM bookings WHERE status = 'active' GROUP BY bunk_id HAVING COUNT(*) > 1
+            )
+        """).fetchone()[0]
+        if doubled:
+            problems.append(f"{doubled} bunk(s) with more than one active booking")
+        mismatched = db.execute("""
+            SELECT COUNT(*) FROM bookings b
+            JOIN bunks k ON k.id = b.bunk_id
+            WHERE b.status = 'active' AND (k.occupied != 1 OR k.occupied_by != b.student_id)
+        """).fetchone()[0]
+        if mismatched:
+            problems.append(f"{mismatched} active booking(s) disagree with bunks.occupied_by")
+        drift = recount_occupancy(fix=False)
+        if drift:
+            problems.append(f"{len(drift)} occupancy counter(s) drifted")
+        stale_rows = rebuild_current_allocations(fix=False)
+        if stale_rows:
+            problems.append(f"{len(stale_rows)} current_allocations row(s) disagree with bookings")
+        new_bookings = db.execute(
+            "SELECT COUNT(*) FROM bookings WHERE id > ? AND status = 'active'", (last_booking,)
+        ).fetchone()[0]
+    return new_bookings, problems
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process test client).")
+    parser.add_argument("--database", help="Database file (required with --url; default: a temp file).")
+    parser.add_argument("--students", type=int, default=200, help="Students in the booking rush.")
+    parser.add_argument("--bunks", type=int, default=150, help="Free bunks at the start of the rush.")
+    parser.add_argument("--hostels", type=int, default=4)
+    parser.add_argument("--swap-requests", type=int, default=40, help="Pending swap requests for the admins.")
+    parser.add_argument("--cancellations", type=int, default=40, help="Pending cancellation requests for the admins.")
+    parser.add_argument("--workers", type=int, default=2, help="Client processes for the student journeys.")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent students per process.")
+    parser.add_argument("--admins", type=int, default=2, help="Concurrent admins working the queues.")
+    parser.add_argument("--batch", type=int, default=10, help="Requests decided per admin POST.")
+    parser.add_argument("--reject-share", type=float, default=0.2)
+    parser.add_argument("--max-attempts", type=int, default=5, help="Booking tries per student after 'taken'.")
+    parser.add_argument("--queue-timeout", type=float, default=120, help="Seconds a student waits in the booking queue.")
+    parser.add_argument("--queue-poll", type=float, default=1.0, help="Longest sleep between queue polls.")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout with --url.")
+    parser.add_argument("--source-ips", type=int, default=1, help="Client addresses (1 = everyone behind one NAT).")
+    parser.add_argument("--typo-share", type=float, default=0.3, help="Students who mistype their password first.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Also write the JSON result to this file.")
+    parser.add_argument("--json", action="store_true", help="Print only the JSON result.")
+    args = parser.parse_args(argv)
+
+    if args.source_ips < 1:
+        parser.error("--source-ips must be at least 1")
+    if args.url and not args.database:
+        parser.error("--url needs --database (the file the server uses) for seeding and checks")
+    args.database = args.database or os.path.join(tempfile.mkdtemp(prefix="hostel-http-"), "http.db")
+    os.environ["DATABASE_PATH"] = os.path.abspath(args.database)
+    os.environ["AUTO_MIGRATE"] = "1"
+
+    _setup(args)
+    plan = _load_plan(args)
+    if not plan["matrics"]:
+        parser.error("no unhoused load-test students left in this database; start from a fresh file")
+
+    ids = [("swap", plan["swaps"][i:i + args.batch]) for i in range(0, len(plan["swaps"]), args.batch)]
+    ids += [("cancel", plan["cancels"][i:i + args.batch]) for i in range(0, len(plan["cancels"]), args.batch)]
+
+    busy_before = _server_busy_retries(args, args.workers * 8) if args.url else {}
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=_student_process, args=(n, plan["matrics"][n::args.workers], plan["hostels"], args, queue))
+        for n in range(args.workers)
+    ]
+    if ids and args.admins:
+        procs.append(ctx.Process(target=_admin_process, args=(ids, args, queue)))
+
+    started = time.perf_counter()
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    latencies, statuses, counters = defaultdict(list), defaultdict(Counter), Counter()
+    busy_retries = 0
+    for r in results:
+        for label, values in r["latencies"].items():
+            latencies[label].extend(values)
+        for label, codes in r["statuses"].items():
+            statuses[label].update(codes)
+        counters.update(r["counters"])
+        busy_retries += r["busy_retries"]
+    if args.url:
+        busy_after = _server_busy_retries(args, args.workers * 8)
+        busy_retries = sum(n - busy_before.get(pid, 0) for pid, n in busy_after.items())
+
+    total_requests = sum(len(v) for v in latencies.values())
+    server_errors = sum(n for codes in statuses.values() for code, n in codes.items() if code >= 500 or code == 0)
+    posts = counters["booking_posts"]
+    outcomes = {k[len("outcome_"):]: v for k, v in sorted(counters.items()) if k.startswith("outcome_")}
+    new_bookings, problems = _verify(args, plan["last_booking"])
+    if server_errors:
+        problems.append(f"{server_errors} request(s) failed with 5xx or no response")
+    if counters["login_throttled"]:
+        problems.append(f"{counters['login_throttled']} valid login(s) throttled")
+
+    report = {
+        "revision": _git_revision(),
+        "mode": "url" if args.url else "test_client",
+        "students": len(plan["matrics"]),
+        "workers": args.workers,
+        "threads_per_worker": args.threads,
+        "admins": args.admins,
+        "elapsed_s": round(elapsed, 3),
+        "requests": total_requests,
+        "throughput_rps": round(total_requests / elapsed, 2) if elapsed else 0.0,
+        "journeys_per_s": round(len(plan["matrics"]) / elapsed, 2) if elapsed else 0.0,
+        "endpoints": _endpoint_report(latencies, statuses, elapsed),
+        "booking": {
+            "posts": posts,
+            "outcomes": outcomes,
+            "taken_conflicts": counters["booking_taken"],
+            "conflict_rate": round(counters["booking_taken"] / posts, 4) if posts else 0.0,
+            "new_active_bookings": new_bookings,
+            "stale_room_listings": counters["stale_room_listings"],
+            "queued_responses": counters["queued_responses"],
+        },
+        "logins": {
+            "source_ips": args.source_ips,
+            "typos": counters["login_typos"],
+            "typos_throttled": counters["typo_throttled"],
+            "throttled": counters["login_throttled"],
+            "shed": counters["login_shed"],
+            "failed": counters["login_failed"],
+        },
+        "sqlite_busy": {
+            "retries": busy_retries,
+            "retry_rate": round(busy_retries / total_requests, 4) if total_requests else 0.0,
+            "retry_exhausted": outcomes.get("retry_exhausted", 0),
+        },
+        "admin": {k: v for k, v in sorted(counters.items()) if k.startswith(("swap_", "cancel_"))},
+        "server_errors": server_errors,
+        "problems": problems,
+    }
+
+    output = json.dumps(report, indent=None if args.json else 2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
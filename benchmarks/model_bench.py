@@ -0,0 +1,230 @@
+# benchmarks/model_bench.py
+"""
+Model-layer micro-benchmarks on a campus-sized database.
+
+Seeds a throwaway database with models.synthetic_data_model (the same
+generator as `flask seed-synthetic`), or uses an existing one, then calls
+the models/ functions behind the hot pages directly - no HTTP, no
+templates - with randomly chosen students, hostels and rooms, and reports
+per-call latency percentiles. Groups: booking, allocation, notifications,
+ratings, availability, plus the heavy admin batch jobs (few iterations).
+
+    python -m benchmarks.model_bench --students 40000 --bunks 15000 --iterations 500
+    python -m benchmarks.model_bench --database campus.db --only ratings,availability
+
+Write cases (reserve_bunk, upsert_rating, mark_notifications_read,
+admission_status) change the database; point --database at a copy.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _sample(db, rng, size):
+    """Ids the cases draw from: housed and unhoused students, hostels, rooms."""
+    def ids(sql, *params):
+        rows = [r[0] for r in db.execute(sql, params)]
+        rng.shuffle(rows)
+        return rows[:size]
+
+    sample = {
+        "housed": [tuple(r) for r in db.execute(
+            "SELECT student_id, hostel_id, room_id FROM current_allocations ORDER BY random() LIMIT ?", (size,)
+        )],
+        "students": ids("SELECT id FROM students"),
+        "unhoused": ids("""
+            SELECT s.id FROM students s
+            WHERE NOT EXISTS (SELECT 1 FROM bookings b WHERE b.student_id = s.id AND b.status = 'active')
+        """),
+        "hostels": ids("SELECT id FROM hostels"),
+        "rooms": ids("SELECT id FROM rooms"),
+        "free_bunks": [tuple(r) for r in db.execute("""
+            SELECT r.hostel_id, k.room_id, k.id FROM bunks k JOIN rooms r ON r.id = k.room_id
+            WHERE COALESCE(k.occupied, 0) = 0 ORDER BY random() LIMIT ?
+        """, (size,))],
+        "first_event": max(0, db.execute("SELECT COALESCE(MAX(id), 0) FROM occupancy_events").fetchone()[0] - 500),
+    }
+    if not sample["housed"] or not sample["hostels"]:
+        raise SystemExit("database has no housed students; seed it first")
+    return sample
+
+
+def _cases(args):
+    """(group, name, iterations, fn(rng, sample)) for every benchmarked call."""
+    from models import booking_model, allocation_model, notification_model, rating_model, hostel_model
+    from models.admission_model import admission_status
+    from models.auto_allocation_model import preview_allocation
+    from models.swap_cycle_model import match_swap_cycles
+
+    def pick(rng, sample, key):
+        return rng.choice(sample[key])
+
+    def reserve(rng, sample):
+        # each call uses up one unhoused student and one free bunk
+        if not sample["unhoused"] or not sample["free_bunks"]:
+            return None
+        hostel_id, room_id, bunk_id = sample["free_bunks"].pop()
+        return booking_model.reserve_bunk(sample["unhoused"].pop(), hostel_id, room_id, bunk_id)
+
+    def notifications_page_2(rng, sample):
+        student_id = pick(rng, sample, "housed")[0]
+        _, cursor = notification_model.get_student_notifications_page(student_id)
+        if cursor:
+            notification_model.get_student_notifications_page(student_id, cursor=cursor)
+
+    def upsert(rng, sample):
+        student_id, hostel_id, room_id = pick(rng, sample, "housed")
+        rating_model.upsert_rating(student_id, hostel_id, room_id, rng.randint(1, 5), None)
+
+    n, heavy = args.iterations, args.heavy_iterations
+    return [
+        ("booking", "get_all_hostels", n, lambda rng, s: booking_model.get_all_hostels()),
+        ("booking", "get_rooms_by_hostel", n, lambda rng, s: booking_model.get_rooms_by_hostel(pick(rng, s, "hostels"))),
+        ("booking", "get_available_bunks_by_room", n,
+         lambda rng, s: booking_model.get_available_bunks_by_room(pick(rng, s, "rooms"))),
+        ("booking", "student_has_active_booking", n,
+         lambda rng, s: booking_model.student_has_active_booking(pick(rng, s, "students"))),
+        ("booking", "get_student_bookings", n,
+         lambda rng, s: booking_model.get_student_bookings(pick(rng, s, "students"))),
+        ("booking", "reserve_bunk", min(n, 200), reserve),
+
+        ("allocation", "get_current_allocation", n,
+         lambda rng, s: allocation_model.get_current_allocation(pick(rng, s, "students"))),
+        ("allocation", "get_allocation_history", n,
+         lambda rng, s: allocation_model.get_allocation_history(pick(rng, s, "students"))),
+        ("allocation", "get_student_current_allocation", n,
+         lambda rng, s: booking_model.get_student_current_allocation(pick(rng, s, "housed")[0])),
+        ("allocation", "get_student_current_allocation_ids", n,
+         lambda rng, s: rating_model.get_student_current_allocation_ids(pick(rng, s, "housed")[0])),
+
+        ("notifications", "get_student_notifications_page", n,
+         lambda rng, s: notification_model.get_student_notifications_page(pick(rng, s, "students"))),
+        ("notifications", "get_student_notifications_page_2", n, notifications_page_2),
+        ("notifications", "get_notification_counts", n,
+         lambda rng, s: notification_model.get_notification_counts(pick(rng, s, "students"))),
+        ("notifications", "mark_notifications_read", n,
+         lambda rng, s: notification_model.mark_notifications_read(pick(rng, s, "students"))),
+
+        ("ratings", "get_hostel_rating_summary", n,
+         lambda rng, s: rating_model.get_hostel_rating_summary(pick(rng, s, "hostels"))),
+        ("ratings", "get_room_rating_summary", n,
+         lambda rng, s: rating_model.get_room_rating_summary(pick(rng, s, "rooms"))),
+        ("ratings", "get_hostel_leaderboard", n, lambda rng, s: rating_model.get_hostel_leaderboard(10, 5)),
+        ("ratings", "get_room_leaderboard", n,
+         lambda rng, s: rating_model.get_room_leaderboard(pick(rng, s, "hostels"), 10, 3)),
+        ("ratings", "get_student_ratings", n,
+         lambda rng, s: rating_model.get_student_ratings(pick(rng, s, "students"))),
+        ("ratings", "upsert_rating", min(n, 200), upsert),
+
+        ("availability", "get_hostels_with_occupancy", n, lambda rng, s: hostel_model.get_hostels_with_occupancy()),
+        ("availability", "count_hostel_rooms", n, lambda rng, s: hostel_model.count_hostel_rooms(pick(rng, s, "hostels"))),
+        ("availability", "get_hostel_tree", n,
+         lambda rng, s: hostel_model.get_hostel_tree(pick(rng, s, "hostels"), 0, 50)),
+        ("availability", "get_occupancy_events_since", n,
+         lambda rng, s: hostel_model.get_occupancy_events_since(pick(rng, s, "hostels"), s["first_event"])),
+        ("availability", "admission_status", min(n, 200),
+         lambda rng, s: admission_status(pick(rng, s, "students"), 50, 600)),
+
+        ("batch", "preview_allocation", heavy, lambda rng, s: preview_allocation()),
+        ("batch", "match_swap_cycles_dry_run", heavy, lambda rng, s: match_swap_cycles(dry_run=True)),
+    ]
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _time_case(fn, iterations, rng, sample):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(rng, sample)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(_percentile(timings, 0.5), 3),
+        "p95_ms": round(_percentile(timings, 0.95), 3),
+        "p99_ms": round(_percentile(timings, 0.99), 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database", help="Existing database to benchmark (default: seed a temp file).")
+    parser.add_argument("--students", type=int, default=40000, help="Synthetic students to seed.")
+    parser.add_argument("--hostels", type=int, default=50)
+    parser.add_argument("--bunks", type=int, default=15000)
+    parser.add_argument("--years", type=int, default=3, help="Past sessions of synthetic history.")
+    parser.add_argument("--iterations", type=int, default=300, help="Calls per case.")
+    parser.add_argument("--heavy-iterations", type=int, default=3, help="Calls per batch-job case.")
+    parser.add_argument("--only", help="Comma-separated groups or case names to run.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="Also write the JSON result to this file.")
+    parser.add_argument("--json", action="store_true", help="Print only the JSON result.")
+    args = parser.parse_args(argv)
+
+    seeded = not args.database
+    args.database = args.database or os.path.join(tempfile.mkdtemp(prefix="hostel-models-"), "models.db")
+    os.environ["DATABASE_PATH"] = os.path.abspath(args.database)
+    os.environ["AUTO_MIGRATE"] = "1"
+
+    from app import create_app
+    from extensions import get_db
+    from passwords import shutdown_hashers
+    from models.synthetic_data_model import seed_synthetic
+
+    app = create_app()
+    # time the counter query itself, not the per-process cache in front of it
+    app.config["NOTIFICATION_COUNT_TTL"] = 0
+    only = set(args.only.split(",")) if args.only else None
+    rng = random.Random(args.seed)
+
+    with app.app_context():
+        summary = None
+        if seeded:
+            summary = seed_synthetic(students=args.students, hostels=args.hostels, bunks=args.bunks,
+                                     years=args.years, seed=args.seed)
+            if not args.json:
+                print(f"seeded {args.database} in {summary['seconds']}s", file=sys.stderr)
+
+        db = get_db()
+        sample = _sample(db, rng, max(args.iterations, 1000))
+        rows = {t: db.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for t in ("students", "hostels", "rooms", "bunks", "bookings", "allocation_ledger", "ratings")}
+
+        results = {}
+        for group, name, iterations, fn in _cases(args):
+            if only and group not in only and name not in only:
+                continue
+            fn(rng, sample)   # warm the page cache and statement cache
+            results[name] = dict(group=group, **_time_case(fn, iterations, rng, sample))
+            if not args.json:
+                r = results[name]
+                print(f"{group:13} {name:36} p50 {r['p50_ms']:8.3f} ms  p95 {r['p95_ms']:8.3f} ms", file=sys.stderr)
+    shutdown_hashers(wait=True)
+
+    report = {
+        "database": args.database,
+        "seeded": summary,
+        "rows": rows,
+        "iterations": args.iterations,
+        "cases": results,
+    }
+    output = json.dumps(report, indent=None if args.json else 2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# benchmarks/swap_cycles_bench.py
+"""
+Swap-cycle matcher benchmark.
+
+Builds a throwaway database with every bunk occupied and one pending swap
+request per student (a share of them mutual or ring-shaped, the rest
+random), then times loading the graph, finding cycles and executing them,
+and checks that no bunk or booking ended up inconsistent.
+
+    python -m benchmarks.swap_cycles_bench --requests 10000
+
+Exits with status 1 if any invariant is violated.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+def _setup(args):
+    from app import create_app
+    from extensions import get_db
+    from models.allocation_model import book_bunks, BOOKING
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    with app.app_context():
+        db = get_db()
+        db.execute("INSERT INTO hostels (name, gender, created_at) VALUES ('Bench Hall', 'male', 0)")
+        hostel_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+        rooms = (args.requests + 3) // 4
+        db.executemany(
+            "INSERT INTO rooms (hostel_id, room_number, capacity) VALUES (?, ?, 4)",
+            [(hostel_id, f"B{n + 1:05d}") for n in range(rooms)]
+        )
+        room_ids = [r[0] for r in db.execute("SELECT id FROM rooms WHERE hostel_id = ? ORDER BY id", (hostel_id,))]
+        db.executemany(
+            "INSERT INTO bunks (room_id, bunk_label) VALUES (?, ?)",
+            [(room_ids[i // 4], "ABCD"[i % 4]) for i in range(args.requests)]
+        )
+        db.executemany(
+            "INSERT INTO students (matric_no, full_name, email, password) VALUES (?, ?, ?, 'x')",
+            [(f"swap{i:06d}", f"Swap {i}", f"swap{i}@example.test") for i in range(args.requests)]
+        )
+        students = [r[0] for r in db.execute("SELECT id FROM students WHERE matric_no LIKE 'swap%' ORDER BY id")]
+        bunks = [tuple(r) for r in db.execute("""
+            SELECT k.id, k.room_id FROM bunks k JOIN rooms r ON r.id = k.room_id
+            WHERE r.hostel_id = ? ORDER BY k.id
+        """, (hostel_id,))]
+
+        # everyone holds a bunk with an active booking (no free bunks anywhere)
+        book_bunks(db, [(s, b[0], None) for s, b in zip(students, bunks)], BOOKING)
+
+        holders = list(zip(students, bunks))
+        rng.shuffle(holders)
+        requests = []
+        i = 0
+        # a share of the students form rings of 2-5 rooms
+        while i < int(len(holders) * args.ring_share):
+            size = rng.randint(2, 5)
+            ring = holders[i:i + size]
+            for n, (student, (bunk_id, room_id)) in enumerate(ring):
+                target = ring[(n + 1) % len(ring)][1]
+                requests.append((student, room_id, target[1], target[0]))
+            i += size
+        # the rest ask for random rooms
+        for student, (bunk_id, room_id) in holders[i:]:
+            target_room = rng.choice(room_ids)
+            requests.append((student, room_id, target_room, None))
+
+        rng.shuffle(requests)
+        db.executemany(
+            "INSERT INTO room_swap_requests (student_id, current_room_id, requested_room_id) VALUES (?, ?, ?)",
+            [(s, cur, req) for s, cur, req, _ in requests]
+        )
+        ids = {r["student_id"]: r["id"] for r in db.execute("SELECT id, student_id FROM room_swap_requests")}
+        db.executemany(
+            "INSERT INTO room_swap_details (swap_request_id, requested_bunk_id) VALUES (?, ?)",
+            [(ids[s], bunk) for s, _, _, bunk in requests if bunk]
+        )
+        db.commit()
+    return app
+
+
+def _verify(app):
+    from extensions import get_db
+    from models.allocation_model import rebuild_current_allocations
+
+    with app.app_context():
+        db = get_db()
+        problems = []
+        dup = db.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT occupied_by FROM bunks WHERE occupied = 1 GROUP BY occupied_by HAVING COUNT(*) > 1
+            )
+        """).fetchone()[0]
+        if dup:
+            problems.append(f"{dup} student(s) hold more than one bunk")
+        mismatched = db.execute("""
+            SELECT COUNT(*) FROM bookings b
+            JOIN bunks k ON k.id = b.bunk_id
+            WHERE b.status = 'active' AND (k.occupied != 1 OR k.occupied_by != b.student_id OR k.room_id != b.room_id)
+        """).fetchone()[0]
+        if mismatched:
+            problems.append(f"{mismatched} active booking(s) disagree with bunks")
+        wrong_room = db.execute("""
+            SELECT COUNT(*) FROM room_swap_requests rs
+            JOIN bunks k ON k.occupied_by = rs.student_id AND k.occupied = 1
+            WHERE rs.status = 'approved' AND k.room_id != rs.requested_room_id
+        """).fetchone()[0]
+        if wrong_room:
+            problems.append(f"{wrong_room} approved request(s) not in their requested room")
+        stale_rows = rebuild_current_allocations(fix=False)
+        if stale_rows:
+            problems.append(f"{len(stale_rows)} current_allocations row(s) disagree with bookings")
+        return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--ring-share", type=float, default=0.3, help="Share of students placed in rings.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print only the JSON result.")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="hostel-swaps-")
+    os.environ["DATABASE_PATH"] = os.path.join(workdir, "swaps.db")
+    os.environ["AUTO_MIGRATE"] = "1"
+
+    from models.swap_cycle_model import load_swap_edges, find_swap_cycles, execute_swap_cycles
+
+    app = _setup(args)
+    with app.app_context():
+        started = time.perf_counter()
+        edges = load_swap_edges()
+        loaded = time.perf_counter()
+        cycles = find_swap_cycles(edges)
+        found = time.perf_counter()
+        executed, stale = execute_swap_cycles(cycles)
+        done = time.perf_counter()
+
+    lengths = [len(c) for c in cycles]
+    report = {
+        "pending_requests": len(edges),
+        "cycles": len(cycles),
+        "students_moved": sum(len(c) for c in executed),
+        "longest_cycle": max(lengths) if lengths else 0,
+        "stale_cycles": len(stale),
+        "load_ms": round((loaded - started) * 1000, 2),
+        "find_ms": round((found - loaded) * 1000, 2),
+        "execute_ms": round((done - found) * 1000, 2),
+        "problems": _verify(app),
+    }
+    print(json.dumps(report, indent=None if args.json else 2))
+    return 1 if report["problems"] or report["stale_cycles"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
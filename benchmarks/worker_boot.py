@@ -0,0 +1,140 @@
+# benchmarks/worker_boot.py
+"""
+Gunicorn worker spawn time and memory, preloaded vs not.
+
+Starts gunicorn with the repo's gunicorn.conf.py twice (GUNICORN_PRELOAD=1
+and 0) on a throwaway database, waits until every worker has logged
+"ready", sends a few requests so the workers have touched their code, then
+reads each worker's memory from /proc/<pid>/smaps_rollup:
+  - rss: resident pages, shared ones included;
+  - pss: shared pages split between the processes sharing them;
+  - private: pages only this worker holds (what another worker costs).
+
+    python -m benchmarks.worker_boot --workers 4
+
+Linux only (smaps_rollup). Exits with status 1 if a server fails to start.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY = re.compile(r"Worker (\d+) ready in (\d+) ms")
+
+
+def _memory_kb(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _get(url, timeout=5):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _run(args, preload, port):
+    env = dict(os.environ, DATABASE_PATH=args.database, WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_PRELOAD="1" if preload else "0", GUNICORN_BIND=f"127.0.0.1:{port}",
+               APP_MODE=args.mode)
+    log_path = os.path.join(os.path.dirname(args.database), f"gunicorn-{port}.log")
+    with open(log_path, "w") as log:
+        started = time.perf_counter()
+        server = subprocess.Popen([sys.executable, "-m", "gunicorn"], cwd=ROOT, env=env,
+                                  stdout=log, stderr=subprocess.STDOUT)
+    try:
+        ready = {}
+        while len(ready) < args.workers:
+            if server.poll() is not None or time.perf_counter() - started > args.timeout:
+                with open(log_path) as f:
+                    raise RuntimeError(f"gunicorn did not get {args.workers} workers ready:\n{f.read()}")
+            time.sleep(0.05)
+            with open(log_path) as f:
+                ready = {int(pid): int(ms) for pid, ms in READY.findall(f.read())}
+        all_ready_s = time.perf_counter() - started
+
+        for _ in range(args.requests):
+            for path in ("/", "/login", "/student/login"):
+                _get(f"http://127.0.0.1:{port}{path}")
+
+        master = _memory_kb(server.pid)
+        workers = [_memory_kb(pid) for pid in ready]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    def summary(key):
+        values = [w[key] for w in workers]
+        return {"mean_kb": round(statistics.fmean(values)), "max_kb": max(values)}
+
+    spawn = sorted(ready.values())
+    return {
+        "preload": preload,
+        "workers": args.workers,
+        "server_ready_s": round(all_ready_s, 3),
+        "worker_spawn_ms": {"mean": round(statistics.fmean(spawn), 1), "max": spawn[-1]},
+        "master_kb": master,
+        "worker_rss": summary("rss"),
+        "worker_pss": summary("pss"),
+        "worker_private": summary("private"),
+        "total_pss_kb": master["pss"] + sum(w["pss"] for w in workers),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", default="all", choices=("all", "admin", "student"), help="APP_MODE of the server.")
+    parser.add_argument("--requests", type=int, default=20, help="Request rounds before measuring memory.")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for the workers.")
+    parser.add_argument("--database", help="Database file (default: a temp file).")
+    parser.add_argument("--out", help="Also write the JSON result to this file.")
+    parser.add_argument("--json", action="store_true", help="Print only the JSON result.")
+    args = parser.parse_args(argv)
+    args.database = os.path.abspath(
+        args.database or os.path.join(tempfile.mkdtemp(prefix="hostel-boot-"), "boot.db")
+    )
+
+    try:
+        runs = [_run(args, True, args.port), _run(args, False, args.port + 1)]
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    preloaded, plain = runs
+    report = {
+        "mode": args.mode,
+        "runs": runs,
+        "spawn_speedup": round(plain["worker_spawn_ms"]["mean"] / max(preloaded["worker_spawn_ms"]["mean"], 0.1), 1),
+        "private_kb_saved_per_worker": plain["worker_private"]["mean_kb"] - preloaded["worker_private"]["mean_kb"],
+    }
+    output = json.dumps(report, indent=None if args.json else 2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# commands.py
+"""
+Flask CLI commands (run with FLASK_APP=app.py, e.g. `flask db upgrade`).
+"""
+import csv
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+from extensions import get_db
+from migrations import get_schema_version, latest_version, upgrade_database, seed_database
+from models.hostel_model import recount_occupancy
+from models.allocation_model import rebuild_current_allocations
+from models.swap_cycle_model import match_swap_cycles
+from models.auto_allocation_model import preview_allocation, commit_allocation, AllocationStale
+from models.rating_model import rebuild_rating_aggregates, upsert_ratings_batch
+from models.student_import_model import import_students_csv, StudentImportError, run_import_queue, purge_import_reports
+from models.room_model import LayoutError, parse_layout, expand_layout_pattern, provision_hostel
+from models.synthetic_data_model import seed_synthetic, SyntheticDataError
+
+db_cli = AppGroup("db", help="Database schema commands.")
+
+
+@db_cli.command("upgrade")
+@click.option("--target", type=int, default=None, help="Stop at this schema version.")
+@click.option("--no-seed", is_flag=True, help="Skip default admin/test student seeding.")
+def db_upgrade(target, no_seed):
+    """Apply pending schema migrations (run once per deploy)."""
+    before = get_schema_version()
+    applied = upgrade_database(target=target)
+    if not no_seed:
+        seed_database()
+
+    if applied:
+        click.echo(f"Upgraded schema {before} -> {applied[-1]} (applied: {', '.join(map(str, applied))})")
+    else:
+        click.echo(f"Schema already at version {before}")
+
+
+@db_cli.command("version")
+def db_version():
+    """Show the current and newest schema version."""
+    current = get_schema_version(get_db())
+    click.echo(f"current: {current}  latest: {latest_version()}")
+
+
+@click.command("recount-occupancy")
+@click.option("--check", is_flag=True, help="Only report drift, do not rewrite counters.")
+def recount_occupancy_command(check):
+    """Rebuild rooms/hostels free_bunks + total_bunks from bunks and report drift."""
+    drift = recount_occupancy(fix=not check)
+    if not drift:
+        click.echo("Occupancy counters are consistent.")
+        return
+
+    for kind, row_id, total, free, real_total, real_free in drift:
+        click.echo(f"{kind} {row_id}: stored {free}/{total} free, actual {real_free}/{real_total}")
+    click.echo(f"{len(drift)} counter(s) {'drifted' if check else 'repaired'}.")
+
+
+@click.command("rebuild-rating-aggregates")
+@click.option("--check", is_flag=True, help="Only report drift, do not rewrite aggregates.")
+def rebuild_rating_aggregates_command(check):
+    """Recompute rating_aggregates from ratings and report drift."""
+    drift = rebuild_rating_aggregates(fix=not check)
+    if not drift:
+        click.echo("Rating aggregates are consistent.")
+        return
+
+    for scope, target_id, stored, actual in drift:
+        click.echo(f"{scope} {target_id}: stored {stored}, actual {actual}")
+    click.echo(f"{len(drift)} aggregate(s) {'drifted' if check else 'rebuilt'}.")
+
+
+@click.command("rebuild-allocations")
+@click.option("--check", is_flag=True, help="Only report drift, do not rewrite rows.")
+def rebuild_allocations_command(check):
+    """Recompute current_allocations from active bookings and report drift."""
+    drifted = rebuild_current_allocations(fix=not check)
+    if not drifted:
+        click.echo("current_allocations is consistent.")
+        return
+
+    for student_id in drifted[:50]:
+        click.echo(f"student {student_id}")
+    click.echo(f"{len(drifted)} allocation row(s) {'drifted' if check else 'rebuilt'}.")
+
+
+@click.command("import-ratings")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--chunk-size", type=int, default=1000, help="Rows per transaction.")
+def import_ratings_command(csv_file, chunk_size):
+    """Bulk-upsert historical ratings (student_id,hostel_id,room_id,rating[,comment][,created_at])."""
+    started = time.perf_counter()
+    applied, errors = upsert_ratings_batch(csv.DictReader(csv_file), chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+
+    for index, message in errors[:20]:
+        click.echo(f"row {index + 1}: {message}", err=True)
+    if len(errors) > 20:
+        click.echo(f"...and {len(errors) - 20} more", err=True)
+    click.echo(f"{applied} rating(s) written, {len(errors)} skipped in {elapsed:.2f}s")
+
+
+@click.command("match-swap-cycles")
+@click.option("--dry-run", is_flag=True, help="Only list the cycles that would be executed.")
+def match_swap_cycles_command(dry_run):
+    """Find pending room swaps that form exchange cycles and execute them."""
+    result = match_swap_cycles(dry_run=dry_run)
+    lengths = sorted(len(c) for c in result["cycles"])
+    click.echo(
+        f"{result['pending_edges']} pending request(s), {len(result['cycles'])} cycle(s) "
+        f"covering {result['students']} student(s) found in {result['find_ms']} ms"
+        + (f" (longest {lengths[-1]})" if lengths else "")
+    )
+    if not dry_run:
+        click.echo(f"executed {len(result['executed'])}, skipped {len(result['stale'])} stale")
+
+
+@click.command("auto-allocate")
+@click.option("--commit", "do_commit", is_flag=True, help="Write the bookings (default is a preview).")
+def auto_allocate_command(do_commit):
+    """Place every student without a booking into a free bunk."""
+    preview = preview_allocation()
+    unplaced = ", ".join(f"{count} {reason}" for reason, count in preview["unplaced"].items()) or "none"
+    click.echo(
+        f"{preview['students_waiting']} waiting, {preview['free_bunks']} free bunk(s): "
+        f"{preview['placed']} placed, unplaced: {unplaced} "
+        f"(load {preview['load_ms']} ms, plan {preview['plan_ms']} ms)"
+    )
+    if preview["department_cohesion"] is not None:
+        click.echo(f"department cohesion {preview['department_cohesion']:.1%}")
+    if not do_commit:
+        return
+
+    started = time.perf_counter()
+    try:
+        written = commit_allocation(preview["assignments"])
+    except AllocationStale as e:
+        raise click.ClickException(f"Nothing was allocated: {e}")
+    click.echo(f"{written} booking(s) written in {time.perf_counter() - started:.2f}s")
+
+
+@click.command("provision-hostel")
+@click.argument("hostel_id", type=int)
+@click.option("--file", "layout_file", type=click.File("r", encoding="utf-8-sig"), help="CSV or JSON layout.")
+@click.option("--pattern", help='e.g. "blocks A-D, floors 1-4, rooms 01-30, capacity 4, bunks A/B/C/D"')
+@click.option("--dry-run", is_flag=True, help="Validate and count without writing.")
+def provision_hostel_command(hostel_id, layout_file, pattern, dry_run):
+    """Bulk-create rooms and bunks for a hostel in one transaction."""
+    if bool(layout_file) == bool(pattern):
+        raise click.UsageError("Give exactly one of --file or --pattern.")
+
+    try:
+        if layout_file:
+            layout = parse_layout(layout_file.read(), layout_file.name)
+        else:
+            layout = expand_layout_pattern(pattern)
+    except LayoutError as e:
+        raise click.ClickException(str(e))
+
+    report = provision_hostel(hostel_id, layout, dry_run=dry_run)
+    for err in report["errors"]:
+        click.echo(f"row {err['row']} ({err['room_number'] or '-'}): {err['error']}", err=True)
+
+    prefix = "Would create" if dry_run else "Created"
+    click.echo(
+        f"{prefix} {report['rooms_created']} room(s), {report['bunks_created']} bunk(s); "
+        f"{report['rooms_skipped']} already complete, {len(report['errors'])} error(s) "
+        f"from {report['rows']} row(s)."
+    )
+
+
+@click.command("import-students")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--report", type=click.File("w"), default=None, help="Write the per-row result CSV here.")
+@click.option("--chunk-size", type=int, default=None, help="Rows per insert transaction.")
+@click.option("--workers", type=int, default=None, help="Password hashing processes.")
+@with_appcontext
+def import_students_command(csv_file, report, chunk_size, workers):
+    """Bulk-create students from a CSV (full_name,matric_no,email[,password])."""
+    config = current_app.config
+    try:
+        summary = import_students_csv(
+            csv_file, report,
+            chunk_size=chunk_size or config["STUDENT_IMPORT_CHUNK_SIZE"],
+            workers=workers or config["STUDENT_IMPORT_WORKERS"],
+        )
+    except StudentImportError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"{summary['rows']} row(s): {summary['created']} created, "
+        f"{summary['duplicates']} duplicate, {summary['invalid']} invalid "
+        f"in {summary['seconds']}s ({summary['rows_per_second']} rows/s)"
+    )
+
+
+@click.command("run-import-jobs")
+@click.option("--poll", type=float, default=0, help="Keep running, checking the queue every POLL seconds.")
+@with_appcontext
+def run_import_jobs_command(poll):
+    """Run queued student CSV imports (uploaded from /admin/students/import)."""
+    while True:
+        purge_import_reports()
+        count = run_import_queue()
+        if count:
+            click.echo(f"Ran {count} import job(s).")
+        if not poll:
+            return
+        time.sleep(poll)
+
+
+@click.command("seed-synthetic")
+@click.option("--students", type=int, default=40000, show_default=True, help="Students, alumni included.")
+@click.option("--hostels", type=int, default=50, show_default=True)
+@click.option("--bunks", type=int, default=15000, show_default=True, help="Bunks across all hostels.")
+@click.option("--years", type=int, default=3, show_default=True, help="Past sessions of history.")
+@click.option("--occupancy", type=float, default=0.85, show_default=True, help="Share of bunks taken this session.")
+@click.option("--seed", type=int, default=1, show_default=True, help="Random seed (same seed, same campus).")
+@click.option("--password", default="student123", show_default=True, help="Password of every synthetic student.")
+def seed_synthetic_command(students, hostels, bunks, years, occupancy, seed, password):
+    """Generate a large synthetic campus for performance testing."""
+    try:
+        summary = seed_synthetic(students=students, hostels=hostels, bunks=bunks, years=years,
+                                 occupancy=occupancy, seed=seed, password=password)
+    except SyntheticDataError as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"{summary['hostels']} hostel(s), {summary['bunks']} bunk(s), {summary['students']} student(s) "
+        f"({summary['current_students']} enrolled, {summary['housed']} housed) in {summary['seconds']}s"
+    )
+    click.echo(
+        f"history: {summary['past_bookings']} past booking(s), {summary['swap_requests']} swap and "
+        f"{summary['cancellation_requests']} cancellation request(s) ({summary['pending_requests']} pending), "
+        f"{summary['ratings']} rating(s)"
+    )
+
+
+def register_commands(app):
+    app.cli.add_command(db_cli)
+    app.cli.add_command(recount_occupancy_command)
+    app.cli.add_command(rebuild_rating_aggregates_command)
+    app.cli.add_command(rebuild_allocations_command)
+    app.cli.add_command(import_ratings_command)
+    app.cli.add_command(provision_hostel_command)
+    app.cli.add_command(match_swap_cycles_command)
+    app.cli.add_command(auto_allocate_command)
+    app.cli.add_command(import_students_command)
+    app.cli.add_command(run_import_jobs_command)
+    app.cli.add_command(seed_synthetic_command)
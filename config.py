@@ -4,13 +4,89 @@ import os
 
 class Config:
     SECRET_KEY = "super-secret-key-change-this"
-    DATABASE = os.path.join(os.path.abspath(os.path.dirname(__file__)), "database.db")
+    DATABASE = os.getenv(
+        "DATABASE_PATH",
+        os.path.join(os.path.abspath(os.path.dirname(__file__)), "database.db")
+    )
     SECRET_KEY = "hostel_link-secret-key"
 
+    # Hosts of the two sides when one service serves both (APP_MODE=all
+    # behind app.HostDispatcher); empty = split by path only
+    ADMIN_HOST = os.getenv("ADMIN_HOST", "").lower()
+    STUDENT_HOST = os.getenv("STUDENT_HOST", "").lower()
+
+    # Reverse proxies in front of the app (Render: 1). Their X-Forwarded-For /
+    # X-Forwarded-Proto hops are trusted, so request.remote_addr is the client's
+    # address; 0 = serve directly, ignore the headers (they could be forged).
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
     # upload config
     UPLOAD_FOLDER = 'static/uploads'
     ALLOWED_EXTENSIONS = {'png','jpg','jpeg','gif'}
 
+    # Apply pending schema migrations on boot (local dev). Deploys set
+    # AUTO_MIGRATE=0 and run `flask db upgrade` once instead.
+    AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "1") == "1"
+
+    # SQLite connection pool (one per gunicorn worker)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))          # seconds to wait for a free connection
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))    # SQLite busy_timeout per connection
+    DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))      # page cache per connection
+    DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+    DB_STATEMENT_CACHE = int(os.getenv("DB_STATEMENT_CACHE", "256"))    # prepared statements kept per connection
+
+    # Booking engine: attempts when SQLite stays busy past busy_timeout
+    BOOKING_RETRY_ATTEMPTS = int(os.getenv("BOOKING_RETRY_ATTEMPTS", "6"))
+
+    # Booking-rush waiting room (shared across workers through SQLite)
+    BOOKING_QUEUE_ENABLED = os.getenv("BOOKING_QUEUE_ENABLED", "1") == "1"
+    BOOKING_ADMIT_PER_SECOND = int(os.getenv("BOOKING_ADMIT_PER_SECOND", "20"))    # new bookers let in per second
+    BOOKING_ADMISSION_WINDOW = int(os.getenv("BOOKING_ADMISSION_WINDOW", "600"))   # seconds an admitted student may book
+
+    # Live availability stream (server-sent events)
+    SSE_STREAM_SECONDS = int(os.getenv("SSE_STREAM_SECONDS", "55"))     # reconnect cycle per stream
+    SSE_POLL_INTERVAL = float(os.getenv("SSE_POLL_INTERVAL", "1.0"))    # seconds between event-log reads
+    SSE_MAX_STREAMS = int(os.getenv("SSE_MAX_STREAMS", "2"))            # open streams per worker process; keep below its threads
+    SSE_BUSY_RETRY_SECONDS = float(os.getenv("SSE_BUSY_RETRY_SECONDS", "20"))  # reconnect delay sent when the streams are full
+
+    # Seconds a worker may reuse a student's notification badge count
+    NOTIFICATION_COUNT_TTL = int(os.getenv("NOTIFICATION_COUNT_TTL", "5"))
+
+    # Password hashing: werkzeug method string including its cost, e.g.
+    # "scrypt:32768:8:1" or "pbkdf2:sha256:600000". Hashes stored with other
+    # parameters are upgraded on the next successful login.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", "2"))          # hashing processes per worker (0 = inline)
+    PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", "32")) # queued + running hash jobs per worker
+    PASSWORD_POOL_TIMEOUT = float(os.getenv("PASSWORD_POOL_TIMEOUT", "10"))       # seconds before a login is turned away
+
+    # Login flood protection (checked before any password hash is computed)
+    LOGIN_THROTTLE_ENABLED = os.getenv("LOGIN_THROTTLE_ENABLED", "1") == "1"
+    LOGIN_WINDOW_SECONDS = int(os.getenv("LOGIN_WINDOW_SECONDS", "300"))       # sliding window length
+    LOGIN_MAX_PER_IDENTITY = int(os.getenv("LOGIN_MAX_PER_IDENTITY", "10"))    # attempts per matric_no/email per window
+    LOGIN_MAX_PER_IP = int(os.getenv("LOGIN_MAX_PER_IP", "3000"))              # soft limit only: campus NAT puts every student behind one IP
+    LOGIN_LOCKOUT_AFTER = int(os.getenv("LOGIN_LOCKOUT_AFTER", "5"))           # consecutive failures before an identity locks (IPs never lock)
+    LOGIN_LOCKOUT_BASE = int(os.getenv("LOGIN_LOCKOUT_BASE", "30"))            # first lockout, doubled per further failure
+    LOGIN_LOCKOUT_MAX = int(os.getenv("LOGIN_LOCKOUT_MAX", "3600"))
+    LOGIN_FAILURE_RESET = int(os.getenv("LOGIN_FAILURE_RESET", "86400"))       # idle seconds after which failures are forgotten
+
+    # Per-request SQL profiler (admin page: /admin/_perf). Off in production
+    # unless a slow handler is being hunted down.
+    PROFILE_SQL = os.getenv("PROFILE_SQL", "0") == "1"
+    PROFILE_SQL_SLOW_MS = float(os.getenv("PROFILE_SQL_SLOW_MS", "50"))                 # log + EXPLAIN statements slower than this
+    PROFILE_SQL_REPEAT_THRESHOLD = int(os.getenv("PROFILE_SQL_REPEAT_THRESHOLD", "5"))  # same statement this often in one request = N+1 suspect
+    PROFILE_SQL_FLUSH_SECONDS = float(os.getenv("PROFILE_SQL_FLUSH_SECONDS", "5"))      # how often each worker shares its figures with /admin/_perf
+
+    # Bulk student CSV import
+    STUDENT_IMPORT_CHUNK_SIZE = int(os.getenv("STUDENT_IMPORT_CHUNK_SIZE", "500"))   # rows per insert transaction
+    STUDENT_IMPORT_WORKERS = int(os.getenv("STUDENT_IMPORT_WORKERS", "0")) or None  # hashing processes (None = CPU count)
+    # "external": queued uploads wait for `flask run-import-jobs --poll 5`, run as its own process;
+    # "thread": a web worker runs them in a background thread (one job at a time, 2 hashing processes)
+    STUDENT_IMPORT_RUNNER = os.getenv("STUDENT_IMPORT_RUNNER", "external")
+    STUDENT_IMPORT_REPORT_TTL = int(os.getenv("STUDENT_IMPORT_REPORT_TTL", "3600"))        # seconds a report (with initial passwords) is kept
+    STUDENT_IMPORT_STALE_SECONDS = int(os.getenv("STUDENT_IMPORT_STALE_SECONDS", "3600"))  # a job running this long lost its runner
+
 
 # app.secret_key = "dev-secret"  # replace with config value
 
@@ -2,23 +2,246 @@ import sqlite3
 from flask import g, current_app
 import time
 import os
+import queue
+import random
+import threading
 from werkzeug.utils import secure_filename
 from config import Config
 
+
+# ------------------- SQLITE CONNECTION POOL ----------------------------
+# One pool per worker process (and per database file). Connections are
+# opened once with WAL + tuned PRAGMAs and handed out to requests through
+# get_db(), instead of a fresh sqlite3.connect() on every request.
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within DB_POOL_TIMEOUT."""
+
+
+class ConnectionPool:
+    def __init__(self, database, size=8, timeout=10.0, busy_timeout_ms=5000,
+                 cache_size_kb=16384, mmap_size=0, statement_cache=256):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.statement_cache = statement_cache
+        self.pid = os.getpid()
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "connections_opened": 0,
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "in_use": 0,
+            "wait_time_total_ms": 0.0,
+            "wait_time_max_ms": 0.0,
+            "busy_retries": 0,
+            "discarded": 0,
+        }
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,   # a connection may be released by another thread
+            cached_statements=self.statement_cache,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._lock:
+            self._stats["connections_opened"] += 1
+        return conn
+
+    def acquire(self):
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["checkout_timeouts"] += 1
+            raise PoolTimeout(f"No database connection free after {self.timeout}s")
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                conn = self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+        waited_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["wait_time_total_ms"] += waited_ms
+            self._stats["wait_time_max_ms"] = max(self._stats["wait_time_max_ms"], waited_ms)
+        return conn
+
+    def release(self, conn):
+        try:
+            # never hand a half-finished transaction to the next request
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+        except sqlite3.Error:
+            # broken connection: drop it, a fresh one is opened on demand
+            with self._lock:
+                self._stats["discarded"] += 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def note_busy_retry(self):
+        with self._lock:
+            self._stats["busy_retries"] += 1
+
+    def close_idle(self):
+        """Closes every idle connection (used before forking workers)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+        data["size"] = self.size
+        data["idle"] = self._idle.qsize()
+        data["pid"] = self.pid
+        checkouts = data["checkouts"] or 1
+        data["wait_time_avg_ms"] = round(data["wait_time_total_ms"] / checkouts, 3)
+        data["wait_time_total_ms"] = round(data["wait_time_total_ms"], 3)
+        data["wait_time_max_ms"] = round(data["wait_time_max_ms"], 3)
+        return data
+
+    def health(self):
+        """Checks out a connection and reports journal mode + integrity of the handle."""
+        conn = self.acquire()
+        try:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            conn.execute("SELECT 1").fetchone()
+            return {"ok": True, "journal_mode": mode, "database": self.database}
+        except sqlite3.Error as e:
+            return {"ok": False, "error": str(e), "database": self.database}
+        finally:
+            self.release(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config=None):
+    """Returns this process' pool for the configured database (created lazily)."""
+    config = config or current_app.config
+    database = config.get("DATABASE", Config.DATABASE)
+
+    pool = _pools.get(database)
+    # a pool inherited through fork() must never be reused by the child
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None or pool.pid != os.getpid():
+            pool = ConnectionPool(
+                database,
+                size=config.get("DB_POOL_SIZE", Config.DB_POOL_SIZE),
+                timeout=config.get("DB_POOL_TIMEOUT", Config.DB_POOL_TIMEOUT),
+                busy_timeout_ms=config.get("DB_BUSY_TIMEOUT_MS", Config.DB_BUSY_TIMEOUT_MS),
+                cache_size_kb=config.get("DB_CACHE_SIZE_KB", Config.DB_CACHE_SIZE_KB),
+                mmap_size=config.get("DB_MMAP_SIZE", Config.DB_MMAP_SIZE),
+                statement_cache=config.get("DB_STATEMENT_CACHE", Config.DB_STATEMENT_CACHE),
+            )
+            _pools[database] = pool
+    return pool
+
+
+def reset_pools():
+    """Forgets every pool without touching its connections (call after fork)."""
+    with _pools_lock:
+        _pools.clear()
+
+
+def dispose_pools():
+    """Closes idle connections and forgets every pool (call before fork)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            if pool.pid == os.getpid():
+                pool.close_idle()
+        _pools.clear()
+
+
+def get_pool_stats():
+    return [pool.stats() for pool in _pools.values() if pool.pid == os.getpid()]
+
+
 def get_db():
     if "db" not in g:
-        g.db = sqlite3.connect(Config.DATABASE)
-        g.db.row_factory = sqlite3.Row
+        pool = get_pool()
+        g.db = pool.acquire()
+        g.db_pool = pool
+        # PROFILE_SQL: time every statement of this request (see sql_profiler.py)
+        profiler = current_app.extensions.get("sql_profiler")
+        if profiler is not None:
+            g.db = profiler.wrap(g.db)
     return g.db
 
-    # The next line is only for debugging - it will print the path to the database file being used.
-    print("DB PATH:", os.path.abspath(DATABASE))
-
 
 def close_db(e=None):
     db = g.pop("db", None)
+    pool = g.pop("db_pool", None)
     if db is not None:
-        db.close()
+        db = getattr(db, "unwrapped", db)
+        if pool is not None:
+            pool.release(db)
+        else:
+            db.close()
+
+
+# ---------- BUSY RETRIES ----------
+def is_busy_error(exc):
+    msg = str(exc).lower()
+    return isinstance(exc, sqlite3.OperationalError) and (
+        "database is locked" in msg or "database is busy" in msg
+    )
+
+
+def retry_on_busy(fn, attempts=5, base_delay=0.02, max_delay=0.5):
+    """
+    Runs fn() and retries it when SQLite reports SQLITE_BUSY / "database is locked".
+    Backoff is exponential with full jitter so competing workers spread out.
+    The last busy error is re-raised once attempts are exhausted.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or attempt == attempts - 1:
+                raise
+            db = g.get("db")
+            if db is not None and db.in_transaction:
+                db.rollback()
+            pool = g.get("db_pool")
+            if pool is not None:
+                pool.note_busy_retry()
+            time.sleep(random.uniform(0, min(max_delay, base_delay * (2 ** attempt))))
 
 
         # -------------------  CREATING FOR FILE SAVING ----------------------------
@@ -0,0 +1,84 @@
+# gunicorn.conf.py
+"""
+Production server settings; gunicorn reads this file from the working
+directory:
+
+    gunicorn wsgi:app
+
+The app is imported once in the master (preload_app) and the workers are
+forked from it, so they share its imported code copy-on-write instead of
+each importing Flask, the routes and the models again. Schema migrations
+and default-account seeding run once in on_starting, before any worker
+exists; post_fork gives every worker its own database and hashing pools.
+"""
+import gc
+import os
+import subprocess
+import sys
+import time
+
+# the master migrates in on_starting; the preloaded app must not do it too
+os.environ.setdefault("AUTO_MIGRATE", "0")
+# production sits behind Render's proxy: trust its X-Forwarded-For hop
+os.environ.setdefault("TRUSTED_PROXY_HOPS", "1")
+
+wsgi_app = "wsgi:app"
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", str(2 * (os.cpu_count() or 1) + 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# an availability stream holds a thread for up to a minute; at most half of
+# each worker's threads may do so, the rest keep serving bookings
+os.environ.setdefault("SSE_MAX_STREAMS", str(max(1, threads // 2)))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Master, once per deploy: bring the schema up to date and seed default accounts."""
+    if not server.cfg.preload_app:
+        # keep app imports out of the master so every worker loads its own
+        subprocess.run([sys.executable, "-m", "flask", "--app", "app", "db", "upgrade"], check=True)
+        return
+
+    from extensions import dispose_pools
+    from migrations import get_schema_version, upgrade_database, seed_database
+    from passwords import shutdown_hashers
+
+    # on a stale schema the preloaded app has logged a warning and answers
+    # 503 until this upgrade lands; each worker's first request sees it done
+    app = server.app.wsgi()
+    app = getattr(app, "admin_app", app)    # HostDispatcher: either side's app will do
+    with app.app_context():
+        before = get_schema_version()
+        applied = upgrade_database()
+        seed_database()
+    if applied:
+        server.log.info("Upgraded schema %s -> %s", before, applied[-1])
+
+    # nothing the master opened may be inherited by the workers
+    dispose_pools()
+    shutdown_hashers(wait=True)
+    # objects that exist now are never collected; keeping the collector off
+    # them stops it from touching (and so un-sharing) their pages in workers
+    gc.freeze()
+
+
+def pre_fork(server, worker):
+    worker.spawned_at = time.perf_counter()
+
+
+def post_fork(server, worker):
+    """New worker: drop the master's pool registries; each worker opens its own lazily."""
+    from extensions import reset_pools
+    from passwords import reset_hashers
+
+    reset_pools()
+    reset_hashers()
+
+
+def post_worker_init(worker):
+    worker.log.info("Worker %s ready in %.0f ms", worker.pid, (time.perf_counter() - worker.spawned_at) * 1000)
@@ -0,0 +1,150 @@
+"""
+Baseline schema: everything create_app() used to build on every boot.
+
+Written with IF NOT EXISTS / add_column_if_missing so that databases
+created before migrations existed are adopted as version 1 unchanged.
+"""
+from migrations import add_column_if_missing
+
+
+def upgrade(db):
+    # ---------------- ADMINS ----------------
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS admins (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            nickname TEXT,
+            email TEXT UNIQUE NOT NULL,
+            role TEXT DEFAULT 'admin',
+            password TEXT NOT NULL,
+            profile_picture TEXT,
+            created_at INTEGER DEFAULT (strftime('%s','now'))
+        )
+    """)
+
+    # ---------------- STUDENTS ----------------
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            matric_no TEXT UNIQUE NOT NULL,
+            full_name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    add_column_if_missing(db, "students", "profile_pic", "TEXT")
+    add_column_if_missing(db, "students", "department", "TEXT")
+
+    # ---------------- PASSWORD RESETS ----------------
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS password_resets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            code TEXT NOT NULL,
+            expires_at INTEGER NOT NULL
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS student_password_resets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            token TEXT UNIQUE NOT NULL,
+            expires_at TEXT NOT NULL,
+            used INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # ---------------- HOSTELS / ROOMS / BUNKS ----------------
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS hostels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            gender TEXT,
+            faculty TEXT,
+            created_at INTEGER,
+            image TEXT
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS rooms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hostel_id INTEGER NOT NULL,
+            room_number TEXT NOT NULL,
+            type TEXT,
+            capacity INTEGER DEFAULT 1,
+            FOREIGN KEY(hostel_id) REFERENCES hostels(id)
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS bunks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_id INTEGER NOT NULL,
+            bunk_label TEXT NOT NULL,
+            occupied INTEGER DEFAULT 0,
+            FOREIGN KEY(room_id) REFERENCES rooms(id)
+        )
+    """)
+    add_column_if_missing(db, "bunks", "occupied_by", "INTEGER")
+
+    # ---------------- REQUESTS ----------------
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS room_swap_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            current_room_id INTEGER NOT NULL,
+            requested_room_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at INTEGER DEFAULT (strftime('%s','now')),
+            decided_at INTEGER
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS room_swap_details (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            swap_request_id INTEGER NOT NULL UNIQUE,
+            requested_bunk_id INTEGER NOT NULL,
+            reason TEXT,
+            created_at INTEGER DEFAULT (strftime('%s','now')),
+            FOREIGN KEY(swap_request_id) REFERENCES room_swap_requests(id)
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS cancellation_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            room_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'pending',      -- pending|approved|rejected
+            created_at INTEGER DEFAULT (strftime('%s','now')),
+            decided_at INTEGER
+        )
+    """)
+
+    # ---------------- BOOKINGS ----------------
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            hostel_id INTEGER NOT NULL,
+            room_id INTEGER NOT NULL,
+            bunk_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'active',   -- active | cancelled | completed
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # ---------------- RATINGS ----------------
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS ratings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            hostel_id INTEGER NOT NULL,
+            room_id INTEGER,
+            rating INTEGER NOT NULL CHECK (rating >= 1 AND rating <= 5),
+            comment TEXT,
+            created_at INTEGER DEFAULT (strftime('%s','now')),
+            updated_at INTEGER
+        )
+    """)
@@ -0,0 +1,37 @@
+"""
+Secondary indexes for the hot lookups in models/ and routes/.
+
+Every per-student lookup (active booking, current allocation, pending
+requests, notifications, ratings), the availability dropdowns, the
+roommates query and the admin pending counts were full table scans.
+"""
+
+INDEXES = [
+    # student_has_active_booking, get_student_current_allocation, rating allocation ids
+    "CREATE INDEX IF NOT EXISTS idx_bookings_student_status ON bookings(student_id, status)",
+    # get_rooms_by_hostel (ordered by room_number), hostel listing, manage_hostel
+    "CREATE INDEX IF NOT EXISTS idx_rooms_hostel_number ON rooms(hostel_id, room_number)",
+    # get_available_bunks_by_room, free-bunk counts, roommates by room
+    "CREATE INDEX IF NOT EXISTS idx_bunks_room_occupied ON bunks(room_id, occupied)",
+    # "which bunk does this student hold" (allocation fallback, cancellation/swap room lookup)
+    "CREATE INDEX IF NOT EXISTS idx_bunks_occupied_by ON bunks(occupied_by) WHERE occupied = 1",
+    # rating summaries + a student's own ratings
+    "CREATE INDEX IF NOT EXISTS idx_ratings_hostel ON ratings(hostel_id)",
+    "CREATE INDEX IF NOT EXISTS idx_ratings_room ON ratings(room_id) WHERE room_id IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_ratings_student ON ratings(student_id)",
+    # per-student request history / pending checks / notifications
+    "CREATE INDEX IF NOT EXISTS idx_cancellation_student_status ON cancellation_requests(student_id, status)",
+    "CREATE INDEX IF NOT EXISTS idx_swap_student_status ON room_swap_requests(student_id, status)",
+    # admin queues: pending counts and newest-first listings
+    "CREATE INDEX IF NOT EXISTS idx_cancellation_status_created ON cancellation_requests(status, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_swap_status_created ON room_swap_requests(status, created_at)",
+    # admin forgot/reset password
+    "CREATE INDEX IF NOT EXISTS idx_password_resets_email ON password_resets(email)",
+]
+
+
+def upgrade(db):
+    for statement in INDEXES:
+        db.execute(statement)
+    # fresh statistics so the planner actually picks the new indexes
+    db.execute("ANALYZE")
@@ -0,0 +1,113 @@
+"""
+Maintained free/total bunk counters on rooms and hostels.
+
+The counters are kept by triggers on bunks (and rooms), so every write
+path - booking, swap/cancellation approval, add_bunk - updates them in
+the same transaction without having to remember to. Drift can be
+checked and repaired with `flask recount-occupancy`.
+"""
+from migrations import add_column_if_missing
+
+# a bunk counts as free when occupied is 0 or NULL
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_bunks_counters_insert AFTER INSERT ON bunks
+    BEGIN
+        UPDATE rooms
+        SET total_bunks = total_bunks + 1,
+            free_bunks = free_bunks + (COALESCE(NEW.occupied, 0) = 0)
+        WHERE id = NEW.room_id;
+
+        UPDATE hostels
+        SET total_bunks = total_bunks + 1,
+            free_bunks = free_bunks + (COALESCE(NEW.occupied, 0) = 0)
+        WHERE id = (SELECT hostel_id FROM rooms WHERE id = NEW.room_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_bunks_counters_delete AFTER DELETE ON bunks
+    BEGIN
+        UPDATE rooms
+        SET total_bunks = total_bunks - 1,
+            free_bunks = free_bunks - (COALESCE(OLD.occupied, 0) = 0)
+        WHERE id = OLD.room_id;
+
+        UPDATE hostels
+        SET total_bunks = total_bunks - 1,
+            free_bunks = free_bunks - (COALESCE(OLD.occupied, 0) = 0)
+        WHERE id = (SELECT hostel_id FROM rooms WHERE id = OLD.room_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_bunks_counters_update AFTER UPDATE OF occupied, room_id ON bunks
+    WHEN (COALESCE(OLD.occupied, 0) = 0) != (COALESCE(NEW.occupied, 0) = 0)
+      OR OLD.room_id != NEW.room_id
+    BEGIN
+        UPDATE rooms
+        SET total_bunks = total_bunks - 1,
+            free_bunks = free_bunks - (COALESCE(OLD.occupied, 0) = 0)
+        WHERE id = OLD.room_id;
+
+        UPDATE hostels
+        SET total_bunks = total_bunks - 1,
+            free_bunks = free_bunks - (COALESCE(OLD.occupied, 0) = 0)
+        WHERE id = (SELECT hostel_id FROM rooms WHERE id = OLD.room_id);
+
+        UPDATE rooms
+        SET total_bunks = total_bunks + 1,
+            free_bunks = free_bunks + (COALESCE(NEW.occupied, 0) = 0)
+        WHERE id = NEW.room_id;
+
+        UPDATE hostels
+        SET total_bunks = total_bunks + 1,
+            free_bunks = free_bunks + (COALESCE(NEW.occupied, 0) = 0)
+        WHERE id = (SELECT hostel_id FROM rooms WHERE id = NEW.room_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_rooms_counters_move AFTER UPDATE OF hostel_id ON rooms
+    WHEN OLD.hostel_id != NEW.hostel_id
+    BEGIN
+        UPDATE hostels
+        SET total_bunks = total_bunks - OLD.total_bunks,
+            free_bunks = free_bunks - OLD.free_bunks
+        WHERE id = OLD.hostel_id;
+
+        UPDATE hostels
+        SET total_bunks = total_bunks + NEW.total_bunks,
+            free_bunks = free_bunks + NEW.free_bunks
+        WHERE id = NEW.hostel_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_rooms_counters_delete AFTER DELETE ON rooms
+    BEGIN
+        UPDATE hostels
+        SET total_bunks = total_bunks - OLD.total_bunks,
+            free_bunks = free_bunks - OLD.free_bunks
+        WHERE id = OLD.hostel_id;
+    END
+    """,
+]
+
+
+def upgrade(db):
+    for table in ("rooms", "hostels"):
+        add_column_if_missing(db, table, "total_bunks", "INTEGER NOT NULL DEFAULT 0")
+        add_column_if_missing(db, table, "free_bunks", "INTEGER NOT NULL DEFAULT 0")
+
+    # backfill from the current bunks
+    db.execute("""
+        UPDATE rooms
+        SET total_bunks = (SELECT COUNT(*) FROM bunks b WHERE b.room_id = rooms.id),
+            free_bunks = (SELECT COUNT(*) FROM bunks b
+                          WHERE b.room_id = rooms.id AND COALESCE(b.occupied, 0) = 0)
+    """)
+    db.execute("""
+        UPDATE hostels
+        SET total_bunks = (SELECT COALESCE(SUM(total_bunks), 0) FROM rooms r WHERE r.hostel_id = hostels.id),
+            free_bunks = (SELECT COALESCE(SUM(free_bunks), 0) FROM rooms r WHERE r.hostel_id = hostels.id)
+    """)
+
+    for statement in TRIGGERS:
+        db.execute(statement)
@@ -0,0 +1,24 @@
+"""
+Enforce "one active booking per student" in the database.
+
+Older duplicate active bookings (possible under the previous
+check-then-insert flow) are closed as 'cancelled', keeping each
+student's newest one, before the unique partial index is created.
+"""
+
+
+def upgrade(db):
+    db.execute("""
+        UPDATE bookings
+        SET status = 'cancelled'
+        WHERE status = 'active'
+          AND id NOT IN (
+              SELECT MAX(id) FROM bookings
+              WHERE status = 'active'
+              GROUP BY student_id
+          )
+    """)
+    db.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_bookings_one_active
+        ON bookings(student_id) WHERE status = 'active'
+    """)
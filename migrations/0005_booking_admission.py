@@ -0,0 +1,27 @@
+"""
+Shared state for the booking-rush admission controller.
+
+booking_queue holds one ticket per waiting/admitted student; the single
+booking_admission row is the admission frontier (every ticket number at
+or below admitted_through may book). Both live in SQLite so all gunicorn
+workers see the same queue.
+"""
+
+
+def upgrade(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS booking_queue (
+            ticket INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL UNIQUE,
+            issued_at INTEGER NOT NULL,
+            admitted_at INTEGER
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS booking_admission (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            admitted_through INTEGER NOT NULL DEFAULT 0,
+            last_tick REAL NOT NULL DEFAULT 0
+        )
+    """)
+    db.execute("INSERT OR IGNORE INTO booking_admission (id) VALUES (1)")
@@ -0,0 +1,61 @@
+"""
+Per-student notification counters.
+
+pending = the student's swap + cancellation requests still awaiting a
+decision; unread = decisions the student has not seen yet. Triggers on
+both request tables keep the row current on request creation and admin
+decision, and bump version on every change.
+"""
+
+TRIGGERS = []
+for table in ("cancellation_requests", "room_swap_requests"):
+    TRIGGERS.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_notify_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO student_notification_counters (student_id, pending, unread, version)
+            VALUES (NEW.student_id, (COALESCE(NEW.status, 'pending') = 'pending'), 0, 1)
+            ON CONFLICT(student_id) DO UPDATE SET
+                pending = pending + excluded.pending,
+                version = version + 1;
+        END
+    """)
+    TRIGGERS.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_notify_status AFTER UPDATE OF status ON {table}
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE student_notification_counters
+            SET pending = pending
+                          - (COALESCE(OLD.status, 'pending') = 'pending')
+                          + (COALESCE(NEW.status, 'pending') = 'pending'),
+                unread = unread
+                          + (COALESCE(OLD.status, 'pending') = 'pending'
+                             AND COALESCE(NEW.status, 'pending') != 'pending'),
+                version = version + 1
+            WHERE student_id = NEW.student_id;
+        END
+    """)
+
+
+def upgrade(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS student_notification_counters (
+            student_id INTEGER PRIMARY KEY,
+            pending INTEGER NOT NULL DEFAULT 0,
+            unread INTEGER NOT NULL DEFAULT 0,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    db.execute("""
+        INSERT OR REPLACE INTO student_notification_counters (student_id, pending, unread, version)
+        SELECT student_id, SUM(COALESCE(status, 'pending') = 'pending'), 0, 1
+        FROM (
+            SELECT student_id, status FROM cancellation_requests
+            UNION ALL
+            SELECT student_id, status FROM room_swap_requests
+        )
+        GROUP BY student_id
+    """)
+
+    for statement in TRIGGERS:
+        db.execute(statement)
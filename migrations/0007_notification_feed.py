@@ -0,0 +1,29 @@
+"""
+Index-backed, SQL-sorted notification feed.
+
+Request timestamps are normalized to unix integers (legacy rows could
+hold SQLite datetime text), so COALESCE(decided_at, created_at) orders
+correctly, and each request table gets an index on
+(student_id, event time, id) for keyset pagination.
+"""
+
+TABLES = ("cancellation_requests", "room_swap_requests")
+
+
+def upgrade(db):
+    for table in TABLES:
+        for column in ("created_at", "decided_at"):
+            db.execute(f"""
+                UPDATE {table}
+                SET {column} = CAST(strftime('%s', {column}) AS INTEGER)
+                WHERE typeof({column}) = 'text' AND strftime('%s', {column}) IS NOT NULL
+            """)
+
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cancellation_student_event
+        ON cancellation_requests(student_id, COALESCE(decided_at, created_at), id)
+    """)
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_swap_student_event
+        ON room_swap_requests(student_id, COALESCE(decided_at, created_at), id)
+    """)
@@ -0,0 +1,50 @@
+"""
+Occupancy event log for the live availability stream.
+
+A trigger on bunks appends one row whenever a bunk becomes taken or free
+(or a new bunk is added), so booking, swap and cancellation approvals
+all feed the stream without call-site changes. The log prunes itself:
+every 500th event deletes entries older than an hour.
+"""
+
+
+def upgrade(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS occupancy_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            hostel_id INTEGER NOT NULL,
+            room_id INTEGER NOT NULL,
+            bunk_id INTEGER NOT NULL,
+            occupied INTEGER NOT NULL,
+            created_at INTEGER NOT NULL DEFAULT (strftime('%s','now'))
+        )
+    """)
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_occupancy_events_hostel
+        ON occupancy_events(hostel_id, id)
+    """)
+
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_bunks_occupancy_event_update AFTER UPDATE OF occupied ON bunks
+        WHEN (COALESCE(OLD.occupied, 0) = 0) != (COALESCE(NEW.occupied, 0) = 0)
+        BEGIN
+            INSERT INTO occupancy_events (hostel_id, room_id, bunk_id, occupied)
+            SELECT hostel_id, NEW.room_id, NEW.id, COALESCE(NEW.occupied, 0) != 0
+            FROM rooms WHERE id = NEW.room_id;
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_bunks_occupancy_event_insert AFTER INSERT ON bunks
+        BEGIN
+            INSERT INTO occupancy_events (hostel_id, room_id, bunk_id, occupied)
+            SELECT hostel_id, NEW.room_id, NEW.id, COALESCE(NEW.occupied, 0) != 0
+            FROM rooms WHERE id = NEW.room_id;
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_occupancy_events_prune AFTER INSERT ON occupancy_events
+        WHEN NEW.id % 500 = 0
+        BEGIN
+            DELETE FROM occupancy_events WHERE created_at < NEW.created_at - 3600;
+        END
+    """)
@@ -0,0 +1,25 @@
+"""
+Shared login limiter state.
+
+One row per (scope, key): a student matric_no, an admin email or a client
+IP. It holds a two-bucket sliding window of attempts plus a
+consecutive-failure count and lockout deadline, so every gunicorn worker
+enforces the same limits.
+"""
+
+
+def upgrade(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS login_throttle (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            window_start INTEGER NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            prev_hits INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0,
+            locked_until REAL NOT NULL DEFAULT 0,
+            last_seen REAL NOT NULL,
+            PRIMARY KEY (scope, key)
+        ) WITHOUT ROWID
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_login_throttle_last_seen ON login_throttle(last_seen)")
@@ -0,0 +1,48 @@
+"""
+Precomputed rating aggregates.
+
+One row per rated hostel (every rating for that hostel, room ratings
+included) and per rated room: count, sum and a 1-5 star histogram.
+Rating summaries and leaderboards read these rows instead of scanning
+ratings. Existing ratings are backfilled here.
+"""
+
+
+def upgrade(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS rating_aggregates (
+            scope TEXT NOT NULL CHECK (scope IN ('hostel', 'room')),
+            target_id INTEGER NOT NULL,
+            hostel_id INTEGER NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            sum INTEGER NOT NULL DEFAULT 0,
+            r1 INTEGER NOT NULL DEFAULT 0,
+            r2 INTEGER NOT NULL DEFAULT 0,
+            r3 INTEGER NOT NULL DEFAULT 0,
+            r4 INTEGER NOT NULL DEFAULT 0,
+            r5 INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, target_id)
+        ) WITHOUT ROWID
+    """)
+    # "top rooms in hostel X" and "hostels by average"
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_rating_aggregates_hostel
+        ON rating_aggregates(scope, hostel_id)
+    """)
+
+    db.execute("DELETE FROM rating_aggregates")
+    db.execute("""
+        INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+        SELECT 'hostel', hostel_id, hostel_id, COUNT(*), SUM(rating),
+               SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5)
+        FROM ratings
+        GROUP BY hostel_id
+    """)
+    db.execute("""
+        INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+        SELECT 'room', room_id, MIN(hostel_id), COUNT(*), SUM(rating),
+               SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5)
+        FROM ratings
+        WHERE room_id IS NOT NULL
+        GROUP BY room_id
+    """)
@@ -0,0 +1,116 @@
+"""
+Single-statement rating upsert.
+
+A unique expression index over (student_id, hostel_id, IFNULL(room_id, 0))
+gives upsert_rating an indexable conflict target for
+INSERT ... ON CONFLICT DO UPDATE. Older duplicate rows (possible under
+the previous select-then-write flow) are removed first; each student
+keeps their newest rating per target.
+
+rating_aggregates maintenance moves from upsert_rating into triggers, so
+the single-row and batch upserts both keep the aggregates in the same
+statement. The aggregates are then rebuilt to match the de-duplicated
+ratings.
+"""
+
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ratings_aggregates_insert AFTER INSERT ON ratings
+    BEGIN
+        INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+        VALUES ('hostel', NEW.hostel_id, NEW.hostel_id, 1, NEW.rating,
+                NEW.rating = 1, NEW.rating = 2, NEW.rating = 3, NEW.rating = 4, NEW.rating = 5)
+        ON CONFLICT(scope, target_id) DO UPDATE SET
+            count = count + 1, sum = sum + excluded.sum,
+            r1 = r1 + excluded.r1, r2 = r2 + excluded.r2, r3 = r3 + excluded.r3,
+            r4 = r4 + excluded.r4, r5 = r5 + excluded.r5;
+
+        INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+        SELECT 'room', NEW.room_id, NEW.hostel_id, 1, NEW.rating,
+               NEW.rating = 1, NEW.rating = 2, NEW.rating = 3, NEW.rating = 4, NEW.rating = 5
+        WHERE NEW.room_id IS NOT NULL
+        ON CONFLICT(scope, target_id) DO UPDATE SET
+            count = count + 1, sum = sum + excluded.sum,
+            r1 = r1 + excluded.r1, r2 = r2 + excluded.r2, r3 = r3 + excluded.r3,
+            r4 = r4 + excluded.r4, r5 = r5 + excluded.r5;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ratings_aggregates_delete AFTER DELETE ON ratings
+    BEGIN
+        UPDATE rating_aggregates
+        SET count = count - 1, sum = sum - OLD.rating,
+            r1 = r1 - (OLD.rating = 1), r2 = r2 - (OLD.rating = 2), r3 = r3 - (OLD.rating = 3),
+            r4 = r4 - (OLD.rating = 4), r5 = r5 - (OLD.rating = 5)
+        WHERE (scope = 'hostel' AND target_id = OLD.hostel_id)
+           OR (scope = 'room' AND target_id = OLD.room_id);
+    END
+    """,
+    # an update is "remove OLD, add NEW", which also covers a rating moving target
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_ratings_aggregates_update
+    AFTER UPDATE OF rating, hostel_id, room_id ON ratings
+    WHEN OLD.rating IS NOT NEW.rating
+      OR OLD.hostel_id IS NOT NEW.hostel_id
+      OR OLD.room_id IS NOT NEW.room_id
+    BEGIN
+        UPDATE rating_aggregates
+        SET count = count - 1, sum = sum - OLD.rating,
+            r1 = r1 - (OLD.rating = 1), r2 = r2 - (OLD.rating = 2), r3 = r3 - (OLD.rating = 3),
+            r4 = r4 - (OLD.rating = 4), r5 = r5 - (OLD.rating = 5)
+        WHERE (scope = 'hostel' AND target_id = OLD.hostel_id)
+           OR (scope = 'room' AND target_id = OLD.room_id);
+
+        INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+        VALUES ('hostel', NEW.hostel_id, NEW.hostel_id, 1, NEW.rating,
+                NEW.rating = 1, NEW.rating = 2, NEW.rating = 3, NEW.rating = 4, NEW.rating = 5)
+        ON CONFLICT(scope, target_id) DO UPDATE SET
+            count = count + 1, sum = sum + excluded.sum,
+            r1 = r1 + excluded.r1, r2 = r2 + excluded.r2, r3 = r3 + excluded.r3,
+            r4 = r4 + excluded.r4, r5 = r5 + excluded.r5;
+
+        INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+        SELECT 'room', NEW.room_id, NEW.hostel_id, 1, NEW.rating,
+               NEW.rating = 1, NEW.rating = 2, NEW.rating = 3, NEW.rating = 4, NEW.rating = 5
+        WHERE NEW.room_id IS NOT NULL
+        ON CONFLICT(scope, target_id) DO UPDATE SET
+            count = count + 1, sum = sum + excluded.sum,
+            r1 = r1 + excluded.r1, r2 = r2 + excluded.r2, r3 = r3 + excluded.r3,
+            r4 = r4 + excluded.r4, r5 = r5 + excluded.r5;
+    END
+    """,
+]
+
+
+def upgrade(db):
+    db.execute("""
+        DELETE FROM ratings
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM ratings
+            GROUP BY student_id, hostel_id, IFNULL(room_id, 0)
+        )
+    """)
+    db.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_ratings_student_target
+        ON ratings(student_id, hostel_id, IFNULL(room_id, 0))
+    """)
+
+    for sql in TRIGGERS:
+        db.execute(sql)
+
+    db.execute("DELETE FROM rating_aggregates")
+    db.execute("""
+        INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+        SELECT 'hostel', hostel_id, hostel_id, COUNT(*), SUM(rating),
+               SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5)
+        FROM ratings
+        GROUP BY hostel_id
+    """)
+    db.execute("""
+        INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+        SELECT 'room', room_id, MIN(hostel_id), COUNT(*), SUM(rating),
+               SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5)
+        FROM ratings
+        WHERE room_id IS NOT NULL
+        GROUP BY room_id
+    """)
@@ -0,0 +1,13 @@
+"""
+Student placement attributes for the auto-allocation engine.
+
+students.gender and students.faculty are matched against hostels.gender
+and hostels.faculty; students.department (already present) is used to
+keep roommates from the same department together.
+"""
+from migrations import add_column_if_missing
+
+
+def upgrade(db):
+    add_column_if_missing(db, "students", "gender", "TEXT")
+    add_column_if_missing(db, "students", "faculty", "TEXT")
@@ -0,0 +1,142 @@
+"""
+Allocation ledger and the current_allocations read model.
+
+allocation_ledger gets one row per book / move / release, whatever the
+path (student booking, swap approval, swap cycle, cancellation,
+auto-allocation). current_allocations holds one row per housed student,
+keyed by student_id, with the hostel/room/bunk names copied in, so
+"where does this student live" is a single primary-key read.
+
+Before building them, bunks and bookings are reconciled (bunks win, as
+they are what the counters and availability already show):
+  - a student holding several bunks keeps the booked one (else the lowest id);
+  - an active booking is pointed at the bunk the student actually holds;
+  - a bunk holder without an active booking gets one;
+  - an active booking whose bunk is free re-occupies it, and one whose
+    bunk is held by someone else is cancelled.
+"""
+
+
+def upgrade(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS allocation_ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            action TEXT NOT NULL CHECK (action IN ('book', 'move', 'release')),
+            hostel_id INTEGER,
+            room_id INTEGER,
+            bunk_id INTEGER,
+            from_bunk_id INTEGER,
+            source TEXT NOT NULL,
+            ref_id INTEGER,
+            created_at INTEGER NOT NULL DEFAULT (strftime('%s','now'))
+        )
+    """)
+    db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_allocation_ledger_student
+        ON allocation_ledger(student_id, id)
+    """)
+
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS current_allocations (
+            student_id INTEGER PRIMARY KEY,
+            booking_id INTEGER,
+            hostel_id INTEGER NOT NULL,
+            room_id INTEGER NOT NULL,
+            bunk_id INTEGER NOT NULL UNIQUE,
+            hostel_name TEXT,
+            room_number TEXT,
+            bunk_label TEXT,
+            allocated_at INTEGER NOT NULL DEFAULT (strftime('%s','now'))
+        )
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_current_allocations_room ON current_allocations(room_id)")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_current_allocations_hostel ON current_allocations(hostel_id)")
+
+    # keep the copied names in step with renames
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_hostels_name_allocations AFTER UPDATE OF name ON hostels
+        BEGIN
+            UPDATE current_allocations SET hostel_name = NEW.name WHERE hostel_id = NEW.id;
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_rooms_number_allocations AFTER UPDATE OF room_number ON rooms
+        BEGIN
+            UPDATE current_allocations SET room_number = NEW.room_number WHERE room_id = NEW.id;
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_bunks_label_allocations AFTER UPDATE OF bunk_label ON bunks
+        BEGIN
+            UPDATE current_allocations SET bunk_label = NEW.bunk_label WHERE bunk_id = NEW.id;
+        END
+    """)
+
+    # ---------- reconcile bunks and bookings ----------
+    db.execute("""
+        UPDATE bunks SET occupied = 0, occupied_by = NULL
+        WHERE occupied = 1 AND occupied_by IS NOT NULL
+          AND id != (
+              SELECT COALESCE(
+                  (SELECT b.bunk_id FROM bookings b
+                   JOIN bunks k2 ON k2.id = b.bunk_id
+                   WHERE b.student_id = bunks.occupied_by AND b.status = 'active'
+                     AND k2.occupied = 1 AND k2.occupied_by = b.student_id),
+                  (SELECT MIN(k3.id) FROM bunks k3 WHERE k3.occupied = 1 AND k3.occupied_by = bunks.occupied_by)
+              )
+          )
+    """)
+    db.execute("""
+        UPDATE bookings
+        SET bunk_id = k.id, room_id = k.room_id, hostel_id = r.hostel_id
+        FROM bunks k JOIN rooms r ON r.id = k.room_id
+        WHERE bookings.status = 'active'
+          AND k.occupied = 1 AND k.occupied_by = bookings.student_id
+          AND bookings.bunk_id != k.id
+    """)
+    db.execute("""
+        INSERT INTO bookings (student_id, hostel_id, room_id, bunk_id, status)
+        SELECT k.occupied_by, r.hostel_id, k.room_id, k.id, 'active'
+        FROM bunks k JOIN rooms r ON r.id = k.room_id
+        WHERE k.occupied = 1 AND k.occupied_by IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM bookings b WHERE b.student_id = k.occupied_by AND b.status = 'active')
+    """)
+    db.execute("""
+        UPDATE bunks SET occupied = 1, occupied_by = (
+            SELECT b.student_id FROM bookings b WHERE b.bunk_id = bunks.id AND b.status = 'active'
+            ORDER BY b.id DESC LIMIT 1
+        )
+        WHERE COALESCE(occupied, 0) = 0
+          AND id IN (
+              SELECT b.bunk_id FROM bookings b
+              WHERE b.status = 'active'
+                AND NOT EXISTS (SELECT 1 FROM bunks k WHERE k.occupied = 1 AND k.occupied_by = b.student_id)
+          )
+    """)
+    db.execute("""
+        UPDATE bookings SET status = 'cancelled'
+        WHERE status = 'active'
+          AND NOT EXISTS (
+              SELECT 1 FROM bunks k
+              WHERE k.id = bookings.bunk_id AND k.occupied = 1 AND k.occupied_by = bookings.student_id
+          )
+    """)
+
+    # ---------- backfill ----------
+    db.execute("DELETE FROM current_allocations")
+    db.execute("""
+        INSERT INTO current_allocations
+            (student_id, booking_id, hostel_id, room_id, bunk_id, hostel_name, room_number, bunk_label)
+        SELECT b.student_id, b.id, r.hostel_id, k.room_id, k.id, h.name, r.room_number, k.bunk_label
+        FROM bookings b
+        JOIN bunks k ON k.id = b.bunk_id
+        JOIN rooms r ON r.id = k.room_id
+        JOIN hostels h ON h.id = r.hostel_id
+        WHERE b.status = 'active'
+    """)
+    db.execute("""
+        INSERT INTO allocation_ledger (student_id, action, hostel_id, room_id, bunk_id, source, ref_id)
+        SELECT student_id, 'book', hostel_id, room_id, bunk_id, 'backfill', booking_id
+        FROM current_allocations
+    """)
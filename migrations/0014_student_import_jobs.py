@@ -0,0 +1,27 @@
+"""
+Queued bulk student imports.
+
+The upload request only saves the CSV and adds a 'queued' row here; a
+runner (a thread in the web worker, or `flask run-import-jobs`)
+claims it, imports it and stores the summary. report_expires_at is when
+the per-row report, which holds generated initial passwords, is deleted.
+"""
+
+
+def upgrade(db):
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS student_import_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT NOT NULL UNIQUE,
+            filename TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued'
+                CHECK (status IN ('queued', 'running', 'done', 'failed')),
+            summary TEXT,
+            error TEXT,
+            created_at INTEGER NOT NULL DEFAULT (strftime('%s','now')),
+            started_at INTEGER,
+            finished_at INTEGER,
+            report_expires_at INTEGER
+        )
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_student_import_jobs_status ON student_import_jobs(status, id)")
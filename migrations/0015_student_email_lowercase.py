@@ -0,0 +1,25 @@
+"""
+Student emails are unique regardless of case.
+
+Existing emails are lowercased (sign-in and password reset already look
+them up lowercased). Where two accounts differ only in case, the oldest
+keeps the address and the others get "+duplicate-<id>" in the local part,
+so an admin can find and fix them. Then a unique index on lower(email)
+stops new case-only duplicates, which the case-sensitive UNIQUE on email
+let through.
+"""
+
+
+def upgrade(db):
+    db.execute("""
+        UPDATE students
+        SET email = CASE
+            WHEN instr(email, '@') > 0 THEN
+                lower(substr(trim(email), 1, instr(trim(email), '@') - 1)) || '+duplicate-' || id
+                || lower(substr(trim(email), instr(trim(email), '@')))
+            ELSE lower(trim(email)) || '+duplicate-' || id
+        END
+        WHERE id NOT IN (SELECT MIN(id) FROM students GROUP BY lower(trim(email)))
+    """)
+    db.execute("UPDATE students SET email = lower(trim(email)) WHERE email != lower(trim(email))")
+    db.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_students_email_lower ON students(lower(email))")
@@ -0,0 +1,159 @@
+# migrations/__init__.py
+"""
+Versioned schema migrations.
+
+Each file in this folder named NNNN_description.py defines upgrade(db) and
+is applied once, in order, inside its own BEGIN IMMEDIATE transaction. The
+applied versions are recorded in the schema_version table, so booting a
+worker only has to compare one number with the newest migration on disk.
+
+Run pending migrations at deploy time with:  flask db upgrade
+"""
+import importlib.util
+import os
+import re
+import sqlite3
+
+from flask import current_app
+from extensions import get_db
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.py$")
+_migrations = None
+
+
+def discover_migrations():
+    """Returns [(version, name, module)] sorted by version (loaded once per process)."""
+    global _migrations
+    if _migrations is not None:
+        return _migrations
+
+    found = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        version, name = int(match.group(1)), match.group(2)
+        spec = importlib.util.spec_from_file_location(
+            f"migrations.m{match.group(1)}_{name}", os.path.join(MIGRATIONS_DIR, filename)
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        found.append((version, name, module))
+
+    versions = [v for v, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Duplicate migration version numbers in migrations/")
+
+    _migrations = found
+    return _migrations
+
+
+def latest_version():
+    migrations = discover_migrations()
+    return migrations[-1][0] if migrations else 0
+
+
+def get_schema_version(db=None):
+    """Current schema version (0 for a database that was never migrated). Read-only."""
+    db = db or get_db()
+    try:
+        row = db.execute("SELECT MAX(version) AS v FROM schema_version").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row["v"] or 0
+
+
+def add_column_if_missing(db, table, column, declaration):
+    """ALTER TABLE ... ADD COLUMN, skipped when the column already exists."""
+    existing = {c["name"] for c in db.execute(f"PRAGMA table_info({table})").fetchall()}
+    if column not in existing:
+        db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def upgrade_database(db=None, target=None):
+    """
+    Applies every pending migration up to target (default: newest).
+    Safe to run from several processes at once: each step re-reads the
+    version after taking the write lock. Returns the list of applied versions.
+    """
+    db = db or get_db()
+    target = latest_version() if target is None else target
+
+    if db.in_transaction:
+        db.commit()
+
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at INTEGER DEFAULT (strftime('%s','now'))
+        )
+    """)
+    db.commit()
+
+    applied = []
+    for version, name, module in discover_migrations():
+        if version > target:
+            break
+
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(db) >= version:
+                db.rollback()
+                continue
+            module.upgrade(db)
+            db.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (version, name)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        applied.append(version)
+
+    return applied
+
+
+def seed_database():
+    """Default accounts; runs after migrations, never on a plain worker boot."""
+    from models.admin_model import seed_default_admin
+    from models.student_model import seed_test_student
+
+    seed_default_admin()
+    seed_test_student()
+
+
+def init_app(app):
+    """
+    Fast boot check: compares the stored schema version with the newest
+    migration. With AUTO_MIGRATE on (local dev) a stale database is upgraded
+    in place; otherwise requests get a 503 until `flask db upgrade` has run.
+    """
+    target = latest_version()
+
+    with app.app_context():
+        current = get_schema_version()
+        if current >= target:
+            return
+
+        if app.config.get("AUTO_MIGRATE"):
+            upgrade_database()
+            seed_database()
+            return
+
+    app.logger.warning(
+        "Database schema is at version %s but the code expects %s. Run `flask db upgrade`.",
+        current, target
+    )
+    state = {"current": False}
+
+    @app.before_request
+    def _require_current_schema():
+        if state["current"]:
+            return None
+        if get_schema_version() >= target:
+            state["current"] = True
+            return None
+        return "Database upgrade in progress. Please try again shortly.", 503
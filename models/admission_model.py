@@ -0,0 +1,107 @@
+# models/admission_model.py
+import math
+import time
+
+from extensions import get_db
+
+
+# ---------- BOOKING-RUSH ADMISSION CONTROLLER ----------
+# Students take a numbered ticket; the shared frontier in booking_admission
+# advances by `rate` tickets per second, so at most `rate` new bookers per
+# second reach the booking pages however many are waiting. Writes are rare:
+# one per ticket, one when a ticket is first admitted and about one per
+# second to move the frontier; everything else is a read.
+#
+# Admission is rate-only: it does not count how many admitted students are
+# still booking, and finishing early does not let the next ticket in any
+# sooner. A student who has booked no longer passes through the queue (see
+# booking_admission_required), and an unused admission lapses after
+# BOOKING_ADMISSION_WINDOW.
+
+def _get_ticket(db, student_id):
+    return db.execute(
+        "SELECT ticket, issued_at, admitted_at FROM booking_queue WHERE student_id = ?",
+        (student_id,)
+    ).fetchone()
+
+
+def _take_ticket(db, student_id, now):
+    db.execute(
+        "INSERT OR IGNORE INTO booking_queue (student_id, issued_at) VALUES (?, ?)",
+        (student_id, now)
+    )
+    db.commit()
+    return _get_ticket(db, student_id)
+
+
+def advance_admission(db, rate, now):
+    """
+    Moves the frontier forward by rate tickets per elapsed second and returns it.
+    Idle time earns at most one second of credit (frontier <= newest ticket + rate).
+    Uses an optimistic conditional UPDATE, so concurrent workers never double-advance.
+    """
+    state = db.execute(
+        "SELECT admitted_through, last_tick FROM booking_admission WHERE id = 1"
+    ).fetchone()
+    if state is None:
+        return 0
+
+    elapsed = now - state["last_tick"]
+    if elapsed < 1.0:
+        return state["admitted_through"]
+
+    newest = db.execute("SELECT COALESCE(MAX(ticket), 0) AS t FROM booking_queue").fetchone()["t"]
+    grants = int(elapsed * rate)
+    frontier = min(state["admitted_through"] + grants, newest + rate)
+    frontier = max(frontier, state["admitted_through"])
+
+    moved = db.execute("""
+        UPDATE booking_admission
+        SET admitted_through = ?, last_tick = ?
+        WHERE id = 1 AND last_tick = ?
+    """, (frontier, now, state["last_tick"])).rowcount
+    db.commit()
+
+    if not moved:
+        # another worker advanced first; use its value
+        return db.execute(
+            "SELECT admitted_through FROM booking_admission WHERE id = 1"
+        ).fetchone()["admitted_through"]
+    return frontier
+
+
+def admission_status(student_id, rate, window_seconds):
+    """
+    Returns {"admitted", "ticket", "position", "eta_seconds"} for a student,
+    issuing a ticket on first contact. An admitted ticket is valid for
+    window_seconds; after that the student rejoins the back of the queue.
+    """
+    db = get_db()
+    now = time.time()
+
+    ticket = _get_ticket(db, student_id) or _take_ticket(db, student_id, int(now))
+
+    if ticket["admitted_at"] and now - ticket["admitted_at"] > window_seconds:
+        db.execute("DELETE FROM booking_queue WHERE student_id = ?", (student_id,))
+        db.commit()
+        ticket = _take_ticket(db, student_id, int(now))
+
+    frontier = advance_admission(db, rate, now)
+
+    if ticket["ticket"] <= frontier:
+        if not ticket["admitted_at"]:
+            db.execute(
+                "UPDATE booking_queue SET admitted_at = ? WHERE student_id = ? AND admitted_at IS NULL",
+                (int(now), student_id)
+            )
+            db.commit()
+        return {"admitted": True, "ticket": ticket["ticket"], "position": 0, "eta_seconds": 0}
+
+    position = ticket["ticket"] - frontier
+    return {
+        "admitted": False,
+        "ticket": ticket["ticket"],
+        "position": position,
+        "eta_seconds": int(math.ceil(position / float(rate))),
+    }
+
@@ -0,0 +1,201 @@
+from extensions import get_db
+from models.request_decision_model import json_ids
+
+# ---------- ALLOCATION SERVICE ----------
+# Every change to where a student lives goes through book_bunks,
+# move_students or release_students, inside the caller's transaction.
+# Each one updates bunks, bookings, the allocation_ledger and the
+# current_allocations read model together, so they cannot disagree.
+# All three are set-based (executemany / json_each), so a batch of
+# thousands costs a handful of statements.
+#
+# Conflicts (a bunk no longer free, a student no longer where the caller
+# planned) raise AllocationConflict; the caller rolls back.
+
+BOOKING = "booking"
+SWAP = "swap"
+SWAP_CYCLE = "swap_cycle"
+CANCELLATION = "cancellation"
+AUTO_ALLOCATION = "auto_allocation"
+ADMIN = "admin"
+
+
+class AllocationConflict(Exception):
+    """The bunks/bookings changed under the caller's plan; roll back."""
+
+
+def _refresh_current(db, student_ids):
+    """Rewrites the students' current_allocations rows from their active bookings."""
+    ids = json_ids(student_ids)
+    db.execute("DELETE FROM current_allocations WHERE student_id IN (SELECT value FROM json_each(?))", (ids,))
+    db.execute("""
+        INSERT INTO current_allocations
+            (student_id, booking_id, hostel_id, room_id, bunk_id, hostel_name, room_number, bunk_label)
+        SELECT b.student_id, b.id, r.hostel_id, k.room_id, k.id, h.name, r.room_number, k.bunk_label
+        FROM bookings b
+        JOIN bunks k ON k.id = b.bunk_id
+        JOIN rooms r ON r.id = k.room_id
+        JOIN hostels h ON h.id = r.hostel_id
+        WHERE b.status = 'active' AND b.student_id IN (SELECT value FROM json_each(?))
+    """, (ids,))
+
+
+def _log(db, action, rows, source):
+    """rows: (student_id, bunk_id, from_bunk_id, ref_id); hostel/room come from the bunk."""
+    db.executemany(f"""
+        INSERT INTO allocation_ledger (student_id, action, hostel_id, room_id, bunk_id, from_bunk_id, source, ref_id)
+        SELECT ?, '{action}', r.hostel_id, k.room_id, k.id, ?, ?, ?
+        FROM bunks k JOIN rooms r ON r.id = k.room_id
+        WHERE k.id = ?
+    """, [(student_id, from_bunk, source, ref_id, bunk_id) for student_id, bunk_id, from_bunk, ref_id in rows])
+
+
+def _claim(db, rows):
+    """rows: (student_id, bunk_id). Every bunk must still be free."""
+    claimed = db.executemany(
+        "UPDATE bunks SET occupied = 1, occupied_by = ? WHERE id = ? AND COALESCE(occupied, 0) = 0",
+        rows
+    ).rowcount
+    if claimed != len(rows):
+        raise AllocationConflict(f"{len(rows) - claimed} bunk(s) are no longer free")
+
+
+def book_bunks(db, bookings, source):
+    """
+    New allocations. bookings: [(student_id, bunk_id, ref_id)]; the students
+    must not be housed yet (the unique active-booking index raises
+    sqlite3.IntegrityError otherwise). Returns the new booking ids by student.
+    """
+    if not bookings:
+        return {}
+    _claim(db, [(student_id, bunk_id) for student_id, bunk_id, _ in bookings])
+    db.executemany("""
+        INSERT INTO bookings (student_id, hostel_id, room_id, bunk_id, status)
+        SELECT ?, r.hostel_id, k.room_id, k.id, 'active'
+        FROM bunks k JOIN rooms r ON r.id = k.room_id
+        WHERE k.id = ?
+    """, [(student_id, bunk_id) for student_id, bunk_id, _ in bookings])
+    _log(db, "book", [(s, b, None, ref) for s, b, ref in bookings], source)
+
+    students = [s for s, _, _ in bookings]
+    _refresh_current(db, students)
+    return {
+        r["student_id"]: r["booking_id"]
+        for r in db.execute(
+            "SELECT student_id, booking_id FROM current_allocations WHERE student_id IN (SELECT value FROM json_each(?))",
+            (json_ids(students),)
+        )
+    }
+
+
+def move_students(db, moves, source):
+    """
+    Moves housed students to other bunks. moves: [(student_id, bunk_id, ref_id)],
+    one per student. All old bunks are released before any new one is
+    claimed, so students may take each other's bunks (swap cycles).
+    """
+    if not moves:
+        return 0
+    students = [s for s, _, _ in moves]
+    current = {
+        r["student_id"]: r["bunk_id"]
+        for r in db.execute(
+            "SELECT student_id, bunk_id FROM current_allocations WHERE student_id IN (SELECT value FROM json_each(?))",
+            (json_ids(students),)
+        )
+    }
+    if len(current) != len(set(students)) or len(students) != len(set(students)):
+        raise AllocationConflict("some students have no current allocation")
+
+    released = db.executemany(
+        "UPDATE bunks SET occupied = 0, occupied_by = NULL WHERE id = ? AND occupied = 1 AND occupied_by = ?",
+        [(current[s], s) for s in students]
+    ).rowcount
+    if released != len(students):
+        raise AllocationConflict("some students no longer hold the bunk on record")
+
+    _claim(db, [(student_id, bunk_id) for student_id, bunk_id, _ in moves])
+    db.executemany("""
+        UPDATE bookings
+        SET bunk_id = ?, room_id = (SELECT room_id FROM bunks WHERE id = ?),
+            hostel_id = (SELECT r.hostel_id FROM bunks k JOIN rooms r ON r.id = k.room_id WHERE k.id = ?)
+        WHERE student_id = ? AND status = 'active'
+    """, [(bunk_id, bunk_id, bunk_id, student_id) for student_id, bunk_id, _ in moves])
+    _log(db, "move", [(s, b, current[s], ref) for s, b, ref in moves], source)
+    _refresh_current(db, students)
+    return len(moves)
+
+
+def release_students(db, student_ids, source, refs=None):
+    """
+    Frees the students' bunks and cancels their active bookings.
+    refs maps student_id -> ref_id for the ledger. Returns the set of
+    students who actually held a bunk.
+    """
+    refs = refs or {}
+    ids = json_ids(student_ids)
+    # RETURNING sees the new (NULL) occupied_by, so read the holders first
+    freed = {
+        r["occupied_by"]: r["id"]
+        for r in db.execute("""
+            SELECT id, occupied_by FROM bunks
+            WHERE occupied = 1 AND occupied_by IN (SELECT value FROM json_each(?))
+        """, (ids,))
+    }
+    db.executemany("UPDATE bunks SET occupied = 0, occupied_by = NULL WHERE id = ?",
+                   [(bunk,) for bunk in freed.values()])
+    db.execute("""
+        UPDATE bookings SET status = 'cancelled'
+        WHERE status = 'active' AND student_id IN (SELECT value FROM json_each(?))
+    """, (ids,))
+    _log(db, "release", [(s, bunk, None, refs.get(s)) for s, bunk in freed.items()], source)
+    db.execute("DELETE FROM current_allocations WHERE student_id IN (SELECT value FROM json_each(?))", (ids,))
+    return set(freed)
+
+
+# ---------- READS ----------
+
+def get_current_allocation(student_id):
+    """The student's allocation row (hostel/room/bunk ids and names) or None."""
+    db = get_db()
+    return db.execute("SELECT * FROM current_allocations WHERE student_id = ?", (student_id,)).fetchone()
+
+
+def get_allocation_history(student_id, limit=50):
+    db = get_db()
+    return db.execute("""
+        SELECT * FROM allocation_ledger WHERE student_id = ? ORDER BY id DESC LIMIT ?
+    """, (student_id, limit)).fetchall()
+
+
+def rebuild_current_allocations(fix=True):
+    """
+    Compares current_allocations with the active bookings.
+    Returns the student ids whose row is missing, stale or extra; with
+    fix=True those rows are rewritten in one transaction.
+    """
+    db = get_db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        drifted = [r[0] for r in db.execute("""
+            SELECT b.student_id FROM bookings b
+            JOIN bunks k ON k.id = b.bunk_id
+            JOIN rooms r ON r.id = k.room_id
+            JOIN hostels h ON h.id = r.hostel_id
+            LEFT JOIN current_allocations c ON c.student_id = b.student_id
+            WHERE b.status = 'active'
+              AND (c.student_id IS NULL OR c.booking_id IS NOT b.id OR c.bunk_id != k.id
+                   OR c.room_id != k.room_id OR c.hostel_id != r.hostel_id
+                   OR c.hostel_name IS NOT h.name OR c.room_number IS NOT r.room_number
+                   OR c.bunk_label IS NOT k.bunk_label)
+            UNION
+            SELECT c.student_id FROM current_allocations c
+            WHERE NOT EXISTS (SELECT 1 FROM bookings b WHERE b.student_id = c.student_id AND b.status = 'active')
+        """)]
+        if fix and drifted:
+            _refresh_current(db, drifted)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return drifted
@@ -0,0 +1,332 @@
+import hashlib
+import heapq
+import sqlite3
+import time
+from collections import Counter, defaultdict, deque
+
+from extensions import get_db, retry_on_busy
+from models.allocation_model import book_bunks, AllocationConflict, AUTO_ALLOCATION
+from models.request_decision_model import json_ids
+
+# ---------- BATCH AUTO-ALLOCATION ----------
+# Places every student without an active booking into a free bunk in one
+# pass, in memory:
+#   1. Hostels are served most restrictive first (faculty + gender, then
+#      gender only, then open), so open hostels are not used up by students
+#      who could have gone to a faculty hostel.
+#   2. Each hostel takes the lowest-id eligible students still waiting
+#      (first registered, first placed), merged from per-(gender, faculty)
+#      queues with a heap.
+#   3. Inside the hostel, partly filled rooms first get students of their
+#      occupants' department, then the rest are laid into rooms grouped by
+#      department, so classmates share rooms wherever the numbers allow.
+# The plan is deterministic for a given database state; its token lets the
+# commit step refuse to apply a plan that no longer matches the preview.
+
+NO_FREE_BUNK = "no_free_bunk"
+NO_MATCHING_HOSTEL = "no_matching_hostel"
+MISSING_GENDER = "missing_gender"
+
+UNPLACED_MESSAGES = {
+    NO_FREE_BUNK: "Every hostel they qualify for is full",
+    NO_MATCHING_HOSTEL: "No hostel accepts their gender/faculty",
+    MISSING_GENDER: "Gender not recorded and every hostel is single-gender",
+}
+
+
+class AllocationStale(Exception):
+    """The database changed between planning and committing."""
+
+
+def _norm(value):
+    return (value or "").strip().casefold()
+
+
+def _open_faculty(value):
+    return _norm(value) in ("", "all", "any")
+
+
+def _open_gender(value):
+    # "mixed" is what the create-hostel form stores for co-ed hostels
+    return _norm(value) in ("", "mixed", "all", "any")
+
+
+def _hostel_filters(hostel):
+    """(gender, faculty) a hostel requires; "" = open to everyone."""
+    return ("" if _open_gender(hostel["gender"]) else _norm(hostel["gender"]),
+            "" if _open_faculty(hostel["faculty"]) else _norm(hostel["faculty"]))
+
+
+def load_allocation_inputs(db=None):
+    """Returns (students, hostels, bunks) as plain tuples/dicts for the planner."""
+    db = db or get_db()
+    students = [
+        (r["id"], _norm(r["gender"]), _norm(r["faculty"]), _norm(r["department"]))
+        for r in db.execute("""
+            SELECT s.id, s.gender, s.faculty, s.department
+            FROM students s
+            WHERE NOT EXISTS (SELECT 1 FROM current_allocations a WHERE a.student_id = s.id)
+            ORDER BY s.id
+        """)
+    ]
+
+    hostels = {}
+    for r in db.execute("SELECT id, name, gender, faculty FROM hostels"):
+        gender, faculty = _hostel_filters(r)
+        hostels[r["id"]] = {"id": r["id"], "name": r["name"], "gender": gender, "faculty": faculty}
+
+    # (hostel_id, room_id, bunk_id, occupied_by or None, occupant department)
+    bunks = [
+        (r["hostel_id"], r["room_id"], r["bunk_id"], r["occupied_by"], _norm(r["department"]))
+        for r in db.execute("""
+            SELECT r.hostel_id, k.room_id, k.id AS bunk_id,
+                   CASE WHEN k.occupied = 1 THEN k.occupied_by END AS occupied_by,
+                   s.department
+            FROM rooms r
+            JOIN bunks k ON k.room_id = r.id
+            LEFT JOIN students s ON k.occupied = 1 AND s.id = k.occupied_by
+            WHERE r.free_bunks > 0
+            ORDER BY r.hostel_id, r.room_number, r.id, k.bunk_label
+        """)
+    ]
+    return students, hostels, bunks
+
+
+def plan_token(students, hostels, bunks):
+    """Fingerprint of the planner inputs; equal tokens mean an identical plan."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr(students).encode())
+    # the hostel rules decide who may go where, so a changed rule is a changed plan
+    digest.update(repr(sorted((h["id"], h["gender"], h["faculty"]) for h in hostels.values())).encode())
+    digest.update(repr([b[2:4] for b in bunks]).encode())
+    return digest.hexdigest()
+
+
+def _fill_hostel(rooms, chosen):
+    """
+    rooms: [(room_id, [free bunk ids], Counter of occupant departments)] in room order.
+    chosen: [(student_id, department)]. Returns [(student_id, room_id, bunk_id)].
+    """
+    by_dept = defaultdict(deque)
+    for student_id, dept in chosen:
+        by_dept[dept].append(student_id)
+
+    placed = []
+    leftover = []
+    # partly filled rooms: top up with the occupants' department first
+    for room_id, free, occupants in rooms:
+        free = free[::-1]   # popped from the end, so the first label goes first
+        if occupants:
+            dept = occupants.most_common(1)[0][0]
+            waiting = by_dept.get(dept) if dept else None
+            while free and waiting:
+                placed.append((waiting.popleft(), room_id, free.pop()))
+        if free:
+            leftover.append((room_id, free[::-1], bool(occupants)))
+
+    # the rest: biggest departments first, empty rooms before partly filled ones
+    order = [s for dept, ids in sorted(by_dept.items(), key=lambda kv: (-len(kv[1]), kv[0])) for s in ids]
+    slots = [(room_id, bunk) for room_id, free, partial in sorted(leftover, key=lambda r: r[2]) for bunk in free]
+    placed.extend((student_id, room_id, bunk) for student_id, (room_id, bunk) in zip(order, slots))
+    return placed
+
+
+def plan_allocation(students, hostels, bunks):
+    """
+    Pure planner. Returns a dict with assignments [(student_id, hostel_id,
+    room_id, bunk_id)], unplaced {student_id: reason} and per-hostel counts.
+    """
+    hostels = {
+        hostel_id: dict(h, gender=gender, faculty=faculty)
+        for hostel_id, h in hostels.items()
+        for gender, faculty in [_hostel_filters(h)]
+    }
+    # waiting queues per (gender, faculty), already in id order
+    queues = defaultdict(list)
+    departments = {}
+    for student_id, gender, faculty, dept in students:
+        queues[(gender, faculty)].append(student_id)
+        departments[student_id] = dept
+    heads = {key: 0 for key in queues}
+
+    rooms_by_hostel = defaultdict(dict)
+    for hostel_id, room_id, bunk_id, occupant, dept in bunks:
+        room = rooms_by_hostel[hostel_id].setdefault(room_id, ([], Counter()))
+        if occupant is None:
+            room[0].append(bunk_id)
+        elif dept:
+            room[1][dept] += 1
+
+    def restrictiveness(h):
+        return (0 if h["faculty"] else 1, 0 if h["gender"] else 1, h["id"])
+
+    assignments = []
+    per_hostel = {}
+    for hostel in sorted(hostels.values(), key=restrictiveness):
+        rooms = [(room_id, free, occ) for room_id, (free, occ) in rooms_by_hostel.get(hostel["id"], {}).items() if free]
+        capacity = sum(len(free) for _, free, _ in rooms)
+        if not capacity:
+            continue
+
+        eligible = [
+            key for key in queues
+            if (not hostel["gender"] or key[0] == hostel["gender"])
+            and (not hostel["faculty"] or key[1] == hostel["faculty"])
+        ]
+        heap = [(queues[k][heads[k]], k) for k in eligible if heads[k] < len(queues[k])]
+        heapq.heapify(heap)
+        chosen = []
+        while heap and len(chosen) < capacity:
+            student_id, key = heapq.heappop(heap)
+            chosen.append((student_id, departments[student_id]))
+            heads[key] += 1
+            if heads[key] < len(queues[key]):
+                heapq.heappush(heap, (queues[key][heads[key]], key))
+
+        if chosen:
+            placed = _fill_hostel(rooms, chosen)
+            assignments.extend((s, hostel["id"], room_id, bunk) for s, room_id, bunk in placed)
+        per_hostel[hostel["id"]] = {"name": hostel["name"], "placed": len(chosen), "free_before": capacity}
+
+    unplaced = {}
+    open_genders = {h["gender"] for h in hostels.values()}
+    for key, ids in queues.items():
+        gender, faculty = key
+        if heads[key] >= len(ids):
+            continue
+        if any((not h["gender"] or h["gender"] == gender) and (not h["faculty"] or h["faculty"] == faculty)
+               for h in hostels.values()):
+            reason = NO_FREE_BUNK
+        elif not gender and "" not in open_genders:
+            reason = MISSING_GENDER
+        else:
+            reason = NO_MATCHING_HOSTEL
+        for student_id in ids[heads[key]:]:
+            unplaced[student_id] = reason
+
+    return {"assignments": assignments, "unplaced": unplaced, "per_hostel": per_hostel}
+
+
+def _cohesion(assignments, bunks, departments):
+    """Share of placed students (with a department) rooming with someone of the same department."""
+    rooms = defaultdict(list)
+    for _, room_id, _, occupant, dept in bunks:
+        if occupant is not None and dept:
+            rooms[room_id].append(dept)
+    for student_id, _, room_id, _ in assignments:
+        if departments.get(student_id):
+            rooms[room_id].append(departments[student_id])
+
+    counted = together = 0
+    for student_id, _, room_id, _ in assignments:
+        dept = departments.get(student_id)
+        if not dept:
+            continue
+        counted += 1
+        together += rooms[room_id].count(dept) > 1
+    return round(together / counted, 3) if counted else None
+
+
+def preview_allocation(db=None):
+    """Builds the plan from the current database. Returns a summary dict including the plan."""
+    db = db or get_db()
+    started = time.perf_counter()
+    students, hostels, bunks = load_allocation_inputs(db)
+    loaded = time.perf_counter()
+    plan = plan_allocation(students, hostels, bunks)
+    planned = time.perf_counter()
+
+    departments = {s[0]: s[3] for s in students}
+    reasons = Counter(plan["unplaced"].values())
+    return {
+        "token": plan_token(students, hostels, bunks),
+        "students_waiting": len(students),
+        "free_bunks": sum(1 for b in bunks if b[3] is None),
+        "placed": len(plan["assignments"]),
+        "unplaced": dict(reasons),
+        "unplaced_students": plan["unplaced"],
+        "per_hostel": plan["per_hostel"],
+        "department_cohesion": _cohesion(plan["assignments"], bunks, departments),
+        "assignments": plan["assignments"],
+        "load_ms": round((loaded - started) * 1000, 2),
+        "plan_ms": round((planned - loaded) * 1000, 2),
+    }
+
+
+def commit_allocation(assignments):
+    """
+    Applies the assignments in a single transaction through the allocation
+    service. If any bunk was taken or any student booked meanwhile,
+    nothing is written and AllocationStale is raised.
+    """
+    db = get_db()
+    if not assignments:
+        return 0
+
+    def attempt():
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            book_bunks(db, [(student_id, bunk_id, None) for student_id, _, _, bunk_id in assignments],
+                       AUTO_ALLOCATION)
+            db.commit()
+            return len(assignments)
+        except AllocationConflict as e:
+            db.rollback()
+            raise AllocationStale(str(e))
+        except sqlite3.IntegrityError:
+            # uq_bookings_one_active: someone in the plan booked by themselves meanwhile
+            db.rollback()
+            raise AllocationStale("A student in the plan booked a bunk since the preview")
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+    return retry_on_busy(attempt)
+
+
+def run_allocation(expected_token=None):
+    """
+    Re-plans and commits. With expected_token (from a preview) the commit
+    only happens if the plan is still the one that was previewed.
+    Returns the preview dict with "committed" set.
+    """
+    result = preview_allocation()
+    if expected_token and expected_token != result["token"]:
+        raise AllocationStale("Students, bunks or hostel rules changed since the preview")
+    result["committed"] = commit_allocation(result["assignments"])
+    return result
+
+
+def describe_assignments(assignments, limit=200):
+    """Names for the first `limit` assignments, for the preview table."""
+    db = get_db()
+    sample = assignments[:limit]
+    students = {
+        r["id"]: r
+        for r in db.execute(
+            "SELECT id, full_name, matric_no, department FROM students WHERE id IN (SELECT value FROM json_each(?))",
+            (json_ids(s for s, _, _, _ in sample),)
+        )
+    }
+    bunks = {
+        r["id"]: r
+        for r in db.execute("""
+            SELECT k.id, k.bunk_label, r.room_number, h.name AS hostel_name
+            FROM bunks k
+            JOIN rooms r ON r.id = k.room_id
+            JOIN hostels h ON h.id = r.hostel_id
+            WHERE k.id IN (SELECT value FROM json_each(?))
+        """, (json_ids(b for _, _, _, b in sample),))
+    }
+    return [
+        {
+            "student": students[s]["full_name"] if s in students else f"#{s}",
+            "matric_no": students[s]["matric_no"] if s in students else "",
+            "department": (students[s]["department"] if s in students else "") or "",
+            "hostel": bunks[b]["hostel_name"] if b in bunks else "",
+            "room": bunks[b]["room_number"] if b in bunks else "",
+            "bunk": bunks[b]["bunk_label"] if b in bunks else "",
+        }
+        for s, _, _, b in sample
+    ]
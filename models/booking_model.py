@@ -1,35 +1,8 @@
-from extensions import get_db
-
-def create_booking_table():
-    db = get_db()
-    db.execute("""
-        CREATE TABLE IF NOT EXISTS bookings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            hostel_id INTEGER NOT NULL,
-            room_id INTEGER NOT NULL,
-            bunk_id INTEGER NOT NULL,
-            status TEXT NOT NULL DEFAULT 'active',   -- active | cancelled | completed
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    db.commit()
-
-
-def ensure_bunk_booking_columns():
-    """
-    Your bunks table already has: occupied (0/1), bunk_label
-    We'll optionally add occupied_by so you know who is in a bunk.
-    This does NOT touch hostel_model.py. It only alters DB schema safely.
-    """
-    db = get_db()
-    cols = db.execute("PRAGMA table_info(bunks)").fetchall()
-    existing = {c["name"] for c in cols}
-
-    if "occupied_by" not in existing:
-        db.execute("ALTER TABLE bunks ADD COLUMN occupied_by INTEGER")
-        db.commit()
-
+import sqlite3
+from collections import namedtuple
+from flask import current_app
+from extensions import get_db, retry_on_busy, is_busy_error
+from models.allocation_model import book_bunks, get_current_allocation, AllocationConflict, BOOKING
 
 # ---------- DATA FOR DROPDOWNS ----------
 def get_all_hostels():
@@ -39,12 +12,18 @@ def get_all_hostels():
 def get_rooms_by_hostel(hostel_id):
     db = get_db()
     return db.execute(
-        "SELECT id, room_number FROM rooms WHERE hostel_id = ? ORDER BY room_number",
+        "SELECT id, room_number, free_bunks FROM rooms WHERE hostel_id = ? ORDER BY room_number",
         (hostel_id,)
     ).fetchall()
 
 def get_available_bunks_by_room(room_id):
     db = get_db()
+
+    # O(1) counter check first: full rooms never touch the bunks table
+    room = db.execute("SELECT free_bunks FROM rooms WHERE id = ?", (room_id,)).fetchone()
+    if not room or room["free_bunks"] <= 0:
+        return []
+
     return db.execute("""
         SELECT id, bunk_label
         FROM bunks
@@ -56,66 +35,91 @@ def get_available_bunks_by_room(room_id):
 
 # ---------- RULE: ONE ACTIVE BOOKING PER STUDENT ----------
 def student_has_active_booking(student_id):
-    db = get_db()
-    row = db.execute("""
-        SELECT id FROM bookings
-        WHERE student_id = ? AND status = 'active'
-        ORDER BY id DESC LIMIT 1
-    """, (student_id,)).fetchone()
-    return row is not None
+    return get_current_allocation(student_id) is not None
 
 
 # ---------- BOOKING ----------
-def create_booking(student_id, hostel_id, room_id, bunk_id):
-    db = get_db()
+# A bunk is claimed through the allocation service (one conditional UPDATE)
+# under BEGIN IMMEDIATE, so two workers can never both win it; the unique
+# partial index on bookings(student_id) WHERE status='active' guards
+# "one active booking".
 
-    if student_has_active_booking(student_id):
-        return False, "You already have an active booking."
+BOOKED = "booked"
+TAKEN = "taken"
+ALREADY_BOOKED = "already_booked"
+INVALID_BUNK = "invalid_bunk"
+RETRY_EXHAUSTED = "retry_exhausted"
 
-    # confirm bunk belongs to room and is available
-    bunk = db.execute("""
-        SELECT id, occupied
-        FROM bunks
-        WHERE id = ? AND room_id = ?
-    """, (bunk_id, room_id)).fetchone()
+BookingOutcome = namedtuple("BookingOutcome", ["status", "message", "booking_id"])
+
+BOOKING_MESSAGES = {
+    BOOKED: "Booking successful!",
+    TAKEN: "That bunk was just taken. Please choose another.",
+    ALREADY_BOOKED: "You already have an active booking.",
+    INVALID_BUNK: "Invalid bunk selection.",
+    RETRY_EXHAUSTED: "The booking system is busy right now. Please try again.",
+}
 
-    if not bunk:
-        return False, "Invalid bunk selection."
 
-    if bunk["occupied"] == 1:
-        return False, "That bunk is already taken. Please choose another."
+def _outcome(status, booking_id=None):
+    return BookingOutcome(status, BOOKING_MESSAGES[status], booking_id)
+
+
+def reserve_bunk(student_id, hostel_id, room_id, bunk_id):
+    """
+    Atomically claims bunk_id for student_id and records the active booking.
+    Returns a BookingOutcome whose status is one of BOOKED, TAKEN,
+    ALREADY_BOOKED, INVALID_BUNK or RETRY_EXHAUSTED.
+    """
+    db = get_db()
+
+    # cheap indexed pre-check, avoids taking the write lock for repeat submits
+    if student_has_active_booking(student_id):
+        return _outcome(ALREADY_BOOKED)
+
+    def attempt():
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            valid = db.execute("""
+                SELECT 1
+                FROM bunks k
+                JOIN rooms r ON r.id = k.room_id
+                WHERE k.id = ? AND k.room_id = ? AND r.hostel_id = ?
+            """, (bunk_id, room_id, hostel_id)).fetchone()
+            if not valid:
+                db.rollback()
+                return _outcome(INVALID_BUNK)
+
+            booking_ids = book_bunks(db, [(student_id, bunk_id, None)], BOOKING)
+            db.commit()
+            return _outcome(BOOKED, booking_ids.get(student_id))
+
+        except AllocationConflict:
+            db.rollback()
+            return _outcome(TAKEN)
+        except sqlite3.IntegrityError:
+            # uq_bookings_one_active: a parallel request booked for this student first
+            db.rollback()
+            return _outcome(ALREADY_BOOKED)
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
 
     try:
-        db.execute("BEGIN")
-
-        # re-check inside transaction
-        still_free = db.execute(
-            "SELECT occupied FROM bunks WHERE id = ?",
-            (bunk_id,)
-        ).fetchone()
-
-        if not still_free or still_free["occupied"] == 1:
-            db.execute("ROLLBACK")
-            return False, "That bunk was just taken. Please choose another."
-
-        # create booking row
-        db.execute("""
-            INSERT INTO bookings (student_id, hostel_id, room_id, bunk_id, status)
-            VALUES (?, ?, ?, ?, 'active')
-        """, (student_id, hostel_id, room_id, bunk_id))
-
-        # mark bunk occupied
-        db.execute("""
-            UPDATE bunks
-            SET occupied = 1, occupied_by = ?
-            WHERE id = ?
-        """, (student_id, bunk_id))
-
-        db.commit()
-        return True, "Booking successful!"
-    except Exception as e:
-        db.execute("ROLLBACK")
-        return False, f"Booking failed: {str(e)}"
+        return retry_on_busy(
+            attempt,
+            attempts=current_app.config.get("BOOKING_RETRY_ATTEMPTS", 6),
+        )
+    except sqlite3.OperationalError as e:
+        if is_busy_error(e):
+            return _outcome(RETRY_EXHAUSTED)
+        raise
+
+
+def create_booking(student_id, hostel_id, room_id, bunk_id):
+    outcome = reserve_bunk(student_id, hostel_id, room_id, bunk_id)
+    return outcome.status == BOOKED, outcome.message
 
 
 def get_student_bookings(student_id):
@@ -134,64 +138,17 @@ def get_student_bookings(student_id):
     """, (student_id,)).fetchall()
 
 
-# To know student's current bunk, we can add a helper:
-from extensions import get_db
+# ---------- CURRENT ALLOCATION ----------
+# Both read the current_allocations row kept by the allocation service.
 
 def get_student_active_room_id(student_id):
-    db = get_db()
-    row = db.execute("""
-        SELECT room_id
-        FROM bookings
-        WHERE student_id = ? AND status = 'active'
-        ORDER BY id DESC LIMIT 1
-    """, (student_id,)).fetchone()
-    return row["room_id"] if row else None
-
+    allocation = get_current_allocation(student_id)
+    return allocation["room_id"] if allocation else None
 
-# store current allocation
-from extensions import get_db
 
 def get_student_current_allocation(student_id):
     """
-    Returns the student's active allocation:
-    hostel_name, room_number, bunk_label, and IDs needed.
-    Uses bookings table primarily, fallback to bunks.occupied_by if needed.
+    Returns the student's active allocation: booking_id, hostel_id/name,
+    room_id/number and bunk_id/label, or None.
     """
-    db = get_db()
-
-    # 1) Prefer bookings table (your flow)
-    row = db.execute("""
-        SELECT b.id AS booking_id,
-               h.name AS hostel_name,
-               r.id AS room_id,
-               r.room_number,
-               k.id AS bunk_id,
-               k.bunk_label
-        FROM bookings b
-        JOIN hostels h ON h.id = b.hostel_id
-        JOIN rooms r   ON r.id = b.room_id
-        JOIN bunks k   ON k.id = b.bunk_id
-        WHERE b.student_id = ? AND b.status = 'active'
-        ORDER BY b.id DESC
-        LIMIT 1
-    """, (student_id,)).fetchone()
-
-    if row:
-        return row
-
-    # 2) Fallback: find bunk by occupied_by (if booking record missing)
-    row = db.execute("""
-        SELECT NULL AS booking_id,
-               h.name AS hostel_name,
-               r.id AS room_id,
-               r.room_number,
-               k.id AS bunk_id,
-               k.bunk_label
-        FROM bunks k
-        JOIN rooms r ON r.id = k.room_id
-        JOIN hostels h ON h.id = r.hostel_id
-        WHERE k.occupied = 1 AND k.occupied_by = ?
-        LIMIT 1
-    """, (student_id,)).fetchone()
-
-    return row
+    return get_current_allocation(student_id)
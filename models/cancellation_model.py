@@ -1,15 +1,69 @@
-from extensions import get_db
+import time
 
-def create_cancellation_table():
+from extensions import get_db, retry_on_busy
+from models.allocation_model import release_students, CANCELLATION
+from models.request_decision_model import (
+    APPROVED, REJECTED, SKIPPED, DecisionOutcome, json_ids,
+)
+
+
+# ---------- BULK CANCELLATION DECISIONS ----------
+
+def decide_cancellation_requests(request_ids, action):
+    """
+    Approves or rejects many cancellation requests in one transaction.
+    Approval releases every affected student through the allocation
+    service (bunk freed, booking cancelled, ledger entry) set-wise.
+    Returns (outcomes in id order, decided student ids).
+    """
     db = get_db()
-    db.execute("""
-        CREATE TABLE IF NOT EXISTS cancellation_requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            room_id INTEGER NOT NULL,
-            status TEXT DEFAULT 'pending',      -- pending|approved|rejected
-            created_at INTEGER DEFAULT (strftime('%s','now')),
-            decided_at INTEGER
-        )
-    """)
-    db.commit()
+    now = int(time.time())
+
+    def attempt():
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = {
+                r["id"]: r
+                for r in db.execute("""
+                    SELECT id, student_id, status FROM cancellation_requests
+                    WHERE id IN (SELECT value FROM json_each(?))
+                """, (json_ids(request_ids),))
+            }
+
+            outcomes = {}
+            pending = []
+            for rid in request_ids:
+                row = rows.get(rid)
+                if row is None:
+                    outcomes[rid] = DecisionOutcome(rid, SKIPPED, "request not found")
+                elif row["status"] != "pending":
+                    outcomes[rid] = DecisionOutcome(rid, SKIPPED, f"already {row['status']}")
+                else:
+                    pending.append(row)
+
+            ids = json_ids(r["id"] for r in pending)
+
+            if action == "approve":
+                freed = release_students(
+                    db, {r["student_id"] for r in pending}, CANCELLATION,
+                    refs={r["student_id"]: r["id"] for r in pending},
+                )
+                for r in pending:
+                    message = "bunk freed" if r["student_id"] in freed else "no bunk held; closed"
+                    outcomes[r["id"]] = DecisionOutcome(r["id"], APPROVED, message)
+            else:
+                for r in pending:
+                    outcomes[r["id"]] = DecisionOutcome(r["id"], REJECTED, "rejected")
+
+            db.execute("""
+                UPDATE cancellation_requests SET status = ?, decided_at = ?
+                WHERE id IN (SELECT value FROM json_each(?)) AND status = 'pending'
+            """, ("approved" if action == "approve" else "rejected", now, ids))
+            db.commit()
+            return [outcomes[rid] for rid in request_ids], {r["student_id"] for r in pending}
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+    return retry_on_busy(attempt)
@@ -1,50 +1,159 @@
 # models/hostel_model.py
-import sqlite3
 from extensions import get_db
 
-# ---------------- CREATE HOSTEL TABLE ----------------
+# ---------------- OCCUPANCY COUNTERS ----------------
+# rooms/hostels carry total_bunks + free_bunks, kept up to date by the
+# bunk triggers from migration 0003, so listings read them directly.
 
-def create_hostel_table():
+def get_hostels_with_occupancy():
     db = get_db()
-    db.execute("""
-    CREATE TABLE IF NOT EXISTS hostels (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        gender TEXT,
-        faculty TEXT,
-        created_at INTEGER,
-        image TEXT
-    )
-    """)
-    db.commit()
-
-    # ---------------- CREATE ROOMS TABLE ----------------
-
-def create_room_table():
+    return db.execute("SELECT * FROM hostels").fetchall()
+
+
+def recount_occupancy(fix=True):
+    """
+    Recomputes every room/hostel counter from the bunks table.
+    Returns a list of drifted rows: (kind, id, stored_total, stored_free, real_total, real_free).
+    With fix=True the stored counters are overwritten in one transaction.
+    """
+    db = get_db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        room_drift = db.execute("""
+            SELECT r.id, r.total_bunks, r.free_bunks,
+                   COUNT(b.id) AS real_total,
+                   COALESCE(SUM(b.id IS NOT NULL AND COALESCE(b.occupied, 0) = 0), 0) AS real_free
+            FROM rooms r
+            LEFT JOIN bunks b ON b.room_id = r.id
+            GROUP BY r.id
+            HAVING r.total_bunks != real_total OR r.free_bunks != real_free
+        """).fetchall()
+
+        drift = [("room", r["id"], r["total_bunks"], r["free_bunks"], r["real_total"], r["real_free"])
+                 for r in room_drift]
+
+        if fix and room_drift:
+            db.executemany(
+                "UPDATE rooms SET total_bunks = ?, free_bunks = ? WHERE id = ?",
+                [(r["real_total"], r["real_free"], r["id"]) for r in room_drift]
+            )
+
+        hostel_drift = db.execute("""
+            SELECT h.id, h.total_bunks, h.free_bunks,
+                   COUNT(b.id) AS real_total,
+                   COALESCE(SUM(b.id IS NOT NULL AND COALESCE(b.occupied, 0) = 0), 0) AS real_free
+            FROM hostels h
+            LEFT JOIN rooms r ON r.hostel_id = h.id
+            LEFT JOIN bunks b ON b.room_id = r.id
+            GROUP BY h.id
+            HAVING h.total_bunks != real_total OR h.free_bunks != real_free
+        """).fetchall()
+
+        drift += [("hostel", h["id"], h["total_bunks"], h["free_bunks"], h["real_total"], h["real_free"])
+                  for h in hostel_drift]
+
+        if fix and hostel_drift:
+            db.executemany(
+                "UPDATE hostels SET total_bunks = ?, free_bunks = ? WHERE id = ?",
+                [(h["real_total"], h["real_free"], h["id"]) for h in hostel_drift]
+            )
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return drift
+
+
+# ---------------- HOSTEL TREE ----------------
+
+def count_hostel_rooms(hostel_id):
     db = get_db()
-    db.execute("""
-    CREATE TABLE IF NOT EXISTS rooms (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        hostel_id INTEGER NOT NULL,
-        room_number TEXT NOT NULL,
-        type TEXT,
-        capacity INTEGER DEFAULT 1,
-        FOREIGN KEY(hostel_id) REFERENCES hostels(id)
-    )
-    """)
-    db.commit()
-
-    # ---------------- CREATE BUNKS TABLE ----------------
-
-def create_bunk_table():
+    return db.execute("SELECT COUNT(*) AS c FROM rooms WHERE hostel_id = ?", (hostel_id,)).fetchone()["c"]
+
+
+def get_hostel_tree(hostel_id, offset=0, limit=None):
+    """
+    Returns the hostel's rooms with their bunks and occupant names as
+    [{"room": {...}, "bunks": [{...}, ...]}, ...] from a single join,
+    grouped in one pass. offset/limit page over rooms (ordered by number).
+    Each room dict carries total_bunks, free_bunks and occupied_bunks.
+    """
+    db = get_db()
+    rows = db.execute("""
+        SELECT r.id AS room_id, r.room_number, r.type, r.capacity,
+               r.total_bunks, r.free_bunks,
+               k.id AS bunk_id, k.bunk_label, k.occupied, k.occupied_by,
+               s.full_name AS occupant_name,
+               s.matric_no AS occupant_matric_no
+        FROM (
+            SELECT * FROM rooms
+            WHERE hostel_id = ?
+            ORDER BY room_number, id
+            LIMIT ? OFFSET ?
+        ) r
+        LEFT JOIN bunks k ON k.room_id = r.id
+        LEFT JOIN students s ON s.id = k.occupied_by AND k.occupied = 1
+        ORDER BY r.room_number, r.id, k.bunk_label, k.id
+    """, (hostel_id, -1 if limit is None else limit, offset)).fetchall()
+
+    tree = []
+    current = None
+    for row in rows:
+        if current is None or current["room"]["id"] != row["room_id"]:
+            current = {
+                "room": {
+                    "id": row["room_id"],
+                    "room_number": row["room_number"],
+                    "type": row["type"],
+                    "capacity": row["capacity"],
+                    "total_bunks": row["total_bunks"],
+                    "free_bunks": row["free_bunks"],
+                    "occupied_bunks": row["total_bunks"] - row["free_bunks"],
+                },
+                "bunks": [],
+            }
+            tree.append(current)
+
+        if row["bunk_id"] is not None:
+            current["bunks"].append({
+                "id": row["bunk_id"],
+                "bunk_label": row["bunk_label"],
+                "occupied": 1 if row["occupied"] else 0,
+                "occupied_by": row["occupied_by"],
+                "occupant_name": row["occupant_name"],
+                "occupant_matric_no": row["occupant_matric_no"],
+            })
+
+    return tree
+
+
+# ---------------- OCCUPANCY EVENTS ----------------
+# Appended by bunk triggers (migration 0008); read by the student
+# availability stream to push deltas to the booking page.
+
+def get_latest_occupancy_event_id():
+    db = get_db()
+    return db.execute("SELECT COALESCE(MAX(id), 0) AS id FROM occupancy_events").fetchone()["id"]
+
+
+def occupancy_events_pruned_after(last_event_id):
+    """True when events newer than last_event_id were already pruned (client must resync)."""
+    db = get_db()
+    oldest = db.execute("SELECT MIN(id) AS id FROM occupancy_events").fetchone()["id"]
+    return oldest is not None and oldest > last_event_id + 1
+
+
+def get_occupancy_events_since(hostel_id, last_event_id, limit=200):
     db = get_db()
-    db.execute("""
-    CREATE TABLE IF NOT EXISTS bunks (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        room_id INTEGER NOT NULL,
-        bunk_label TEXT NOT NULL,
-        occupied INTEGER DEFAULT 0,
-        FOREIGN KEY(room_id) REFERENCES rooms(id)
-    )
-    """)
-    db.commit()
+    return db.execute("""
+        SELECT e.id, e.room_id, e.bunk_id, e.occupied,
+               k.bunk_label,
+               r.free_bunks AS room_free_bunks
+        FROM occupancy_events e
+        JOIN bunks k ON k.id = e.bunk_id
+        JOIN rooms r ON r.id = e.room_id
+        WHERE e.hostel_id = ? AND e.id > ?
+        ORDER BY e.id
+        LIMIT ?
+    """, (hostel_id, last_event_id, limit)).fetchall()
@@ -0,0 +1,181 @@
+# models/login_throttle_model.py
+import math
+import random
+import time
+
+from flask import current_app
+from extensions import get_db, retry_on_busy
+
+
+# ---------- LOGIN FLOOD PROTECTION ----------
+# Every login attempt is counted against the identity (matric_no or admin
+# email) and the client IP *before* any password hash is computed. Limits:
+#   - a sliding window (current + weighted previous bucket) of attempts,
+#     per identity and (much more generous) per IP;
+#   - a progressive lockout once an identity's consecutive failures pass a
+#     threshold, doubling with every further failure up to LOGIN_LOCKOUT_MAX.
+# IPs are never locked out: a whole campus shares one NAT address, so a
+# lockout there would shut every student out over other people's typos.
+# The client IP is the proxy-forwarded one (TRUSTED_PROXY_HOPS, app.py).
+# State lives in SQLite (login_throttle), shared by all workers.
+
+IP_SCOPE = "ip"
+
+
+def _limits(scope):
+    """(attempts per window, failures before lockout); the IP scope has no lockout."""
+    cfg = current_app.config
+    if scope == IP_SCOPE:
+        return cfg["LOGIN_MAX_PER_IP"], None
+    return cfg["LOGIN_MAX_PER_IDENTITY"], cfg["LOGIN_LOCKOUT_AFTER"]
+
+
+def _keys(scope, identity, ip):
+    keys = [(IP_SCOPE, ip or "unknown")]
+    if identity:
+        keys.append((scope, identity.strip().lower()))
+    return keys
+
+
+def _estimate(row, window, now):
+    """Sliding-window attempt count: this bucket plus the overlapping share of the last one."""
+    overlap = max(0.0, 1.0 - (now - row["window_start"]) / window)
+    return row["hits"] + row["prev_hits"] * overlap
+
+
+def throttle_login(scope, identity, ip):
+    """
+    Counts one attempt for scope/identity and ip. Returns 0 when the
+    attempt may proceed, otherwise the seconds to put in Retry-After.
+    """
+    cfg = current_app.config
+    if not cfg.get("LOGIN_THROTTLE_ENABLED"):
+        return 0
+
+    db = get_db()
+    window = cfg["LOGIN_WINDOW_SECONDS"]
+    now = time.time()
+    window_start = int(now // window * window)
+
+    def attempt():
+        retry_after = 0.0
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for key_scope, key in _keys(scope, identity, ip):
+                row = db.execute("""
+                    INSERT INTO login_throttle (scope, key, window_start, hits, last_seen)
+                    VALUES (?, ?, ?, 1, ?)
+                    ON CONFLICT(scope, key) DO UPDATE SET
+                        prev_hits = CASE
+                            WHEN excluded.window_start = window_start THEN prev_hits
+                            WHEN excluded.window_start - window_start = ? THEN hits
+                            ELSE 0 END,
+                        hits = CASE WHEN excluded.window_start = window_start THEN hits + 1 ELSE 1 END,
+                        failures = CASE WHEN excluded.last_seen - last_seen > ? THEN 0 ELSE failures END,
+                        window_start = excluded.window_start,
+                        last_seen = excluded.last_seen
+                    RETURNING window_start, hits, prev_hits, locked_until
+                """, (key_scope, key, window_start, now, window, cfg["LOGIN_FAILURE_RESET"])).fetchone()
+
+                limit, lockout_after = _limits(key_scope)
+                if lockout_after is not None and row["locked_until"] > now:
+                    retry_after = max(retry_after, row["locked_until"] - now)
+                if _estimate(row, window, now) > limit:
+                    retry_after = max(retry_after, row["window_start"] + window - now)
+
+            # occasional cleanup of idle keys keeps the table small
+            if random.random() < 0.01:
+                db.execute(
+                    "DELETE FROM login_throttle WHERE last_seen < ? AND locked_until < ?",
+                    (now - max(cfg["LOGIN_FAILURE_RESET"], 2 * window), now)
+                )
+            db.commit()
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+        return int(math.ceil(retry_after))
+
+    return retry_on_busy(attempt)
+
+
+def record_login_failure(scope, identity):
+    """
+    Bumps the identity's consecutive failures; past the threshold each
+    failure doubles its lockout. IPs have no lockout, so they keep no count.
+    """
+    cfg = current_app.config
+    if not cfg.get("LOGIN_THROTTLE_ENABLED") or not identity:
+        return
+
+    db = get_db()
+    _, lockout_after = _limits(scope)
+
+    def attempt():
+        now = time.time()
+        db.execute("""
+            UPDATE login_throttle
+            SET failures = failures + 1,
+                locked_until = CASE
+                    WHEN failures + 1 >= ?
+                    THEN ? + MIN(?, ? * (1 << MIN(failures + 1 - ?, 20)))
+                    ELSE locked_until END
+            WHERE scope = ? AND key = ?
+        """, (lockout_after, now, cfg["LOGIN_LOCKOUT_MAX"], cfg["LOGIN_LOCKOUT_BASE"],
+              lockout_after, scope, identity.strip().lower()))
+        db.commit()
+
+    retry_on_busy(attempt)
+
+
+def record_login_success(scope, identity):
+    """Clears the identity's failures and lockout."""
+    if not current_app.config.get("LOGIN_THROTTLE_ENABLED") or not identity:
+        return
+
+    db = get_db()
+
+    def attempt():
+        db.execute(
+            "UPDATE login_throttle SET failures = 0, locked_until = 0 WHERE scope = ? AND key = ?",
+            (scope, identity.strip().lower())
+        )
+        db.commit()
+
+    retry_on_busy(attempt)
+
+
+# ---------- ADMIN INSPECTION ----------
+def get_throttle_entries(limit=200):
+    """Keys with recent activity, locked and busiest first."""
+    cfg = current_app.config
+    window = cfg["LOGIN_WINDOW_SECONDS"]
+    now = time.time()
+    rows = get_db().execute("""
+        SELECT scope, key, window_start, hits, prev_hits, failures, locked_until, last_seen
+        FROM login_throttle
+        WHERE last_seen >= ? OR locked_until > ?
+        ORDER BY (locked_until > ?) DESC, failures DESC, last_seen DESC
+        LIMIT ?
+    """, (now - 2 * window, now, now, limit)).fetchall()
+
+    entries = []
+    for row in rows:
+        limit_hits, lockout_after = _limits(row["scope"])
+        entries.append({
+            "scope": row["scope"],
+            "key": row["key"],
+            "attempts": round(_estimate(row, window, now), 1) if now - row["window_start"] < 2 * window else 0,
+            "limit": limit_hits,
+            "failures": row["failures"],
+            "lockout_after": lockout_after,
+            "locked_for": max(0, int(math.ceil(row["locked_until"] - now))),
+            "last_seen": int(row["last_seen"]),
+        })
+    return entries
+
+
+def clear_throttle(scope, key):
+    db = get_db()
+    db.execute("DELETE FROM login_throttle WHERE scope = ? AND key = ?", (scope, key))
+    db.commit()
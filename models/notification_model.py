@@ -1,59 +1,217 @@
+import threading
+import time
+
+from flask import current_app
 from extensions import get_db
 
-def get_student_notifications(student_id):
+# ---------- NOTIFICATION FEED ----------
+# One UNION ALL over both request tables, ordered in SQL by the event time
+# (decided_at, else created_at) and paged with a keyset cursor on
+# (event_time, type, request_id) - newest first. Each arm is limited on its
+# own (idx_*_student_event), so a page costs the same however long the
+# student's history is.
+
+_FEED_ARMS = {
+    "cancellation": """
+        SELECT * FROM (
+            SELECT
+                'cancellation' AS type,
+                cr.id AS request_id,
+                cr.status AS status,
+                cr.created_at AS created_at,
+                cr.decided_at AS decided_at,
+                COALESCE(cr.decided_at, cr.created_at) AS event_time,
+                h.name AS hostel_name,
+                r.room_number AS room_number,
+                NULL AS requested_hostel_name,
+                NULL AS requested_room_number,
+                NULL AS requested_bunk_label
+            FROM cancellation_requests cr
+            JOIN rooms r ON r.id = cr.room_id
+            JOIN hostels h ON h.id = r.hostel_id
+            WHERE cr.student_id = :student_id {where}
+            ORDER BY COALESCE(cr.decided_at, cr.created_at) DESC, cr.id DESC
+            LIMIT :limit
+        )
+    """,
+    "swap": """
+        SELECT * FROM (
+            SELECT
+                'swap' AS type,
+                rs.id AS request_id,
+                rs.status AS status,
+                rs.created_at AS created_at,
+                rs.decided_at AS decided_at,
+                COALESCE(rs.decided_at, rs.created_at) AS event_time,
+                h1.name AS hostel_name,
+                r1.room_number AS room_number,
+                h2.name AS requested_hostel_name,
+                r2.room_number AS requested_room_number,
+                b.bunk_label AS requested_bunk_label
+            FROM room_swap_requests rs
+            JOIN rooms r1 ON r1.id = rs.current_room_id
+            JOIN hostels h1 ON h1.id = r1.hostel_id
+            JOIN rooms r2 ON r2.id = rs.requested_room_id
+            JOIN hostels h2 ON h2.id = r2.hostel_id
+            LEFT JOIN room_swap_details d ON d.swap_request_id = rs.id
+            LEFT JOIN bunks b ON b.id = d.requested_bunk_id
+            WHERE rs.student_id = :student_id {where}
+            ORDER BY COALESCE(rs.decided_at, rs.created_at) DESC, rs.id DESC
+            LIMIT :limit
+        )
+    """,
+}
+_FEED_ALIASES = {"cancellation": "cr", "swap": "rs"}
+
+
+def encode_notification_cursor(row):
+    return f"{row['event_time'] or 0}:{row['type']}:{row['request_id']}"
+
+
+def decode_notification_cursor(cursor):
+    """Returns (event_time, type, request_id) or raises ValueError."""
+    event_time, kind, request_id = cursor.split(":")
+    if kind not in _FEED_ARMS:
+        raise ValueError("unknown notification type")
+    return int(event_time), kind, int(request_id)
+
+
+def get_student_notifications_page(student_id, cursor=None, limit=20):
     """
-    Returns a combined list of swap + cancellation status updates.
+    Returns (items, next_cursor) with swap + cancellation updates, newest
+    event first. Pass next_cursor back to get the following page; it is
+    None on the last page.
     """
     db = get_db()
+    params = {"student_id": student_id, "limit": limit + 1}
+
+    arms = []
+    for kind, sql in _FEED_ARMS.items():
+        where = ""
+        if cursor:
+            event_time, cursor_kind, cursor_id = cursor
+            alias = _FEED_ALIASES[kind]
+            event = f"COALESCE({alias}.decided_at, {alias}.created_at)"
+            params["cursor_time"] = event_time
+            params["cursor_id"] = cursor_id
+            # rows strictly after the cursor in (event_time DESC, type DESC, id DESC) order
+            if kind > cursor_kind:
+                where = f"AND {event} < :cursor_time"
+            elif kind < cursor_kind:
+                where = f"AND {event} <= :cursor_time"
+            else:
+                where = f"AND ({event} < :cursor_time OR ({event} = :cursor_time AND {alias}.id < :cursor_id))"
+        arms.append(sql.format(where=where))
+
+    rows = db.execute(
+        " UNION ALL ".join(arms)
+        + " ORDER BY event_time DESC, type DESC, request_id DESC LIMIT :limit",
+        params
+    ).fetchall()
+
+    items = rows[:limit]
+    next_cursor = encode_notification_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+# ---------- NOTIFICATION COUNTER ----------
+# student_notification_counters is maintained by triggers (migration 0006),
+# so the bell badge is a primary-key read instead of two multi-join queries.
+# Values are cached in-process for NOTIFICATION_COUNT_TTL seconds; writes
+# made through this process invalidate the student's entry immediately.
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+
+def invalidate_notification_count(student_id):
+    with _count_cache_lock:
+        _count_cache.pop(student_id, None)
+
+
+def get_notification_counts(student_id):
+    """Returns {"pending", "unread", "version"} for the student."""
+    ttl = current_app.config.get("NOTIFICATION_COUNT_TTL", 5)
+    now = time.monotonic()
+
+    with _count_cache_lock:
+        cached = _count_cache.get(student_id)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    db = get_db()
+    row = db.execute("""
+        SELECT pending, unread, version
+        FROM student_notification_counters
+        WHERE student_id = ?
+    """, (student_id,)).fetchone()
+    counts = dict(row) if row else {"pending": 0, "unread": 0, "version": 0}
+
+    with _count_cache_lock:
+        # keep whichever entry is newer if another thread refreshed meanwhile
+        current = _count_cache.get(student_id)
+        if not current or current[1]["version"] <= counts["version"]:
+            _count_cache[student_id] = (now + ttl, counts)
+    return counts
+
+
+def mark_notifications_read(student_id):
+    db = get_db()
+    db.execute("""
+        UPDATE student_notification_counters
+        SET unread = 0, version = version + 1
+        WHERE student_id = ? AND unread > 0
+    """, (student_id,))
+    db.commit()
+    invalidate_notification_count(student_id)
+
+
+class LazyNotificationCount:
+    """
+    Template value for the bell badge. Nothing is queried unless a template
+    actually uses notification_count; then it is resolved once per render.
+    """
+
+    def __init__(self, student_id):
+        self.student_id = student_id
+        self._value = None
+
+    def _resolve(self):
+        if self._value is None:
+            counts = get_notification_counts(self.student_id)
+            self._value = counts["pending"] + counts["unread"]
+        return self._value
+
+    def __int__(self):
+        return self._resolve()
+
+    __index__ = __int__
+
+    def __bool__(self):
+        return self._resolve() > 0
+
+    def __str__(self):
+        return str(self._resolve())
+
+    def __html__(self):
+        return str(self._resolve())
+
+    def __eq__(self, other):
+        return self._resolve() == other
+
+    def __ne__(self, other):
+        return self._resolve() != other
+
+    def __lt__(self, other):
+        return self._resolve() < other
+
+    def __le__(self, other):
+        return self._resolve() <= other
+
+    def __gt__(self, other):
+        return self._resolve() > other
+
+    def __ge__(self, other):
+        return self._resolve() >= other
 
-    cancellations = db.execute("""
-        SELECT
-            'cancellation' AS type,
-            cr.id AS request_id,
-            cr.status AS status,
-            cr.created_at AS created_at,
-            cr.decided_at AS decided_at,
-            h.name AS hostel_name,
-            r.room_number AS room_number,
-            NULL AS requested_hostel_name,
-            NULL AS requested_room_number,
-            NULL AS requested_bunk_label
-        FROM cancellation_requests cr
-        JOIN rooms r ON r.id = cr.room_id
-        JOIN hostels h ON h.id = r.hostel_id
-        WHERE cr.student_id = ?
-    """, (student_id,)).fetchall()
-
-    # Swap requests: room A -> room B
-    # If you created room_swap_details, we LEFT JOIN it for requested bunk label
-    swaps = db.execute("""
-        SELECT
-            'swap' AS type,
-            rs.id AS request_id,
-            rs.status AS status,
-            rs.created_at AS created_at,
-            rs.decided_at AS decided_at,
-            h1.name AS hostel_name,
-            r1.room_number AS room_number,
-            h2.name AS requested_hostel_name,
-            r2.room_number AS requested_room_number,
-            b.bunk_label AS requested_bunk_label
-        FROM room_swap_requests rs
-        JOIN rooms r1 ON r1.id = rs.current_room_id
-        JOIN hostels h1 ON h1.id = r1.hostel_id
-        JOIN rooms r2 ON r2.id = rs.requested_room_id
-        JOIN hostels h2 ON h2.id = r2.hostel_id
-        LEFT JOIN room_swap_details d ON d.swap_request_id = rs.id
-        LEFT JOIN bunks b ON b.id = d.requested_bunk_id
-        WHERE rs.student_id = ?
-    """, (student_id,)).fetchall()
-
-    # Combine + sort by most recent event time
-    all_items = list(cancellations) + list(swaps)
-
-    def sort_key(x):
-        # show decided notifications first (latest decided), else created
-        return (x["decided_at"] or x["created_at"] or 0)
-
-    all_items.sort(key=sort_key, reverse=True)
-    return all_items
+    __hash__ = None
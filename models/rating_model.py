@@ -1,32 +1,15 @@
-from extensions import get_db
-
-def create_ratings_table():
-    db = get_db()
-    db.execute("""
-        CREATE TABLE IF NOT EXISTS ratings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            hostel_id INTEGER NOT NULL,
-            room_id INTEGER,
-            rating INTEGER NOT NULL CHECK (rating >= 1 AND rating <= 5),
-            comment TEXT,
-            created_at INTEGER DEFAULT (strftime('%s','now')),
-            updated_at INTEGER
-        )
-    """)
-    db.commit()
+from extensions import get_db, retry_on_busy
+from models.allocation_model import get_current_allocation
 
 def get_student_current_allocation_ids(student_id):
     """
-    Gets hostel_id and room_id from the student's active booking.
+    Gets hostel_id and room_id from the student's current allocation.
     """
-    db = get_db()
-    return db.execute("""
-        SELECT hostel_id, room_id
-        FROM bookings
-        WHERE student_id = ? AND status = 'active'
-        ORDER BY id DESC LIMIT 1
-    """, (student_id,)).fetchone()
+    return get_current_allocation(student_id)
+
+# One statement per rating: the conflict target is the unique expression index
+# uq_ratings_student_target (student_id, hostel_id, IFNULL(room_id, 0)), and
+# triggers on ratings keep rating_aggregates in step.
 
 def upsert_rating(student_id, hostel_id, room_id, rating, comment):
     """
@@ -38,32 +21,83 @@ def upsert_rating(student_id, hostel_id, room_id, rating, comment):
     # Normalize comment
     comment = (comment or "").strip()
 
-    existing = db.execute("""
-        SELECT id FROM ratings
-        WHERE student_id = ?
-          AND hostel_id = ?
-          AND (
-                (room_id IS NULL AND ? IS NULL)
-                OR (room_id = ?)
-              )
-        LIMIT 1
-    """, (student_id, hostel_id, room_id, room_id)).fetchone()
-
-    if existing:
-        db.execute("""
-            UPDATE ratings
-            SET rating = ?, comment = ?, updated_at = (strftime('%s','now'))
-            WHERE id = ?
-        """, (rating, comment, existing["id"]))
-        db.commit()
+    def attempt():
+        try:
+            row = db.execute("""
+                INSERT INTO ratings (student_id, hostel_id, room_id, rating, comment)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(student_id, hostel_id, IFNULL(room_id, 0)) DO UPDATE SET
+                    rating = excluded.rating,
+                    comment = excluded.comment,
+                    updated_at = (strftime('%s','now'))
+                RETURNING id, updated_at IS NOT NULL AS updated
+            """, (student_id, hostel_id, room_id, rating, comment)).fetchone()
+            db.commit()
+            return row["updated"]
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+    if retry_on_busy(attempt):
         return True, "Rating updated successfully."
-    else:
-        db.execute("""
-            INSERT INTO ratings (student_id, hostel_id, room_id, rating, comment)
-            VALUES (?, ?, ?, ?, ?)
-        """, (student_id, hostel_id, room_id, rating, comment))
-        db.commit()
-        return True, "Rating submitted successfully."
+    return True, "Rating submitted successfully."
+
+
+def upsert_ratings_batch(rows, chunk_size=1000):
+    """
+    Bulk upsert for historical survey ratings. rows are dicts with
+    student_id, hostel_id, room_id (optional), rating, comment (optional)
+    and created_at (optional unix time). An imported rating never replaces
+    one that is newer than it. Returns (applied, errors) where errors is a
+    list of (row_index, message) for rows that were skipped.
+    """
+    db = get_db()
+    valid, errors = [], []
+
+    for index, row in enumerate(rows, start=1):
+        try:
+            student_id = int(row["student_id"])
+            hostel_id = int(row["hostel_id"])
+            room_id = int(row["room_id"]) if row.get("room_id") not in (None, "") else None
+            rating = int(row["rating"])
+            created_at = int(row["created_at"]) if row.get("created_at") not in (None, "") else None
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append((index, f"bad or missing field: {e}"))
+            continue
+        if not 1 <= rating <= 5:
+            errors.append((index, "rating must be between 1 and 5"))
+            continue
+        valid.append((student_id, hostel_id, room_id, rating,
+                      (row.get("comment") or "").strip(), created_at))
+
+    applied = 0
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+
+        def attempt():
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                cur = db.executemany("""
+                    INSERT INTO ratings (student_id, hostel_id, room_id, rating, comment, created_at)
+                    VALUES (?, ?, ?, ?, ?, COALESCE(?, strftime('%s','now')))
+                    ON CONFLICT(student_id, hostel_id, IFNULL(room_id, 0)) DO UPDATE SET
+                        rating = excluded.rating,
+                        comment = excluded.comment,
+                        updated_at = excluded.created_at
+                    WHERE excluded.created_at >= COALESCE(ratings.updated_at, ratings.created_at, 0)
+                """, chunk)
+                db.commit()
+                # rows written directly (skipped stale updates and trigger writes excluded)
+                return cur.rowcount
+            except Exception:
+                if db.in_transaction:
+                    db.rollback()
+                raise
+
+        applied += retry_on_busy(attempt)
+
+    return applied, errors
 
 def get_student_ratings(student_id):
     db = get_db()
@@ -78,20 +112,116 @@ def get_student_ratings(student_id):
         ORDER BY rt.id DESC
     """, (student_id,)).fetchall()
 
-def get_hostel_rating_summary(hostel_id):
+# ---------- SUMMARIES + LEADERBOARDS (served from rating_aggregates) ----------
+
+def _summary(scope, target_id):
     db = get_db()
+    # aggregate over 0 or 1 rows, so unrated targets still get (0, NULL)
     return db.execute("""
-        SELECT COUNT(*) AS total,
-               ROUND(AVG(rating), 2) AS avg_rating
-        FROM ratings
-        WHERE hostel_id = ?
-    """, (hostel_id,)).fetchone()
+        SELECT COALESCE(MAX(count), 0) AS total,
+               ROUND(MAX(sum) * 1.0 / MAX(count), 2) AS avg_rating
+        FROM rating_aggregates
+        WHERE scope = ? AND target_id = ? AND count > 0
+    """, (scope, target_id)).fetchone()
+
+
+def get_hostel_rating_summary(hostel_id):
+    return _summary("hostel", hostel_id)
+
 
 def get_room_rating_summary(room_id):
+    return _summary("room", room_id)
+
+
+def _leaderboard_row(row):
+    return {
+        "id": row["target_id"],
+        "name": row["name"],
+        "hostel_id": row["hostel_id"],
+        "total": row["count"],
+        "avg_rating": round(row["sum"] * 1.0 / row["count"], 2),
+        "histogram": {str(star): row[f"r{star}"] for star in range(1, 6)},
+    }
+
+
+def get_hostel_leaderboard(limit=10, min_ratings=1):
+    """Hostels by average rating (ties: more ratings first)."""
     db = get_db()
-    return db.execute("""
-        SELECT COUNT(*) AS total,
-               ROUND(AVG(rating), 2) AS avg_rating
-        FROM ratings
-        WHERE room_id = ?
-    """, (room_id,)).fetchone()
+    rows = db.execute("""
+        SELECT a.*, h.name
+        FROM rating_aggregates a
+        JOIN hostels h ON h.id = a.target_id
+        WHERE a.scope = 'hostel' AND a.count >= MAX(?, 1)
+        ORDER BY a.sum * 1.0 / a.count DESC, a.count DESC, a.target_id
+        LIMIT ?
+    """, (min_ratings, limit)).fetchall()
+    return [_leaderboard_row(r) for r in rows]
+
+
+def get_room_leaderboard(hostel_id, limit=10, min_ratings=1):
+    """Top rooms in one hostel by average rating."""
+    db = get_db()
+    rows = db.execute("""
+        SELECT a.*, r.room_number AS name
+        FROM rating_aggregates a
+        JOIN rooms r ON r.id = a.target_id
+        WHERE a.scope = 'room' AND a.hostel_id = ? AND a.count >= MAX(?, 1)
+        ORDER BY a.sum * 1.0 / a.count DESC, a.count DESC, a.target_id
+        LIMIT ?
+    """, (hostel_id, min_ratings, limit)).fetchall()
+    return [_leaderboard_row(r) for r in rows]
+
+
+# ---------- CONSISTENCY ----------
+
+_AGGREGATE_SOURCE = """
+    SELECT 'hostel' AS scope, hostel_id AS target_id, hostel_id,
+           COUNT(*) AS count, SUM(rating) AS sum,
+           SUM(rating = 1) AS r1, SUM(rating = 2) AS r2, SUM(rating = 3) AS r3,
+           SUM(rating = 4) AS r4, SUM(rating = 5) AS r5
+    FROM ratings GROUP BY hostel_id
+    UNION ALL
+    SELECT 'room', room_id, MIN(hostel_id),
+           COUNT(*), SUM(rating),
+           SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5)
+    FROM ratings WHERE room_id IS NOT NULL GROUP BY room_id
+"""
+
+_AGGREGATE_COLUMNS = ("hostel_id", "count", "sum", "r1", "r2", "r3", "r4", "r5")
+
+
+def rebuild_rating_aggregates(fix=True):
+    """
+    Recomputes every aggregate from ratings and compares with the stored rows.
+    Returns drifted entries: (scope, target_id, stored dict or None, actual dict or None).
+    With fix=True the table is rewritten from ratings in one transaction.
+    """
+    db = get_db()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        actual = {(r["scope"], r["target_id"]): r for r in db.execute(_AGGREGATE_SOURCE)}
+        stored = {(r["scope"], r["target_id"]): r for r in db.execute("SELECT * FROM rating_aggregates")}
+
+        drift = []
+        for key in sorted(set(actual) | set(stored)):
+            a = actual.get(key)
+            s = stored.get(key)
+            a_vals = {c: a[c] for c in _AGGREGATE_COLUMNS} if a else None
+            s_vals = {c: s[c] for c in _AGGREGATE_COLUMNS} if s else None
+            # an emptied row (count 0) matches a missing one
+            if s_vals and s_vals["count"] == 0 and a_vals is None:
+                continue
+            if a_vals != s_vals:
+                drift.append((key[0], key[1], s_vals, a_vals))
+
+        if fix and drift:
+            db.execute("DELETE FROM rating_aggregates")
+            db.execute(f"""
+                INSERT INTO rating_aggregates (scope, target_id, hostel_id, count, sum, r1, r2, r3, r4, r5)
+                {_AGGREGATE_SOURCE}
+            """)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return drift
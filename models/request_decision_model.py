@@ -0,0 +1,54 @@
+import json
+from collections import Counter, namedtuple
+
+# ---------- SHARED BULK-DECISION HELPERS ----------
+# Swap and cancellation queues are decided in batches: every selected id
+# gets exactly one outcome, and the whole batch is applied in one transaction.
+
+APPROVED = "approved"
+REJECTED = "rejected"
+SKIPPED = "skipped"     # not found / already processed
+FAILED = "failed"       # left pending, e.g. the requested room is full
+
+DecisionOutcome = namedtuple("DecisionOutcome", ["request_id", "status", "message"])
+
+MAX_BULK_DECISIONS = 5000
+
+
+def json_ids(ids):
+    """Binds a list of ids as one parameter for `IN (SELECT value FROM json_each(?))`."""
+    return json.dumps(list(ids))
+
+
+def parse_decision_form(form):
+    """
+    Reads an approve/reject decision from the admin queue form.
+    A row button posts decide=<action>:<id>; the bulk buttons post
+    action=<action> with one request_ids value per ticked checkbox.
+    Returns (action, ids) or (None, []) when the form is invalid.
+    """
+    single = (form.get("decide") or "").strip().lower()
+    if single:
+        action, _, raw_id = single.partition(":")
+        raw_ids = [raw_id]
+    else:
+        action = (form.get("action") or "").strip().lower()
+        raw_ids = form.getlist("request_ids") or [form.get("request_id", "")]
+
+    ids = sorted({int(i) for i in raw_ids if str(i).strip().isdigit()})
+    if action not in ("approve", "reject") or not ids or len(ids) > MAX_BULK_DECISIONS:
+        return None, []
+    return action, ids
+
+
+def summarize_decisions(outcomes, noun="request"):
+    """One summary line plus up to 10 detail lines for anything not approved/rejected."""
+    counts = Counter(o.status for o in outcomes)
+    parts = [f"{counts[s]} {s}" for s in (APPROVED, REJECTED, SKIPPED, FAILED) if counts[s]]
+    lines = [f"{len(outcomes)} {noun}(s): " + ", ".join(parts)]
+
+    problems = [o for o in outcomes if o.status in (SKIPPED, FAILED)]
+    lines += [f"#{o.request_id} {o.status}: {o.message}" for o in problems[:10]]
+    if len(problems) > 10:
+        lines.append(f"...and {len(problems) - 10} more")
+    return lines
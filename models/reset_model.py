@@ -1,13 +1 @@
 from extensions import get_db
-
-def create_reset_table():
-    db = get_db()
-    db.execute("""
-    CREATE TABLE IF NOT EXISTS password_resets (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT NOT NULL,
-        code TEXT NOT NULL,
-        expires_at INTEGER NOT NULL
-    )
-    """)
-    db.commit()
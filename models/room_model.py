@@ -0,0 +1,283 @@
+import csv
+import io
+import json
+import re
+import string
+from itertools import product
+
+from extensions import get_db, retry_on_busy
+
+# ---------------- BULK PROVISIONING ----------------
+# A layout is a list of rows {room_number, capacity, type, bunks}. It can come
+# from CSV (room_number,capacity[,type][,bunks] with bunks "A/B/C"), JSON (a
+# list of rows, {"rooms": [...]} or {"pattern": "..."}) or a pattern such as
+# "blocks A-D, floors 1-4, rooms 01-30, capacity 4, bunks A/B/C/D".
+# Rows are validated one by one; bad rows are reported and the rest are
+# inserted with executemany inside a single transaction.
+
+MAX_PROVISION_ROOMS = 5000
+
+_RANGE_RE = re.compile(r"^(\w+)\s*(?:-|–|—|to)\s*(\w+)$")
+
+
+class LayoutError(ValueError):
+    """The layout as a whole could not be read (bad CSV header, JSON, pattern)."""
+
+
+def _expand_range(value):
+    value = value.strip()
+    match = _RANGE_RE.match(value)
+    if not match:
+        return [v for v in re.split(r"[/\s]+", value) if v]
+
+    start, end = match.groups()
+    if start.isdigit() and end.isdigit():
+        width = len(start) if start.startswith("0") else 0
+        if int(end) < int(start):
+            raise LayoutError(f"Range {value!r} runs backwards")
+        return [str(n).zfill(width) for n in range(int(start), int(end) + 1)]
+
+    if len(start) == 1 and len(end) == 1 and start.isalpha() and end.isalpha():
+        if ord(end) < ord(start):
+            raise LayoutError(f"Range {value!r} runs backwards")
+        return [chr(c) for c in range(ord(start), ord(end) + 1)]
+
+    raise LayoutError(f"Cannot expand range {value!r}")
+
+
+def default_bunk_labels(capacity):
+    """A, B, C ... for up to 26 bunks, then 1, 2, 3 ..."""
+    if capacity <= len(string.ascii_uppercase):
+        return list(string.ascii_uppercase[:capacity])
+    return [str(n) for n in range(1, capacity + 1)]
+
+
+def expand_layout_pattern(pattern):
+    """
+    Expands "blocks A-D, floors 1-4, rooms 01-30, capacity 4, bunks A/B/C/D"
+    into layout rows. Room numbers are block + floor + room (A101 ...);
+    blocks and floors are optional.
+    """
+    parts = {}
+    for segment in re.split(r"[,;]", pattern):
+        segment = segment.strip()
+        if not segment:
+            continue
+        key, _, value = segment.partition(" ")
+        key = key.lower().rstrip("s")
+        if key not in ("block", "floor", "room", "capacity", "bunk", "type"):
+            raise LayoutError(f"Unknown pattern part {segment!r}")
+        parts[key] = value.strip()
+
+    if "room" not in parts:
+        raise LayoutError("Pattern needs a rooms range, e.g. 'rooms 01-30'")
+
+    blocks = _expand_range(parts["block"]) if "block" in parts else [""]
+    floors = _expand_range(parts["floor"]) if "floor" in parts else [""]
+    rooms = _expand_range(parts["room"])
+
+    if len(blocks) * len(floors) * len(rooms) > MAX_PROVISION_ROOMS:
+        raise LayoutError(f"Pattern expands to more than {MAX_PROVISION_ROOMS} rooms")
+
+    bunks = _expand_range(parts["bunk"]) if "bunk" in parts else None
+    capacity = parts.get("capacity") or (str(len(bunks)) if bunks else "")
+
+    return [
+        {
+            "room_number": f"{block}{floor}{room}",
+            "capacity": capacity,
+            "type": parts.get("type"),
+            "bunks": bunks,
+        }
+        for block, floor, room in product(blocks, floors, rooms)
+    ]
+
+
+def parse_layout_csv(text):
+    reader = csv.DictReader(io.StringIO(text))
+    fields = [f.strip().lower() for f in (reader.fieldnames or [])]
+    if "room_number" not in fields or "capacity" not in fields:
+        raise LayoutError("CSV header must include room_number and capacity")
+    reader.fieldnames = fields
+
+    rows = []
+    for row in reader:
+        bunks = (row.get("bunks") or "").strip()
+        rows.append({
+            "room_number": row.get("room_number"),
+            "capacity": row.get("capacity"),
+            "type": row.get("type"),
+            "bunks": [b for b in re.split(r"[/\s]+", bunks) if b] if bunks else None,
+        })
+    return rows
+
+
+def parse_layout_json(text):
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise LayoutError(f"Invalid JSON: {e}")
+
+    if isinstance(data, dict):
+        if "pattern" in data:
+            return expand_layout_pattern(data["pattern"])
+        data = data.get("rooms")
+
+    if not isinstance(data, list):
+        raise LayoutError("JSON layout must be a list of rooms, {\"rooms\": [...]} or {\"pattern\": ...}")
+    return [row if isinstance(row, dict) else {"room_number": None} for row in data]
+
+
+def parse_layout(text, filename=None):
+    """Reads a CSV or JSON layout, picking the format from the name or content."""
+    stripped = text.lstrip("\ufeff").strip()
+    if (filename or "").lower().endswith(".json") or stripped[:1] in ("[", "{"):
+        return parse_layout_json(stripped)
+    return parse_layout_csv(stripped)
+
+
+def _validate_row(row):
+    """Returns (clean_row, None) or (None, error message)."""
+    room_number = str(row.get("room_number") or "").strip()
+    if not room_number:
+        return None, "room_number is required"
+
+    capacity = str(row.get("capacity") or "").strip()
+    if not capacity.isdigit() or int(capacity) <= 0:
+        return None, "capacity must be a positive whole number"
+    capacity = int(capacity)
+
+    bunks = row.get("bunks")
+    if bunks is None:
+        bunks = default_bunk_labels(capacity)
+    elif isinstance(bunks, str):
+        bunks = [b for b in re.split(r"[/\s,]+", bunks) if b]
+    bunks = [str(b).strip() for b in bunks if str(b).strip()]
+
+    if len(set(bunks)) != len(bunks):
+        return None, "duplicate bunk labels"
+    if len(bunks) > capacity:
+        return None, f"{len(bunks)} bunks exceed capacity {capacity}"
+
+    room_type = (row.get("type") or "").strip() or None
+    return {"room_number": room_number, "capacity": capacity, "type": room_type, "bunks": bunks}, None
+
+
+def provision_hostel(hostel_id, layout, dry_run=False):
+    """
+    Creates the rooms and bunks described by layout in one transaction.
+    Rooms that already exist keep their capacity and only gain missing bunk
+    labels, so re-running the same layout is harmless.
+    Returns a report dict with counts and per-row errors.
+    """
+    db = get_db()
+    report = {
+        "hostel_id": hostel_id,
+        "rows": len(layout),
+        "rooms_created": 0,
+        "bunks_created": 0,
+        "rooms_skipped": 0,
+        "errors": [],
+        "dry_run": dry_run,
+    }
+
+    if not db.execute("SELECT 1 FROM hostels WHERE id = ?", (hostel_id,)).fetchone():
+        report["errors"].append({"row": None, "room_number": None, "error": "Hostel not found"})
+        return report
+
+    if len(layout) > MAX_PROVISION_ROOMS:
+        report["errors"].append({
+            "row": None, "room_number": None,
+            "error": f"Layout has more than {MAX_PROVISION_ROOMS} rows",
+        })
+        return report
+
+    # validate every row up front; a repeated room_number is a row error
+    planned = {}
+    for index, raw in enumerate(layout, start=1):
+        row, error = _validate_row(raw)
+        if error is None and row["room_number"] in planned:
+            error = "room_number repeated in layout"
+        if error:
+            report["errors"].append({
+                "row": index,
+                "room_number": (raw.get("room_number") if isinstance(raw, dict) else None),
+                "error": error,
+            })
+            continue
+        row["row"] = index
+        planned[row["room_number"]] = row
+
+    def attempt():
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            existing = {
+                r["room_number"]: r
+                for r in db.execute(
+                    "SELECT id, room_number, capacity FROM rooms WHERE hostel_id = ?",
+                    (hostel_id,)
+                )
+            }
+            existing_labels = {}
+            for b in db.execute("""
+                SELECT k.room_id, k.bunk_label
+                FROM bunks k JOIN rooms r ON r.id = k.room_id
+                WHERE r.hostel_id = ?
+            """, (hostel_id,)):
+                existing_labels.setdefault(b["room_id"], set()).add(b["bunk_label"])
+
+            new_rooms = [row for number, row in planned.items() if number not in existing]
+            db.executemany(
+                "INSERT INTO rooms (hostel_id, room_number, type, capacity) VALUES (?,?,?,?)",
+                [(hostel_id, r["room_number"], r["type"], r["capacity"]) for r in new_rooms]
+            )
+
+            room_ids = {
+                r["room_number"]: r["id"]
+                for r in db.execute(
+                    "SELECT id, room_number FROM rooms WHERE hostel_id = ?", (hostel_id,)
+                )
+            }
+
+            bunk_rows = []
+            errors = []
+            skipped = 0
+            for number, row in planned.items():
+                room_id = room_ids[number]
+                if number in existing:
+                    have = existing_labels.get(room_id, set())
+                    missing = [b for b in row["bunks"] if b not in have]
+                    if not missing:
+                        skipped += 1
+                        continue
+                    capacity = existing[number]["capacity"] or 0
+                    if len(have) + len(missing) > capacity:
+                        errors.append({
+                            "row": row["row"], "room_number": number,
+                            "error": f"existing room has {len(have)} of {capacity} bunks; "
+                                     f"cannot add {len(missing)} more",
+                        })
+                        continue
+                    bunk_rows.extend((room_id, b) for b in missing)
+                else:
+                    bunk_rows.extend((room_id, b) for b in row["bunks"])
+
+            db.executemany("INSERT INTO bunks (room_id, bunk_label) VALUES (?,?)", bunk_rows)
+
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            return len(new_rooms), len(bunk_rows), skipped, errors
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+    rooms_created, bunks_created, skipped, errors = retry_on_busy(attempt)
+    report["rooms_created"] = rooms_created
+    report["bunks_created"] = bunks_created
+    report["rooms_skipped"] = skipped
+    report["errors"].extend(errors)
+    report["errors"].sort(key=lambda e: e["row"] or 0)
+    return report
@@ -1,17 +1,131 @@
-from extensions import get_db
 import time
 
-def create_room_swap_table():
+from extensions import get_db, retry_on_busy
+from models.allocation_model import move_students, SWAP
+from models.request_decision_model import (
+    APPROVED, REJECTED, SKIPPED, FAILED, DecisionOutcome, json_ids,
+)
+
+
+# ---------- BULK SWAP DECISIONS ----------
+# Approvals are planned in memory under BEGIN IMMEDIATE. Requests are taken
+# oldest first, and a bunk vacated by one move can be used by a later one in
+# the same batch. The moves then go through the allocation service as one
+# batch, and the status changes are written with executemany.
+
+def decide_swap_requests(request_ids, action):
+    """
+    Approves or rejects many room swap requests in one transaction.
+    Returns (a DecisionOutcome per requested id in id order, decided
+    student ids). A request whose room is full stays pending and is
+    reported as failed.
+    """
     db = get_db()
-    db.execute("""
-        CREATE TABLE IF NOT EXISTS room_swap_requests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            current_room_id INTEGER NOT NULL,
-            requested_room_id INTEGER NOT NULL,
-            status TEXT DEFAULT 'pending',
-            created_at INTEGER DEFAULT (strftime('%s','now')),
-            decided_at INTEGER
+
+    def attempt():
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            outcomes = _decide(db, request_ids, action)
+            db.commit()
+            return outcomes
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+    return retry_on_busy(attempt)
+
+
+def _decide(db, request_ids, action):
+    now = int(time.time())
+    rows = {
+        r["id"]: r
+        for r in db.execute("""
+            SELECT rs.id, rs.student_id, rs.requested_room_id, rs.status,
+                   d.requested_bunk_id
+            FROM room_swap_requests rs
+            LEFT JOIN room_swap_details d ON d.swap_request_id = rs.id
+            WHERE rs.id IN (SELECT value FROM json_each(?))
+        """, (json_ids(request_ids),))
+    }
+
+    outcomes = {}
+    pending = []
+    for rid in request_ids:
+        row = rows.get(rid)
+        if row is None:
+            outcomes[rid] = DecisionOutcome(rid, SKIPPED, "request not found")
+        elif row["status"] != "pending":
+            outcomes[rid] = DecisionOutcome(rid, SKIPPED, f"already {row['status']}")
+        else:
+            pending.append(row)
+
+    if action == "reject":
+        db.executemany(
+            "UPDATE room_swap_requests SET status = 'rejected', decided_at = ? WHERE id = ?",
+            [(now, r["id"]) for r in pending]
         )
-    """)
-    db.commit()
+        outcomes.update({r["id"]: DecisionOutcome(r["id"], REJECTED, "rejected") for r in pending})
+        return [outcomes[rid] for rid in request_ids], {r["student_id"] for r in pending}
+
+    # current bunk of every student involved, and free bunks of every target room
+    students = {r["student_id"] for r in pending}
+    current = {
+        a["student_id"]: (a["bunk_id"], a["room_id"])
+        for a in db.execute("""
+            SELECT student_id, bunk_id, room_id FROM current_allocations
+            WHERE student_id IN (SELECT value FROM json_each(?))
+        """, (json_ids(students),))
+    }
+    free = {}
+    for b in db.execute("""
+        SELECT id, room_id FROM bunks
+        WHERE COALESCE(occupied, 0) = 0
+          AND room_id IN (SELECT value FROM json_each(?))
+        ORDER BY id
+    """, (json_ids({r["requested_room_id"] for r in pending}),)):
+        free.setdefault(b["room_id"], []).append(b["id"])
+
+    final_bunk = {}
+    approved_ids, rejected_ids = [], []
+
+    for row in pending:
+        rid, student_id, room_id = row["id"], row["student_id"], row["requested_room_id"]
+        here = current.get(student_id)
+
+        if here is None:
+            # same rule as the single-request flow: nothing to move, close it
+            rejected_ids.append(rid)
+            outcomes[rid] = DecisionOutcome(rid, REJECTED, "student has no current bunk")
+            continue
+        if here[1] == room_id:
+            approved_ids.append(rid)
+            outcomes[rid] = DecisionOutcome(rid, APPROVED, "already in requested room")
+            continue
+
+        room_free = free.get(room_id, [])
+        if not room_free:
+            outcomes[rid] = DecisionOutcome(rid, FAILED, "requested room is full")
+            continue
+
+        wanted = row["requested_bunk_id"]
+        bunk_id = wanted if wanted in room_free else room_free[0]
+        room_free.remove(bunk_id)
+
+        free.setdefault(here[1], []).append(here[0])
+        current[student_id] = (bunk_id, room_id)
+        final_bunk[student_id] = (bunk_id, rid)
+
+        approved_ids.append(rid)
+        outcomes[rid] = DecisionOutcome(rid, APPROVED, f"moved to bunk {bunk_id}")
+
+    # a student approved twice in one batch only makes the final move
+    move_students(db, [(sid, bunk_id, rid) for sid, (bunk_id, rid) in final_bunk.items()], SWAP)
+    db.executemany(
+        "UPDATE room_swap_requests SET status = ?, decided_at = ? WHERE id = ?",
+        [("approved", now, rid) for rid in approved_ids]
+        + [("rejected", now, rid) for rid in rejected_ids]
+    )
+
+    decided = set(approved_ids) | set(rejected_ids)
+    return [outcomes[rid] for rid in request_ids], {r["student_id"] for r in pending if r["id"] in decided}
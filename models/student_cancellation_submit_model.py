@@ -1,18 +1,11 @@
 from extensions import get_db
+from models.notification_model import invalidate_notification_count
+from models.allocation_model import get_current_allocation
 
 def get_student_active_room_id(student_id):
-    """
-    Uses bunks.occupied_by to find student's current room.
-    Works even if bookings table changes.
-    """
-    db = get_db()
-    row = db.execute("""
-        SELECT room_id
-        FROM bunks
-        WHERE occupied = 1 AND occupied_by = ?
-        LIMIT 1
-    """, (student_id,)).fetchone()
-    return row["room_id"] if row else None
+    """Student's current room from current_allocations (None when not housed)."""
+    allocation = get_current_allocation(student_id)
+    return allocation["room_id"] if allocation else None
 
 
 def student_has_pending_cancellation(student_id):
@@ -36,6 +29,7 @@ def create_cancellation_request(student_id, room_id):
         VALUES (?, ?, 'pending')
     """, (student_id, room_id))
     db.commit()
+    invalidate_notification_count(student_id)
     return True, "Cancellation request submitted to admin."
 
 
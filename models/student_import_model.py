@@ -0,0 +1,479 @@
+import csv
+import json
+import os
+import secrets
+import shutil
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+
+from extensions import get_db, retry_on_busy
+from passwords import password_hasher_for_bulk, process_pool
+
+# ---------------- BULK STUDENT IMPORT ----------------
+# The CSV is read as a stream and handled in chunks: validate the chunk,
+# look up existing matric_no/email values with one query each, hash the
+# surviving passwords in a process pool, then insert the chunk with a single
+# executemany transaction. One result row is written per input row.
+
+REQUIRED_COLUMNS = ("full_name", "matric_no", "email")
+REPORT_COLUMNS = ("row", "matric_no", "email", "status", "message", "initial_password")
+
+CREATED = "created"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+
+
+class StudentImportError(ValueError):
+    """The file itself cannot be imported (e.g. missing columns)."""
+
+
+def _existing_values(db, column, values):
+    """Returns the subset of values already present in students.<column> (an expression, e.g. lower(email))."""
+    if not values:
+        return set()
+    rows = db.execute(
+        f"SELECT {column} FROM students WHERE {column} IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(values)),)
+    ).fetchall()
+    return {r[0] for r in rows}
+
+
+def _validate(index, row, seen_matric, seen_email):
+    full_name = (row.get("full_name") or "").strip()
+    matric_no = (row.get("matric_no") or "").strip()
+    email = (row.get("email") or "").strip().lower()
+    password = (row.get("password") or "").strip()
+    result = {"row": index, "matric_no": matric_no, "email": email, "initial_password": ""}
+
+    if not all([full_name, matric_no, email]):
+        return result, "full_name, matric_no and email are required"
+    if "@" not in email:
+        return result, "invalid email"
+    if password and len(password) < 6:
+        return result, "password must be at least 6 characters"
+    if matric_no in seen_matric:
+        return result, "matric_no repeated in file"
+    if email in seen_email:
+        return result, "email repeated in file"
+
+    seen_matric.add(matric_no)
+    seen_email.add(email)
+
+    if not password:
+        # no password column/value: issue one and return it in the report
+        password = secrets.token_urlsafe(9)
+        result["initial_password"] = password
+
+    result.update(
+        full_name=full_name,
+        password=password,
+        gender=(row.get("gender") or "").strip().lower() or None,
+        faculty=(row.get("faculty") or "").strip() or None,
+        department=(row.get("department") or "").strip() or None,
+    )
+    return result, None
+
+
+def _insert_chunk(db, accepted):
+    """
+    Inserts accepted rows in one transaction. If a concurrent writer took a
+    matric_no/email since the duplicate check, falls back to row-by-row so
+    only the clashing rows fail.
+    """
+    params = [
+        (r["full_name"], r["matric_no"], r["email"], r["password_hash"],
+         r["gender"], r["faculty"], r["department"])
+        for r in accepted
+    ]
+    sql = ("INSERT INTO students (full_name, matric_no, email, password, gender, faculty, department) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+    def attempt():
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(sql, params)
+            db.commit()
+            return [None] * len(accepted)
+        except sqlite3.IntegrityError:
+            db.rollback()
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            errors = []
+            for p in params:
+                try:
+                    db.execute(sql, p)
+                    errors.append(None)
+                except sqlite3.IntegrityError:
+                    errors.append("matric_no or email already exists")
+            db.commit()
+            return errors
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+    return retry_on_busy(attempt)
+
+
+def import_students(rows, report_writer=None, chunk_size=500, workers=None, pool=None):
+    """
+    Imports an iterable of dict rows (e.g. a csv.DictReader).
+    report_writer, if given, is a csv.writer that receives REPORT_COLUMNS
+    rows as they are produced. pool is a passwords.process_pool() to hash
+    in; without one, a pool of `workers` processes lives for this call only.
+    Returns a summary dict.
+    """
+    db = get_db()
+    hasher = password_hasher_for_bulk()
+    summary = {"rows": 0, "created": 0, "duplicates": 0, "invalid": 0}
+    seen_matric, seen_email = set(), set()
+    started = time.perf_counter()
+
+    if report_writer is not None:
+        report_writer.writerow(REPORT_COLUMNS)
+
+    def emit(result, status, message=""):
+        summary[{CREATED: "created", DUPLICATE: "duplicates", INVALID: "invalid"}[status]] += 1
+        if report_writer is not None:
+            report_writer.writerow((
+                result["row"], result["matric_no"], result["email"], status, message,
+                result["initial_password"] if status == CREATED else "",
+            ))
+
+    def flush(chunk):
+        # chunk: list of (result, error) in file order
+        candidates = [r for r, err in chunk if err is None]
+        taken_matric = _existing_values(db, "matric_no", {r["matric_no"] for r in candidates})
+        taken_email = _existing_values(db, "lower(email)", {r["email"] for r in candidates})
+
+        accepted = [
+            r for r in candidates
+            if r["matric_no"] not in taken_matric and r["email"] not in taken_email
+        ]
+        hashes = pool.map(
+            hasher, [r["password"] for r in accepted],
+            chunksize=max(1, len(accepted) // (workers or os.cpu_count() or 1) // 4),
+        )
+        for r, h in zip(accepted, hashes):
+            r["password_hash"] = h
+        insert_errors = dict(zip(map(id, accepted), _insert_chunk(db, accepted))) if accepted else {}
+
+        for r, err in chunk:
+            if err:
+                emit(r, INVALID, err)
+            elif r["matric_no"] in taken_matric:
+                emit(r, DUPLICATE, "matric_no already exists")
+            elif r["email"] in taken_email:
+                emit(r, DUPLICATE, "email already exists")
+            elif insert_errors.get(id(r)):
+                emit(r, DUPLICATE, insert_errors[id(r)])
+            else:
+                emit(r, CREATED)
+
+    own_pool = pool is None
+    if own_pool:
+        pool = process_pool(workers)
+    try:
+        chunk = []
+        # header is line 1, so data rows start at 2 to match what a spreadsheet shows
+        for index, row in enumerate(rows, start=2):
+            summary["rows"] += 1
+            chunk.append(_validate(index, row, seen_matric, seen_email))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    summary["seconds"] = round(elapsed, 3)
+    summary["rows_per_second"] = round(summary["rows"] / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+def import_students_csv(stream, report_stream=None, chunk_size=500, workers=None, pool=None):
+    """Imports students from a text CSV stream; writes the result report to report_stream."""
+    reader = csv.DictReader(stream)
+    fields = [f.strip().lower() for f in (reader.fieldnames or [])]
+    missing = [c for c in REQUIRED_COLUMNS if c not in fields]
+    if missing:
+        raise StudentImportError(f"CSV is missing column(s): {', '.join(missing)}")
+    reader.fieldnames = fields
+
+    writer = csv.writer(report_stream) if report_stream is not None else None
+    return import_students(reader, writer, chunk_size=chunk_size, workers=workers, pool=pool)
+
+
+# ---------------- QUEUED IMPORTS ----------------
+# Hashing a large file takes longer than a request may run, so the upload
+# request only saves the CSV and queues a job; a runner claims queued jobs
+# one at a time, so two workers never import the same file. The runner is
+# `flask run-import-jobs --poll N`, a process of its own, so an import does
+# not take CPU from the web workers. STUDENT_IMPORT_RUNNER=thread runs the
+# queue inside the web worker instead (small deployments): one job at a
+# time across all workers, hashing in at most IN_PROCESS_IMPORT_WORKERS
+# processes. The report
+# holds generated initial passwords: it is deleted once downloaded, and
+# purged after STUDENT_IMPORT_REPORT_TTL seconds if nobody fetches it.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _jobs_folder():
+    folder = os.path.join(current_app.instance_path, "import_jobs")
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def _upload_path(token):
+    return os.path.join(_jobs_folder(), f"{token}.upload.csv")
+
+
+def _report_path(token):
+    return os.path.join(_jobs_folder(), f"{token}.report.csv")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def enqueue_import(upload, filename):
+    """Saves a binary CSV stream and queues it for import. Returns the job token."""
+    token = secrets.token_hex(16)
+    with open(_upload_path(token), "wb") as f:
+        shutil.copyfileobj(upload, f)
+
+    db = get_db()
+    db.execute("INSERT INTO student_import_jobs (token, filename) VALUES (?, ?)", (token, filename[:200]))
+    db.commit()
+    return token
+
+
+def claim_import_job(exclusive=False):
+    """
+    Marks the oldest queued job running and returns it, or None. A job left
+    running past STUDENT_IMPORT_STALE_SECONDS (its runner died) is failed
+    first; re-uploading it is safe, as already created rows come back as
+    duplicates. exclusive: claim nothing while another job is running.
+    """
+    db = get_db()
+    now = int(time.time())
+    stale_before = now - current_app.config["STUDENT_IMPORT_STALE_SECONDS"]
+
+    def attempt():
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "UPDATE student_import_jobs SET status = ?, error = ?, finished_at = ? "
+                "WHERE status = ? AND started_at < ?",
+                (FAILED, "import was interrupted; upload the file again", now, RUNNING, stale_before)
+            )
+            if exclusive and db.execute(
+                "SELECT 1 FROM student_import_jobs WHERE status = ? LIMIT 1", (RUNNING,)
+            ).fetchone():
+                db.commit()
+                return None
+            job = db.execute("""
+                UPDATE student_import_jobs SET status = ?, started_at = ?
+                WHERE id = (SELECT id FROM student_import_jobs WHERE status = ? ORDER BY id LIMIT 1)
+                RETURNING *
+            """, (RUNNING, now, QUEUED)).fetchone()
+            db.commit()
+            return job
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+
+    return retry_on_busy(attempt)
+
+
+def _finish_job(token, status, summary=None, error=None):
+    db = get_db()
+    now = int(time.time())
+    expires_at = now + current_app.config["STUDENT_IMPORT_REPORT_TTL"] if status == DONE else None
+
+    def attempt():
+        db.execute(
+            "UPDATE student_import_jobs SET status = ?, summary = ?, error = ?, finished_at = ?, report_expires_at = ? "
+            "WHERE token = ?",
+            (status, json.dumps(summary) if summary else None, error, now, expires_at, token)
+        )
+        db.commit()
+
+    retry_on_busy(attempt)
+
+
+def run_import_job(job, pool=None):
+    """Imports one claimed job's file; records the summary (or the error) on the job."""
+    config = current_app.config
+    token = job["token"]
+    try:
+        with open(_upload_path(token), encoding="utf-8-sig", newline="") as stream, \
+                open(_report_path(token), "w", newline="") as report:
+            summary = import_students_csv(
+                stream, report,
+                chunk_size=config["STUDENT_IMPORT_CHUNK_SIZE"],
+                workers=config["STUDENT_IMPORT_WORKERS"],
+                pool=pool,
+            )
+    except (StudentImportError, UnicodeDecodeError, FileNotFoundError) as e:
+        _remove(_report_path(token))
+        _finish_job(token, FAILED, error=str(e))
+        return None
+    except Exception:
+        _remove(_report_path(token))
+        _finish_job(token, FAILED, error="unexpected error, see the server log")
+        raise
+    finally:
+        _remove(_upload_path(token))
+
+    _finish_job(token, DONE, summary=summary)
+    return summary
+
+
+def run_import_queue(workers=None, claim_lock=None):
+    """
+    Imports queued jobs until none is left, hashing in one process pool of
+    `workers` processes (default STUDENT_IMPORT_WORKERS) for the whole run.
+    claim_lock, if given, is held while claiming; the runner thread uses it
+    to hand over to a new thread safely, and claims exclusively. Returns the
+    number of jobs run.
+    """
+    workers = workers or current_app.config["STUDENT_IMPORT_WORKERS"]
+    pool = None
+    count = 0
+    try:
+        while True:
+            if claim_lock is None:
+                job = claim_import_job()
+            else:
+                with claim_lock:
+                    job = claim_import_job(exclusive=True)
+                    if job is None:
+                        _runner["thread"] = None
+            if job is None:
+                return count
+            if pool is None:
+                pool = process_pool(workers)
+            try:
+                run_import_job(job, pool=pool)
+            except Exception:
+                current_app.logger.exception("Student import %s failed", job["token"])
+            count += 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+IN_PROCESS_IMPORT_WORKERS = 2
+
+_runner = {"thread": None}
+_runner_lock = threading.Lock()
+
+
+def start_import_runner():
+    """
+    Starts this process' import thread unless one is already running
+    (STUDENT_IMPORT_RUNNER=thread only). The thread exits when the queue is
+    empty or another worker's thread is importing; a job queued while it is
+    on its way out starts a new one.
+    """
+    app = current_app._get_current_object()
+    workers = min(app.config["STUDENT_IMPORT_WORKERS"] or IN_PROCESS_IMPORT_WORKERS, IN_PROCESS_IMPORT_WORKERS)
+
+    def run():
+        with app.app_context():
+            run_import_queue(workers=workers, claim_lock=_runner_lock)
+
+    with _runner_lock:
+        thread = _runner["thread"]
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(target=run, name="student-import", daemon=True)
+        _runner["thread"] = thread
+        thread.start()
+
+
+def purge_import_reports():
+    """Deletes reports past their TTL. Returns how many were removed."""
+    # reports written before the queue existed never expired
+    legacy = os.path.join(current_app.instance_path, "import_reports")
+    if os.path.isdir(legacy):
+        shutil.rmtree(legacy, ignore_errors=True)
+
+    db = get_db()
+    now = int(time.time())
+    expired = [r["token"] for r in db.execute(
+        "SELECT token FROM student_import_jobs WHERE report_expires_at <= ?", (now,)
+    ).fetchall()]
+    for token in expired:
+        _remove(_report_path(token))
+    if expired:
+        def attempt():
+            db.execute("UPDATE student_import_jobs SET report_expires_at = NULL WHERE report_expires_at <= ?", (now,))
+            db.commit()
+
+        retry_on_busy(attempt)
+    return len(expired)
+
+
+def _job_dict(row):
+    job = dict(row)
+    job["summary"] = json.loads(job["summary"]) if job["summary"] else None
+    job["has_report"] = job["report_expires_at"] is not None
+    return job
+
+
+def get_import_job(token):
+    row = get_db().execute("SELECT * FROM student_import_jobs WHERE token = ?", (token,)).fetchone()
+    return _job_dict(row) if row else None
+
+
+def get_recent_import_jobs(limit=10):
+    rows = get_db().execute("SELECT * FROM student_import_jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    return [_job_dict(r) for r in rows]
+
+
+def take_import_report(token):
+    """Returns a finished job's report bytes and deletes the file, or None if it is gone."""
+    db = get_db()
+
+    def attempt():
+        # only one request gets the row back, so two clicks cannot both download
+        row = db.execute(
+            "UPDATE student_import_jobs SET report_expires_at = NULL "
+            "WHERE token = ? AND report_expires_at > ? RETURNING id", (token, int(time.time()))
+        ).fetchone()
+        db.commit()
+        return row
+
+    claimed = retry_on_busy(attempt)
+    path = _report_path(token)
+    if claimed is None:
+        _remove(path)
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    _remove(path)
+    return data
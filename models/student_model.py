@@ -1,20 +1,5 @@
 from extensions import get_db
-from werkzeug.security import generate_password_hash, check_password_hash
-
-def create_student_table():
-    db = get_db()
-    db.execute("""
-    CREATE TABLE IF NOT EXISTS students (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        matric_no TEXT UNIQUE NOT NULL,
-        full_name TEXT NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    db.commit()
-
+from passwords import hash_password, verify_password
 
 def create_student(matric_no, full_name, email, password):
     db = get_db()
@@ -24,29 +9,11 @@ def create_student(matric_no, full_name, email, password):
     """, (
         matric_no,
         full_name,
-        email,
-        generate_password_hash(password)
+        email.strip().lower(),
+        hash_password(password)
     ))
     db.commit()
 
-# Adding profile pic and department fields
-def ensure_student_profile_columns():
-    """
-    Safely adds profile_pic and department columns if missing.
-    This will NOT delete data or break existing table.
-    """
-    db = get_db()
-    cols = db.execute("PRAGMA table_info(students)").fetchall()
-    existing = {c["name"] for c in cols}
-
-    if "profile_pic" not in existing:
-        db.execute("ALTER TABLE students ADD COLUMN profile_pic TEXT")
-
-    if "department" not in existing:
-        db.execute("ALTER TABLE students ADD COLUMN department TEXT")
-
-    db.commit()
-
     # Default student account for testing
 from werkzeug.security import generate_password_hash
 from extensions import get_db
@@ -91,8 +58,20 @@ def get_student_by_matric(matric_no):
     return student
 
 def verify_student_password(student_row, plain_password):
-    # student_row["password"] is your hashed password
-    return check_password_hash(student_row["password"], plain_password)
+    """
+    Checks the password in the hashing pool. Hashes stored with outdated
+    parameters are replaced on success. Raises passwords.HashPoolBusy when
+    the pool is saturated.
+    """
+    ok, new_hash = verify_password(student_row["password"], plain_password)
+    if ok and new_hash:
+        db = get_db()
+        db.execute(
+            "UPDATE students SET password = ? WHERE id = ? AND password = ?",
+            (new_hash, student_row["id"], student_row["password"])
+        )
+        db.commit()
+    return ok
 
 # Forgot Password Helpers
 
@@ -104,7 +83,7 @@ def update_student_password(student_id, new_password):
     db = get_db()
     db.execute("""
         UPDATE students SET password = ? WHERE id = ?
-    """, (generate_password_hash(new_password), student_id))
+    """, (hash_password(new_password), student_id))
     db.commit()
 
 
@@ -142,20 +121,3 @@ def update_student_profile(student_id, full_name, email, profile_pic_filename=No
         """, (full_name.strip(), email.strip().lower(), student_id))
 
     db.commit()
-
-def ensure_student_profile_columns():
-    """
-    Adds profile_pic + department columns if missing.
-    Works safely with existing SQLite table.
-    """
-    db = get_db()
-    cols = db.execute("PRAGMA table_info(students)").fetchall()
-    existing = {c["name"] for c in cols}
-
-    if "profile_pic" not in existing:
-        db.execute("ALTER TABLE students ADD COLUMN profile_pic TEXT")
-
-    if "department" not in existing:
-        db.execute("ALTER TABLE students ADD COLUMN department TEXT")
-
-    db.commit()
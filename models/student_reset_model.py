@@ -1,20 +1,6 @@
 from extensions import get_db
 from datetime import datetime, timedelta
 
-def create_student_reset_table():
-    db = get_db()
-    db.execute("""
-        CREATE TABLE IF NOT EXISTS student_password_resets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            token TEXT UNIQUE NOT NULL,
-            expires_at TEXT NOT NULL,
-            used INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    db.commit()
-
 def create_reset_token(student_id, token, minutes_valid=30):
     db = get_db()
     expires_at = (datetime.now() + timedelta(minutes=minutes_valid)).isoformat()
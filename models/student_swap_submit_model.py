@@ -1,4 +1,5 @@
 from extensions import get_db
+from models.notification_model import invalidate_notification_count
 
 def student_has_pending_swap(student_id):
     db = get_db()
@@ -23,6 +24,7 @@ def create_room_swap_request(student_id, current_room_id, requested_room_id):
         VALUES (?, ?, ?, 'pending')
     """, (student_id, current_room_id, requested_room_id))
     db.commit()
+    invalidate_notification_count(student_id)
 
     swap_id = db.execute("SELECT last_insert_rowid() AS id").fetchone()["id"]
     return True, swap_id, "Swap request submitted."
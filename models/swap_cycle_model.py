@@ -0,0 +1,231 @@
+import time
+from collections import deque, namedtuple
+
+from extensions import get_db, retry_on_busy
+from models.allocation_model import move_students, AllocationConflict, SWAP_CYCLE
+from models.request_decision_model import json_ids
+
+# ---------- SWAP-CYCLE MATCHER ----------
+# Pending swap requests form a directed multigraph over rooms: one edge per
+# student, from the room of the bunk they hold to the room they asked for.
+# Any cycle (A->B->A, A->B->C->A, ...) can be executed without a free bunk:
+# every student takes the bunk vacated by the next student in the ring.
+#
+# Cycles are pulled out with a single walk that consumes edges (each edge is
+# pushed and popped at most once). Consumed edges are only marked, and
+# dropped from the front of their room's queue when next looked at, so
+# finding cycles stays linear in the number of pending requests even when
+# one room has thousands of them. Each cycle is executed atomically under a SAVEPOINT
+# and re-validated there, so anything that changed since planning is skipped.
+
+SwapEdge = namedtuple(
+    "SwapEdge",
+    ["request_id", "student_id", "from_room", "to_room", "bunk_id", "requested_bunk_id"],
+)
+
+CYCLES_PER_TRANSACTION = 200
+
+
+def load_swap_edges(db=None):
+    """
+    One edge per student with a pending request (their oldest), using the
+    room they are allocated to now, not the room stored on the request.
+    """
+    db = db or get_db()
+    rows = db.execute("""
+        SELECT rs.id, rs.student_id, rs.requested_room_id, d.requested_bunk_id,
+               a.bunk_id, a.room_id AS from_room
+        FROM room_swap_requests rs
+        JOIN current_allocations a ON a.student_id = rs.student_id
+        LEFT JOIN room_swap_details d ON d.swap_request_id = rs.id
+        WHERE rs.status = 'pending'
+        ORDER BY rs.id
+    """).fetchall()
+
+    edges, seen = [], set()
+    for r in rows:
+        if r["student_id"] in seen or r["from_room"] == r["requested_room_id"]:
+            continue
+        seen.add(r["student_id"])
+        edges.append(SwapEdge(r["id"], r["student_id"], r["from_room"],
+                              r["requested_room_id"], r["bunk_id"], r["requested_bunk_id"]))
+    return edges
+
+
+def find_swap_cycles(edges):
+    """
+    Returns a list of cycles; each cycle is a list of SwapEdge where
+    cycle[i].to_room == cycle[i + 1].from_room (wrapping around).
+    Older requests are tried first, and when several students could leave
+    a room the one holding the bunk the previous student asked for wins.
+    """
+    out = {}        # room -> deque of edges leaving it, oldest first
+    holding = {}    # bunk -> the edge of the student holding it
+    for e in edges:
+        out.setdefault(e.from_room, deque()).append(e)
+        holding[e.bunk_id] = e
+    used = set()    # request ids of edges consumed (in a cycle or a dead end)
+
+    def leaving(room):
+        queue = out.get(room)
+        while queue and queue[0].request_id in used:
+            queue.popleft()
+        return queue
+
+    cycles = []
+    for start in list(out):
+        while leaving(start):
+            path = []          # edges of the current walk
+            pos = {start: 0}   # room -> index in path of the edge leaving it
+            room = start
+
+            while True:
+                choices = leaving(room)
+                if not choices:
+                    # dead end: nothing leaves this room, so the edge into it is useless
+                    del pos[room]
+                    if not path:
+                        break
+                    dead = path.pop()
+                    used.add(dead.request_id)
+                    room = dead.from_room
+                    continue
+
+                wanted = holding.get(path[-1].requested_bunk_id) if path else None
+                if wanted is not None and wanted.from_room == room and wanted.request_id not in used:
+                    edge = wanted
+                else:
+                    edge = choices[0]
+                path.append(edge)
+                nxt = edge.to_room
+
+                if nxt in pos:
+                    i = pos[nxt]
+                    cycle = path[i:]
+                    for c in cycle:
+                        used.add(c.request_id)
+                        if c.from_room != nxt:
+                            del pos[c.from_room]
+                    cycles.append(cycle)
+                    del path[i:]
+                    room = nxt
+                else:
+                    pos[nxt] = len(path)
+                    room = nxt
+    return cycles
+
+
+def describe_swap_cycles(cycles, db=None):
+    """Adds student names and room numbers for the admin preview."""
+    db = db or get_db()
+    student_ids = {e.student_id for c in cycles for e in c}
+    room_ids = {r for c in cycles for e in c for r in (e.from_room, e.to_room)}
+
+    names = {
+        r["id"]: r["full_name"]
+        for r in db.execute(
+            "SELECT id, full_name FROM students WHERE id IN (SELECT value FROM json_each(?))",
+            (json_ids(student_ids),)
+        )
+    }
+    rooms = {
+        r["id"]: f"{r['hostel_name']} {r['room_number']}"
+        for r in db.execute("""
+            SELECT r.id, r.room_number, h.name AS hostel_name
+            FROM rooms r JOIN hostels h ON h.id = r.hostel_id
+            WHERE r.id IN (SELECT value FROM json_each(?))
+        """, (json_ids(room_ids),))
+    }
+
+    return [
+        [
+            {
+                "request_id": e.request_id,
+                "student": names.get(e.student_id, f"#{e.student_id}"),
+                "from_room": rooms.get(e.from_room, e.from_room),
+                "to_room": rooms.get(e.to_room, e.to_room),
+            }
+            for e in cycle
+        ]
+        for cycle in cycles
+    ]
+
+
+def _execute_cycle(db, cycle, now):
+    """Applies one cycle inside the caller's transaction; False if it went stale."""
+    k = len(cycle)
+
+    db.execute("SAVEPOINT swap_cycle")
+    try:
+        # every student takes the bunk of the next one in the ring; the service
+        # checks each still holds the planned bunk and each target is free
+        move_students(db, [
+            (cycle[i].student_id, cycle[(i + 1) % k].bunk_id, cycle[i].request_id) for i in range(k)
+        ], SWAP_CYCLE)
+        decided = db.executemany(
+            "UPDATE room_swap_requests SET status = 'approved', decided_at = ? WHERE id = ? AND status = 'pending'",
+            [(now, e.request_id) for e in cycle]
+        ).rowcount
+        if decided != k:
+            raise AllocationConflict("a request was decided meanwhile")
+    except AllocationConflict:
+        db.execute("ROLLBACK TO swap_cycle")
+        db.execute("RELEASE swap_cycle")
+        return False
+
+    db.execute("RELEASE swap_cycle")
+    return True
+
+
+def execute_swap_cycles(cycles):
+    """
+    Executes cycles, each atomically; commits every CYCLES_PER_TRANSACTION
+    cycles so the write lock is never held for long.
+    Returns (executed cycles, stale cycles).
+    """
+    db = get_db()
+    executed, stale = [], []
+
+    for start in range(0, len(cycles), CYCLES_PER_TRANSACTION):
+        batch = cycles[start:start + CYCLES_PER_TRANSACTION]
+
+        def attempt():
+            done, skipped = [], []
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                now = int(time.time())
+                for cycle in batch:
+                    (done if _execute_cycle(db, cycle, now) else skipped).append(cycle)
+                db.commit()
+            except Exception:
+                if db.in_transaction:
+                    db.rollback()
+                raise
+            return done, skipped
+
+        done, skipped = retry_on_busy(attempt)
+        executed += done
+        stale += skipped
+
+    return executed, stale
+
+
+def match_swap_cycles(dry_run=True):
+    """Finds (and unless dry_run, executes) swap cycles. Returns a summary dict."""
+    started = time.perf_counter()
+    edges = load_swap_edges()
+    cycles = find_swap_cycles(edges)
+    found_ms = (time.perf_counter() - started) * 1000
+
+    summary = {
+        "pending_edges": len(edges),
+        "cycles": cycles,
+        "students": sum(len(c) for c in cycles),
+        "find_ms": round(found_ms, 2),
+        "dry_run": dry_run,
+        "executed": [],
+        "stale": [],
+    }
+    if not dry_run and cycles:
+        summary["executed"], summary["stale"] = execute_swap_cycles(cycles)
+    return summary
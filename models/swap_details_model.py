@@ -1,19 +1,5 @@
 from extensions import get_db
 
-def create_swap_details_table():
-    db = get_db()
-    db.execute("""
-        CREATE TABLE IF NOT EXISTS room_swap_details (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            swap_request_id INTEGER NOT NULL UNIQUE,
-            requested_bunk_id INTEGER NOT NULL,
-            reason TEXT,
-            created_at INTEGER DEFAULT (strftime('%s','now')),
-            FOREIGN KEY(swap_request_id) REFERENCES room_swap_requests(id)
-        )
-    """)
-    db.commit()
-
 def save_swap_details(swap_request_id, requested_bunk_id, reason=""):
     db = get_db()
     db.execute("""
@@ -0,0 +1,427 @@
+import random
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+
+from extensions import get_db
+from passwords import password_hasher_for_bulk
+from models.room_model import default_bunk_labels
+from models.allocation_model import book_bunks
+from models.request_decision_model import json_ids
+
+# ---------- SYNTHETIC CAMPUS ----------
+# Builds a campus-sized dataset for performance work: hostels with mixed
+# room sizes, students spread over cohorts, faculties and departments
+# (alumni included), and several past sessions of bookings, swap and
+# cancellation requests, ledger entries and ratings.
+#
+# Everything is written with executemany in one transaction. The existing
+# triggers keep occupancy counters, notification counters and rating
+# aggregates in step, and this session's placements go through the
+# allocation service, so the data looks exactly like the app wrote it.
+# Synthetic students share one email domain; seeding twice is refused.
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.hostel-link.test"
+SOURCE = "synthetic"
+
+DAY = 86400
+SESSION = 365 * DAY
+PROGRAMME_YEARS = 4
+
+# faculty -> (share of students, [(department, matric code)]); earlier
+# departments in each list are the bigger ones
+FACULTIES = {
+    "Science": (0.22, [("Computer Science", "CSC"), ("Biochemistry", "BCH"), ("Microbiology", "MCB"),
+                       ("Physics", "PHY"), ("Chemistry", "CHM"), ("Mathematics", "MTH")]),
+    "Engineering": (0.18, [("Electrical Engineering", "EEE"), ("Mechanical Engineering", "MEE"),
+                           ("Civil Engineering", "CVE"), ("Chemical Engineering", "CHE"),
+                           ("Petroleum Engineering", "PTE")]),
+    "Social Sciences": (0.16, [("Economics", "ECO"), ("Political Science", "POL"),
+                               ("Psychology", "PSY"), ("Sociology", "SOC")]),
+    "Management": (0.14, [("Accounting", "ACC"), ("Business Administration", "BUS"),
+                          ("Finance", "FIN"), ("Marketing", "MKT")]),
+    "Arts": (0.12, [("English", "ENG"), ("History", "HIS"), ("Linguistics", "LIN"),
+                    ("Philosophy", "PHL"), ("Music", "MUS")]),
+    "Medicine": (0.10, [("Medicine and Surgery", "MED"), ("Nursing", "NSC"),
+                        ("Pharmacy", "PHA"), ("Physiotherapy", "PTY")]),
+    "Law": (0.05, [("Law", "LAW")]),
+    "Education": (0.03, [("Science Education", "SED"), ("Educational Management", "EDM")]),
+}
+
+FEMALE_SHARE = 0.51
+MIXED_HOSTEL_SHARE = 0.1              # co-ed hostels ("mixed", as the create-hostel form stores it)
+FACULTY_HOSTEL_SHARE = 0.2            # hostels reserved for one faculty
+ROOM_SIZES = ((2, 0.15), (4, 0.60), (6, 0.17), (8, 0.08))
+
+PAST_SWAP_RATE = 0.04                 # of placed students, per session
+PAST_CANCEL_RATE = 0.025
+PENDING_SWAP_RATE = 0.02              # this session
+PENDING_CANCEL_RATE = 0.01
+HOSTEL_RATING_RATE = 0.35
+ROOM_RATING_RATE = 0.2
+
+HOSTEL_NAMES = [
+    "Queen Amina", "Moremi", "Nnamdi Azikiwe", "Obafemi Awolowo", "Funmilayo Ransome-Kuti",
+    "Tafawa Balewa", "Margaret Ekpo", "Ahmadu Bello", "Herbert Macaulay", "Ladi Kwali",
+    "Chinua Achebe", "Flora Nwapa", "Wole Soyinka", "Dora Akunyili", "Mbonu Ojike",
+    "Alvan Ikoku", "Aminu Kano", "Kofo Ademola", "Eyo Ita", "Gambo Sawaba",
+]
+MALE_NAMES = [
+    "Chinedu", "Emeka", "Tunde", "Ibrahim", "Segun", "Obinna", "Musa", "Kelechi", "Femi", "Uche",
+    "Abdullahi", "Chukwuemeka", "Olumide", "Ikenna", "Yusuf", "Babatunde", "Nnamdi", "Sani", "Tobi", "Ifeanyi",
+]
+FEMALE_NAMES = [
+    "Chiamaka", "Ngozi", "Aisha", "Funke", "Adaeze", "Zainab", "Temitope", "Nneka", "Halima", "Bukola",
+    "Chioma", "Amina", "Folake", "Ifeoma", "Hauwa", "Yetunde", "Obiageli", "Fatima", "Kemi", "Ebere",
+]
+LAST_NAMES = [
+    "Okafor", "Adeyemi", "Bello", "Eze", "Ogunleye", "Abubakar", "Nwosu", "Olawale", "Danjuma", "Okeke",
+    "Adebayo", "Mohammed", "Obi", "Balogun", "Ibekwe", "Lawal", "Onyekachi", "Suleiman", "Ajayi", "Umeh",
+    "Oladipo", "Garba", "Chukwu", "Akinola", "Usman", "Nwachukwu", "Afolabi", "Yakubu", "Okoro", "Salami",
+]
+SWAP_REASONS = ["Closer to my faculty", "Roommate conflict", "Want to room with coursemates",
+                "Noise at night", "Medical reasons", "Ground floor needed", ""]
+RATING_COMMENTS = ["Water supply is unreliable", "Clean and quiet", "Too far from lecture halls",
+                   "Good security", "Power outages every week", "Spacious rooms", "Needs renovation"]
+
+
+class SyntheticDataError(ValueError):
+    """The generator was asked for an impossible dataset or data is already present."""
+
+
+def _timestamp_text(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _clamp_rating(value):
+    return max(1, min(5, int(round(value))))
+
+
+def _insert_hostels(db, rng, count, now):
+    names = HOSTEL_NAMES[:]
+    rng.shuffle(names)
+    mixed = round(count * MIXED_HOSTEL_SHARE)
+    females = round((count - mixed) * FEMALE_SHARE)
+    genders = ["mixed"] * mixed + ["female"] * females + ["male"] * (count - mixed - females)
+    rng.shuffle(genders)
+    faculties = list(FACULTIES)
+    faculty_weights = [FACULTIES[f][0] for f in faculties]
+
+    hostels = []
+    for n in range(count):
+        base = names[n % len(names)]
+        name = f"{base} Hall" if n < len(names) else f"{base} Hall {n // len(names) + 1}"
+        faculty = rng.choices(faculties, faculty_weights)[0] if rng.random() < FACULTY_HOSTEL_SHARE else None
+        created_at = now - rng.randint(4, 30) * SESSION // 4
+        hostel_id = db.execute(
+            "INSERT INTO hostels (name, gender, faculty, created_at) VALUES (?, ?, ?, ?)",
+            (name, genders[n], faculty, created_at)
+        ).lastrowid
+        hostels.append({"id": hostel_id, "gender": genders[n], "faculty": faculty,
+                        "quality": rng.uniform(2.4, 4.6)})
+    return hostels
+
+
+def _insert_rooms_and_bunks(db, rng, hostels, bunk_total):
+    """Sizes hostels unevenly; returns [(bunk_id, room_id, hostel_id)]."""
+    weights = [rng.uniform(0.5, 1.5) for _ in hostels]
+    targets = [int(bunk_total * w / sum(weights)) for w in weights]
+    for i in range(bunk_total - sum(targets)):
+        targets[i % len(targets)] += 1
+
+    sizes, size_weights = zip(*ROOM_SIZES)
+    rooms = []
+    for hostel, target in zip(hostels, targets):
+        style = rng.choices(sizes, size_weights)[0]
+        n = 0
+        while target > 0:
+            capacity = style if rng.random() < 0.9 else rng.choice(sizes)
+            capacity = min(capacity, target)
+            room_number = f"{chr(65 + n // 120)}{n // 30 % 4 + 1}{n % 30 + 1:02d}"
+            rooms.append((hostel["id"], room_number, "premium" if capacity <= 2 else "standard", capacity))
+            target -= capacity
+            n += 1
+    db.executemany("INSERT INTO rooms (hostel_id, room_number, type, capacity) VALUES (?, ?, ?, ?)", rooms)
+
+    hostel_ids = json_ids(h["id"] for h in hostels)
+    room_rows = db.execute(
+        "SELECT id, capacity FROM rooms WHERE hostel_id IN (SELECT value FROM json_each(?)) ORDER BY id",
+        (hostel_ids,)
+    ).fetchall()
+    db.executemany(
+        "INSERT INTO bunks (room_id, bunk_label) VALUES (?, ?)",
+        [(r["id"], label) for r in room_rows for label in default_bunk_labels(r["capacity"])]
+    )
+    return [tuple(r) for r in db.execute("""
+        SELECT k.id, k.room_id, r.hostel_id FROM bunks k JOIN rooms r ON r.id = k.room_id
+        WHERE r.hostel_id IN (SELECT value FROM json_each(?)) ORDER BY k.id
+    """, (hostel_ids,))]
+
+
+def _insert_students(db, rng, count, years, hashed, now):
+    """Cohorts entered 0 .. years + 3 sessions ago; newer cohorts are larger."""
+    cohorts = list(range(years + PROGRAMME_YEARS))
+    cohort_weights = [1.0 / (1 + 0.08 * c) for c in cohorts]
+    faculties = list(FACULTIES)
+    faculty_weights = [FACULTIES[f][0] for f in faculties]
+    this_year = datetime.fromtimestamp(now, timezone.utc).year
+
+    students, rows, sequence = [], [], Counter()
+    for i in range(count):
+        cohort = rng.choices(cohorts, cohort_weights)[0]
+        gender = "female" if rng.random() < FEMALE_SHARE else "male"
+        faculty = rng.choices(faculties, faculty_weights)[0]
+        departments = FACULTIES[faculty][1]
+        department, code = rng.choices(departments, [1.0 / (d + 1) ** 0.5 for d in range(len(departments))])[0]
+        first = rng.choice(FEMALE_NAMES if gender == "female" else MALE_NAMES)
+        last = rng.choice(LAST_NAMES)
+
+        year = (this_year - cohort) % 100
+        sequence[(year, code)] += 1
+        matric = f"SYN/{year:02d}/{code}/{sequence[(year, code)]:04d}"
+        entered = now - cohort * SESSION - rng.randint(0, 30) * DAY
+        rows.append((matric, f"{first} {last}", f"{first}.{last}.{i}@{SYNTHETIC_EMAIL_DOMAIN}".lower(),
+                     hashed, gender, faculty, department, _timestamp_text(entered)))
+        students.append({"cohort": cohort, "gender": gender, "faculty": faculty})
+
+    db.executemany("""
+        INSERT INTO students (matric_no, full_name, email, password, gender, faculty, department, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    ids = [r[0] for r in db.execute(
+        "SELECT id FROM students WHERE email LIKE ? ORDER BY id", (f"%@{SYNTHETIC_EMAIL_DOMAIN}",)
+    )]
+    for student, student_id in zip(students, ids):
+        student["id"] = student_id
+    return students
+
+
+def _place(rng, bunks, hostels_by_id, candidates, occupancy):
+    """
+    Fills a share of the bunks with candidates of the right gender (any,
+    for mixed hostels) and faculty (for reserved hostels).
+    Returns [(student, bunk_row)].
+    """
+    # one queue per (gender or None, faculty or None) a hostel can ask for
+    queues = defaultdict(deque)
+    shuffled = candidates[:]
+    rng.shuffle(shuffled)
+    for s in shuffled:
+        for gender in (s["gender"], None):
+            queues[(gender, s["faculty"])].append(s)
+            queues[(gender, None)].append(s)
+
+    wanted = bunks[:]
+    rng.shuffle(wanted)
+    wanted = wanted[:int(len(wanted) * occupancy)]
+    # most restrictive hostels first, so open ones do not use up their students
+    wanted.sort(key=lambda b: (hostels_by_id[b[2]]["faculty"] is None, hostels_by_id[b[2]]["gender"] == "mixed"))
+
+    placed, taken = [], set()
+    for bunk in wanted:
+        hostel = hostels_by_id[bunk[2]]
+        queue = queues[(None if hostel["gender"] == "mixed" else hostel["gender"], hostel["faculty"])]
+        while queue and queue[0]["id"] in taken:
+            queue.popleft()
+        if queue:
+            student = queue.popleft()
+            taken.add(student["id"])
+            placed.append((student, bunk))
+    return placed
+
+
+def _bunks_by_gender(bunks, hostels_by_id):
+    """Bunks a male/female student may ask for: their gender's hostels plus mixed ones."""
+    by_gender = defaultdict(list)
+    for bunk in bunks:
+        gender = hostels_by_id[bunk[2]]["gender"]
+        for g in (("male", "female") if gender == "mixed" else (gender,)):
+            by_gender[g].append(bunk)
+    return by_gender
+
+
+def _pick_swap_target(rng, student, bunk, bunks_by_gender):
+    """Another bunk the student may live in, usually in the same hostel."""
+    pool = bunks_by_gender[student["gender"]]
+    for _ in range(20):
+        target = rng.choice(pool)
+        if target[1] != bunk[1] and (target[2] == bunk[2] or rng.random() < 0.3):
+            return target
+    return None
+
+
+def _insert_requests(db, swaps, cancellations):
+    """swaps: (student_id, current_room, bunk_row, status, created, decided, reason)."""
+    db.executemany("""
+        INSERT INTO room_swap_requests (student_id, current_room_id, requested_room_id, status, created_at, decided_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(s, room, target[1], status, created, decided) for s, room, target, status, created, decided, _ in swaps])
+    db.executemany("""
+        INSERT INTO room_swap_details (swap_request_id, requested_bunk_id, reason, created_at)
+        SELECT id, ?, ?, created_at FROM room_swap_requests WHERE student_id = ? AND created_at = ?
+    """, [(target[0], reason, s, created) for s, _, target, _, created, _, reason in swaps])
+    db.executemany("""
+        INSERT INTO cancellation_requests (student_id, room_id, status, created_at, decided_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, cancellations)
+
+
+def _insert_past_sessions(db, rng, years, students, bunks, hostels_by_id, now):
+    """Completed sessions, oldest first. Returns (placements, counts) for the rating pass."""
+    bunks_by_gender = _bunks_by_gender(bunks, hostels_by_id)
+
+    placements, counts = [], Counter()
+    for ago in range(years, 0, -1):
+        start = now - ago * SESSION
+        end = start + 300 * DAY
+        enrolled = [s for s in students if ago <= s["cohort"] < ago + PROGRAMME_YEARS]
+
+        bookings, ledger, swaps, cancellations = [], [], [], []
+        for student, bunk in _place(rng, bunks, hostels_by_id, enrolled, rng.uniform(0.8, 0.95)):
+            booked = start + rng.randint(0, 20 * DAY)
+            ledger.append((student["id"], "book", bunk[2], bunk[1], bunk[0], None, booked))
+            final, status, released = bunk, "completed", end
+
+            roll = rng.random()
+            if roll < PAST_SWAP_RATE:
+                target = _pick_swap_target(rng, student, bunk, bunks_by_gender)
+                if target:
+                    created = booked + rng.randint(5 * DAY, 120 * DAY)
+                    decided = created + rng.randint(DAY // 2, 7 * DAY)
+                    approved = rng.random() < 0.55
+                    swaps.append((student["id"], bunk[1], target, "approved" if approved else "rejected",
+                                  created, decided, rng.choice(SWAP_REASONS)))
+                    if approved:
+                        ledger.append((student["id"], "move", target[2], target[1], target[0], bunk[0], decided))
+                        final = target
+            elif roll < PAST_SWAP_RATE + PAST_CANCEL_RATE:
+                created = booked + rng.randint(10 * DAY, 200 * DAY)
+                decided = created + rng.randint(DAY // 2, 10 * DAY)
+                approved = rng.random() < 0.7
+                cancellations.append((student["id"], bunk[1], "approved" if approved else "rejected", created, decided))
+                if approved:
+                    status, released = "cancelled", decided
+
+            ledger.append((student["id"], "release", final[2], final[1], final[0], None, released))
+            bookings.append((student["id"], final[2], final[1], final[0], status, _timestamp_text(booked)))
+            placements.append((student["id"], final, booked))
+
+        db.executemany("""
+            INSERT INTO bookings (student_id, hostel_id, room_id, bunk_id, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, bookings)
+        db.executemany(f"""
+            INSERT INTO allocation_ledger (student_id, action, hostel_id, room_id, bunk_id, from_bunk_id, source, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, '{SOURCE}', ?)
+        """, sorted(ledger, key=lambda row: row[-1]))
+        _insert_requests(db, swaps, cancellations)
+
+        counts["past_bookings"] += len(bookings)
+        counts["swap_requests"] += len(swaps)
+        counts["cancellation_requests"] += len(cancellations)
+    return placements, counts
+
+
+def _insert_current_session(db, rng, students, bunks, hostels_by_id, occupancy, now):
+    enrolled = [s for s in students if s["cohort"] < PROGRAMME_YEARS]
+    placed = _place(rng, bunks, hostels_by_id, enrolled, occupancy)
+    book_bunks(db, [(student["id"], bunk[0], None) for student, bunk in placed], SOURCE)
+
+    bunks_by_gender = _bunks_by_gender(bunks, hostels_by_id)
+
+    swaps, cancellations = [], []
+    for student, bunk in placed:
+        roll = rng.random()
+        created = now - rng.randint(DAY, 30 * DAY)
+        if roll < PENDING_SWAP_RATE:
+            target = _pick_swap_target(rng, student, bunk, bunks_by_gender)
+            if target:
+                swaps.append((student["id"], bunk[1], target, "pending", created, None, rng.choice(SWAP_REASONS)))
+        elif roll < PENDING_SWAP_RATE + PENDING_CANCEL_RATE:
+            cancellations.append((student["id"], bunk[1], "pending", created, None))
+    _insert_requests(db, swaps, cancellations)
+
+    return [(student["id"], bunk, now - rng.randint(DAY, 60 * DAY)) for student, bunk in placed], {
+        "enrolled": len(enrolled),
+        "housed": len(placed),
+        "pending_swaps": len(swaps),
+        "pending_cancellations": len(cancellations),
+    }
+
+
+def _insert_ratings(db, rng, placements, hostels_by_id, now):
+    room_offsets = {}
+    rows = []
+    for student_id, bunk, lived_from in placements:
+        quality = hostels_by_id[bunk[2]]["quality"]
+        rated_at = min(now, lived_from + rng.randint(30 * DAY, 250 * DAY))
+        if rng.random() < HOSTEL_RATING_RATE:
+            comment = rng.choice(RATING_COMMENTS) if rng.random() < 0.2 else None
+            rows.append((student_id, bunk[2], None, _clamp_rating(rng.gauss(quality, 0.9)), comment, rated_at))
+        if rng.random() < ROOM_RATING_RATE:
+            offset = room_offsets.setdefault(bunk[1], rng.gauss(0, 0.4))
+            comment = rng.choice(RATING_COMMENTS) if rng.random() < 0.2 else None
+            rows.append((student_id, bunk[2], bunk[1], _clamp_rating(rng.gauss(quality + offset, 0.9)), comment, rated_at))
+
+    before = db.execute("SELECT COUNT(*) FROM ratings").fetchone()[0]
+    # a student who lived in the same hostel twice keeps the first rating
+    db.executemany("""
+        INSERT OR IGNORE INTO ratings (student_id, hostel_id, room_id, rating, comment, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+    return db.execute("SELECT COUNT(*) FROM ratings").fetchone()[0] - before
+
+
+def seed_synthetic(students=40000, hostels=50, bunks=15000, years=3, occupancy=0.85,
+                   seed=1, password="student123"):
+    """
+    Generates the synthetic campus in one transaction. Every synthetic
+    student's password is `password`. Returns a summary dict of row counts.
+    """
+    if students < 1 or hostels < 1 or years < 0:
+        raise SyntheticDataError("students and hostels must be positive and years not negative")
+    if bunks < hostels:
+        raise SyntheticDataError("need at least one bunk per hostel")
+    if not 0 <= occupancy <= 1:
+        raise SyntheticDataError("occupancy is a share between 0 and 1")
+
+    db = get_db()
+    if db.execute("SELECT 1 FROM students WHERE email LIKE ? LIMIT 1", (f"%@{SYNTHETIC_EMAIL_DOMAIN}",)).fetchone():
+        raise SyntheticDataError("synthetic data is already present in this database")
+
+    rng = random.Random(seed)
+    # one hash shared by every synthetic student, computed before taking the write lock
+    hashed = password_hasher_for_bulk()(password)
+    started = time.perf_counter()
+    now = int(time.time())
+
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        hostel_rows = _insert_hostels(db, rng, hostels, now)
+        hostels_by_id = {h["id"]: h for h in hostel_rows}
+        bunk_rows = _insert_rooms_and_bunks(db, rng, hostel_rows, bunks)
+        student_rows = _insert_students(db, rng, students, years, hashed, now)
+
+        past, counts = _insert_past_sessions(db, rng, years, student_rows, bunk_rows, hostels_by_id, now)
+        current, current_counts = _insert_current_session(
+            db, rng, student_rows, bunk_rows, hostels_by_id, occupancy, now
+        )
+        ratings = _insert_ratings(db, rng, past + current, hostels_by_id, now)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        "hostels": len(hostel_rows),
+        "bunks": len(bunk_rows),
+        "students": len(student_rows),
+        "current_students": current_counts["enrolled"],
+        "housed": current_counts["housed"],
+        "past_bookings": counts["past_bookings"],
+        "swap_requests": counts["swap_requests"] + current_counts["pending_swaps"],
+        "cancellation_requests": counts["cancellation_requests"] + current_counts["pending_cancellations"],
+        "pending_requests": current_counts["pending_swaps"] + current_counts["pending_cancellations"],
+        "ratings": ratings,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,222 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from functools import partial
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+from config import Config
+
+
+# ------------------- PASSWORD HASHING POOL ----------------------------
+# Password hashing is pure CPU. Instead of running it on the request
+# thread, every hash/verify goes to a small per-worker process pool with a
+# bounded number of in-flight jobs, so a login burst waits (or is turned
+# away) here rather than occupying the threads that serve bookings.
+
+# Pools are started lazily from a worker that already runs request threads
+# and holds SQLite connections. A plain fork would copy that state into the
+# pool processes (including locks other threads hold at that moment), so
+# they are started from a clean forkserver process instead (spawn where
+# forkserver is unavailable).
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+if _POOL_CONTEXT.get_start_method() == "forkserver":
+    # pool processes start with this module (and werkzeug) already imported
+    _POOL_CONTEXT.set_forkserver_preload(["passwords"])
+
+
+def process_pool(workers):
+    """A ProcessPoolExecutor that is safe to start from a threaded worker."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=_POOL_CONTEXT)
+
+
+class HashPoolBusy(Exception):
+    """Raised when the hashing queue stays full for PASSWORD_POOL_TIMEOUT."""
+
+
+def _method_prefix(stored_hash):
+    return (stored_hash or "").split("$", 1)[0]
+
+
+def _verify(stored_hash, password, method, wanted_prefix):
+    """Runs in a pool process: verifies and, if the stored parameters are outdated, rehashes."""
+    if not check_password_hash(stored_hash, password):
+        return False, None
+    if _method_prefix(stored_hash) != wanted_prefix:
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+class HashPool:
+    def __init__(self, method, workers=2, max_pending=32, timeout=10.0, sample_size=500):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pid = os.getpid()
+        # full "method:params" prefix werkzeug writes for self.method, e.g. "pbkdf2:sha256:600000"
+        self.prefix = _method_prefix(generate_password_hash("", method=method))
+
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=sample_size)
+        self._stats = {
+            "submitted": 0,
+            "finished": 0,
+            "rejected": 0,
+            "pending": 0,
+            "pending_max": 0,
+            "rehashed": 0,
+        }
+
+    def _finish(self, start, future=None):
+        # runs when the job itself is done, not when the caller stops waiting,
+        # so a job that outlives PASSWORD_POOL_TIMEOUT keeps holding its slot
+        with self._lock:
+            self._stats["pending"] -= 1
+            self._stats["finished"] += 1
+            self._latencies.append((time.perf_counter() - start) * 1000)
+        self._slots.release()
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HashPoolBusy(f"Password hashing queue full for {self.timeout}s")
+
+        start = time.perf_counter()
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["pending"] += 1
+            self._stats["pending_max"] = max(self._stats["pending_max"], self._stats["pending"])
+
+        if self.workers <= 0:
+            try:
+                return fn(*args)   # inline mode (single-process scripts)
+            finally:
+                self._finish(start)
+
+        try:
+            if self._executor is None:
+                with self._lock:
+                    if self._executor is None:
+                        self._executor = process_pool(self.workers)
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._finish(start)
+            raise
+        future.add_done_callback(partial(self._finish, start))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HashPoolBusy(f"Password hashing took longer than {self.timeout}s")
+
+    def hash(self, password):
+        return self._run(partial(generate_password_hash, method=self.method), password)
+
+    def verify(self, stored_hash, password):
+        """Returns (ok, new_hash); new_hash is set when the caller should store an upgraded hash."""
+        if not stored_hash:
+            return False, None
+        ok, new_hash = self._run(_verify, stored_hash, password, self.method, self.prefix)
+        if new_hash:
+            with self._lock:
+                self._stats["rehashed"] += 1
+        return ok, new_hash
+
+    def needs_rehash(self, stored_hash):
+        return _method_prefix(stored_hash) != self.prefix
+
+    def shutdown(self, wait=False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            samples = sorted(self._latencies)
+        data.update(
+            method=self.prefix,
+            workers=self.workers,
+            max_pending=self.max_pending,
+            pid=self.pid,
+        )
+        if samples:
+            data["latency_avg_ms"] = round(sum(samples) / len(samples), 3)
+            data["latency_p95_ms"] = round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3)
+            data["latency_max_ms"] = round(samples[-1], 3)
+        return data
+
+
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+def get_hasher(config=None):
+    """Returns this process' hashing pool (created lazily, never reused across fork)."""
+    config = config or current_app.config
+    method = config.get("PASSWORD_HASH_METHOD", Config.PASSWORD_HASH_METHOD)
+
+    hasher = _hashers.get(method)
+    if hasher is not None and hasher.pid == os.getpid():
+        return hasher
+
+    with _hashers_lock:
+        hasher = _hashers.get(method)
+        if hasher is None or hasher.pid != os.getpid():
+            hasher = HashPool(
+                method,
+                workers=config.get("PASSWORD_POOL_WORKERS", Config.PASSWORD_POOL_WORKERS),
+                max_pending=config.get("PASSWORD_POOL_MAX_PENDING", Config.PASSWORD_POOL_MAX_PENDING),
+                timeout=config.get("PASSWORD_POOL_TIMEOUT", Config.PASSWORD_POOL_TIMEOUT),
+            )
+            _hashers[method] = hasher
+    return hasher
+
+
+def reset_hashers():
+    """Forgets every hashing pool without shutting it down (call after fork)."""
+    with _hashers_lock:
+        _hashers.clear()
+
+
+def shutdown_hashers(wait=False):
+    """
+    Stops this process' hashing pools. Pass wait=True from a process that
+    exits right after (e.g. a multiprocessing child), otherwise its exit
+    handler can close the pool's queues before the workers were told to stop.
+    """
+    with _hashers_lock:
+        for hasher in _hashers.values():
+            if hasher.pid == os.getpid():
+                hasher.shutdown(wait=wait)
+        _hashers.clear()
+
+
+def get_hasher_stats():
+    return [h.stats() for h in _hashers.values() if h.pid == os.getpid()]
+
+
+def hash_password(password):
+    return get_hasher().hash(password)
+
+
+def verify_password(stored_hash, password):
+    """Returns (ok, new_hash). Raises HashPoolBusy when the pool is saturated."""
+    return get_hasher().verify(stored_hash, password)
+
+
+def password_hasher_for_bulk(config=None):
+    """Picklable hash function using the configured method, for callers running their own pool."""
+    config = config or current_app.config
+    return partial(generate_password_hash, method=config.get("PASSWORD_HASH_METHOD", Config.PASSWORD_HASH_METHOD))
@@ -1,7 +1,16 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-from extensions import get_db, save_file
-from werkzeug.security import generate_password_hash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, current_app, send_file, abort
+from extensions import get_db, save_file, get_pool
+from passwords import hash_password, get_hasher_stats
 from routes.decorators import admin_login_required
+from models.login_throttle_model import get_throttle_entries, clear_throttle
+from models.student_import_model import (
+    enqueue_import, start_import_runner, get_import_job, get_recent_import_jobs, take_import_report, purge_import_reports,
+)
+from sql_profiler import get_profiler
+from models.auto_allocation_model import (
+    preview_allocation, run_allocation, describe_assignments, AllocationStale, UNPLACED_MESSAGES,
+)
+import io
 import os
 import time
 import re
@@ -27,6 +36,33 @@ def admin_login_required(f):
 def dashboard():
     return render_template("admin/dashboard.html")
 
+# ---------------- DATABASE POOL HEALTH ----------------
+@admin_bp.route("/admin/_health")
+@admin_login_required
+def health():
+    pool = get_pool()
+    return jsonify({
+        "db": pool.health(),
+        "db_pool": pool.stats(),
+        "password_hashing": get_hasher_stats(),
+    })
+
+# ---------------- SQL PROFILER ----------------
+@admin_bp.route("/admin/_perf", methods=["GET", "POST"])
+@admin_login_required
+def perf():
+    profiler = get_profiler(current_app)
+    if request.method == "POST":
+        if profiler is not None:
+            profiler.store.reset()
+        flash("SQL profile reset on every worker")
+        return redirect(url_for("admin.perf"))
+
+    report = profiler.store.report() if profiler is not None else None
+    if request.args.get("format") == "json":
+        return jsonify({"enabled": profiler is not None, "pid": os.getpid(), **(report or {})})
+    return render_template("admin/perf.html", report=report, pid=os.getpid())
+
 # ---------------- CREATE ADMIN ----------------
 @admin_bp.route("/admin/create-admin", methods=["GET", "POST"])
 @admin_login_required
@@ -61,7 +97,7 @@ def create_admin():
 
         db.execute(
             "INSERT INTO admins (first_name, last_name, nickname, email, password) VALUES (?, ?, ?, ?, ?)",
-            (first_name, last_name, nickname, email, generate_password_hash(password))
+            (first_name, last_name, nickname, email, hash_password(password))
         )
         db.commit()
         flash("New admin created successfully!")
@@ -76,9 +112,12 @@ def create_student():
     if request.method == "POST":
         full_name = request.form["full_name"].strip()
         matric_no = request.form["matric_no"].strip()
-        email = request.form["email"].strip()
+        email = request.form["email"].strip().lower()
         password = request.form["password"].strip()
         confirm_password = request.form["confirm_password"].strip()
+        gender = request.form.get("gender", "").strip().lower() or None
+        faculty = request.form.get("faculty", "").strip() or None
+        department = request.form.get("department", "").strip() or None
 
         # Server-side validation
         if not all([full_name, matric_no, email, password, confirm_password]):
@@ -95,7 +134,7 @@ def create_student():
 
         db = get_db()
         # Check if email or matric exists
-        existing_email = db.execute("SELECT * FROM students WHERE email = ?", (email,)).fetchone()
+        existing_email = db.execute("SELECT * FROM students WHERE lower(email) = ?", (email,)).fetchone()
         existing_matric = db.execute("SELECT * FROM students WHERE matric_no = ?", (matric_no,)).fetchone()
         if existing_email:
             flash("Email already exists")
@@ -105,8 +144,9 @@ def create_student():
             return redirect(url_for("admin.create_student"))
 
         db.execute(
-            "INSERT INTO students (full_name, matric_no, email, password) VALUES (?, ?, ?, ?)",
-            (full_name, matric_no, email, generate_password_hash(password))
+            "INSERT INTO students (full_name, matric_no, email, password, gender, faculty, department) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (full_name, matric_no, email, hash_password(password), gender, faculty, department)
         )
         db.commit()
         flash("New student created successfully!")
@@ -114,74 +154,89 @@ def create_student():
 
     return render_template("admin/create_student.html")
 
-# ------------------- CANCELLATION REQUESTS ----------------
-@admin_bp.route("/admin/cancellation-requests")
-@admin_login_required
-def cancellation_requests():
-    db = get_db()
-    requests = db.execute("""
-        SELECT cr.id, s.full_name, r.room_number, cr.status, cr.created_at
-        FROM cancellation_requests cr
-        JOIN students s ON cr.student_id = s.id
-        JOIN rooms r ON cr.room_id = r.id
-        ORDER BY cr.created_at DESC
-    """).fetchall()
-    return render_template("admin/cancellation_requests.html", requests=requests)
-
-# ------------------- ROOM SWAP REQUESTS ----------------
-
-@admin_bp.route("/admin/room-swap-requests", methods=["GET", "POST"])
+# ---------------- LOGIN THROTTLE ----------------
+@admin_bp.route("/admin/login-throttle", methods=["GET", "POST"])
 @admin_login_required
-def room_swap_requests():
-    db = get_db()
+def login_throttle():
+    if request.method == "POST":
+        scope = request.form.get("scope", "")
+        key = request.form.get("key", "")
+        clear_throttle(scope, key)
+        flash(f"Cleared login limits for {scope} {key}")
+        return redirect(url_for("admin.login_throttle"))
 
+    return render_template("admin/login_throttle.html", entries=get_throttle_entries())
+
+
+# ---------------- BULK STUDENT IMPORT ----------------
+# The upload is only saved and queued here; hashing thousands of passwords
+# would outlast the request timeout. The job page polls until it is done.
+@admin_bp.route("/admin/students/import", methods=["GET", "POST"])
+@admin_login_required
+def import_students():
     if request.method == "POST":
-        action = request.form.get("action")
-        request_id = request.form.get("request_id")
-
-        # Fetch the swap request
-        swap_req = db.execute("SELECT * FROM room_swap_requests WHERE id = ?", (request_id,)).fetchone()
-        if not swap_req:
-            flash("Request not found")
-            return redirect(url_for("admin.room_swap_requests"))
-
-        if action == "approve":
-            # Swap students: we assume each room has a bunk assigned (student_id in bunk)
-            # Fetch current and requested rooms
-            db.execute("""
-                UPDATE bunks
-                SET student_id = CASE
-                    WHEN student_id = ? THEN NULL
-                    WHEN student_id IS NULL AND id = ? THEN ?
-                    ELSE student_id
-                END
-                WHERE room_id IN (?, ?)
-            """, (swap_req['student_id'], swap_req['requested_room_id'], swap_req['student_id'], swap_req['current_room_id'], swap_req['requested_room_id']))
-
-            db.execute("UPDATE room_swap_requests SET status = 'approved' WHERE id = ?", (request_id,))
-            db.commit()
-            flash("Room swap approved")
-
-        elif action == "reject":
-            db.execute("UPDATE room_swap_requests SET status = 'rejected' WHERE id = ?", (request_id,))
-            db.commit()
-            flash("Room swap rejected")
-
-        return redirect(url_for("admin.room_swap_requests"))
-
-    # Fetch all swap requests
-    requests = db.execute("""
-        SELECT rs.id, s.full_name, cr.room_number AS current_room, rr.room_number AS requested_room, rs.status, rs.created_at
-        FROM room_swap_requests rs
-        JOIN students s ON rs.student_id = s.id
-        JOIN rooms cr ON rs.current_room_id = cr.id
-        JOIN rooms rr ON rs.requested_room_id = rr.id
-        ORDER BY rs.created_at DESC
-    """).fetchall()
-
-    return render_template("admin/room_swap_requests.html", requests=requests)
+        upload = request.files.get("file")
+        if not upload or not upload.filename.lower().endswith(".csv"):
+            flash("Please upload a .csv file")
+            return redirect(url_for("admin.import_students"))
+
+        token = enqueue_import(upload.stream, upload.filename)
+        if current_app.config["STUDENT_IMPORT_RUNNER"] == "thread":
+            start_import_runner()
+        return redirect(url_for("admin.import_job", token=token))
+
+    purge_import_reports()
+    return render_template("admin/import_students.html", jobs=get_recent_import_jobs())
 
 
+@admin_bp.route("/admin/students/import/jobs/<token>")
+@admin_login_required
+def import_job(token):
+    purge_import_reports()
+    job = get_import_job(token)
+    if job is None:
+        abort(404)
+    if job["status"] == "queued" and current_app.config["STUDENT_IMPORT_RUNNER"] == "thread":
+        # the worker that queued it may have restarted before starting it
+        start_import_runner()
+    return render_template("admin/import_students.html", job=job, jobs=get_recent_import_jobs())
+
+
+@admin_bp.route("/admin/students/import/<token>.csv")
+@admin_login_required
+def import_report(token):
+    if not re.fullmatch(r"[0-9a-f]{32}", token):
+        abort(404)
+    data = take_import_report(token)
+    if data is None:
+        flash("That report has already been downloaded or has expired")
+        return redirect(url_for("admin.import_students"))
+    return send_file(io.BytesIO(data), mimetype="text/csv", as_attachment=True,
+                     download_name=f"student-import-{token[:8]}.csv")
+
+# ---------------- AUTO-ALLOCATION ----------------
+@admin_bp.route("/admin/auto-allocate", methods=["GET", "POST"])
+@admin_login_required
+def auto_allocate():
+    if request.method == "POST":
+        try:
+            result = run_allocation(expected_token=request.form.get("token"))
+        except AllocationStale as e:
+            flash(f"Nothing was allocated: {e}. Review the new preview and try again.")
+            return redirect(url_for("admin.auto_allocate"))
+
+        flash(f"Allocated {result['committed']} student(s) to free bunks.")
+        return redirect(url_for("admin.auto_allocate"))
+
+    # GET: dry run preview
+    preview = preview_allocation()
+    return render_template(
+        "admin/auto_allocate.html",
+        preview=preview,
+        sample=describe_assignments(preview["assignments"]),
+        unplaced_messages=UNPLACED_MESSAGES,
+    )
+
 # ---------------- ADMIN PROFILE ----------------
 @admin_bp.route("/admin/profile", methods=["GET", "POST"])
 @admin_login_required
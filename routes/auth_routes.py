@@ -2,7 +2,8 @@ import random
 import time
 from flask import Flask, Blueprint, render_template, request, redirect, url_for, session, flash
 from extensions import get_db
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import hash_password, verify_password, HashPoolBusy
+from models.login_throttle_model import throttle_login, record_login_failure, record_login_success
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -12,13 +13,33 @@ def login():
     if request.method == "POST":
         email = request.form["email"]
         password = request.form["password"]
+
+        retry_after = throttle_login("admin", email)
+        if retry_after:
+            flash(f"Too many login attempts. Please wait {retry_after} seconds and try again.")
+            return render_template("auth/login.html"), 429, {"Retry-After": str(retry_after)}
+
         db = get_db()
         admin = db.execute("SELECT * FROM admins WHERE email = ?", (email,)).fetchone()
 
-        if admin and check_password_hash(admin["password"], password):
+        try:
+            ok, new_hash = verify_password(admin["password"], password) if admin else (False, None)
+        except HashPoolBusy:
+            flash("Too many sign-ins right now. Please try again in a few seconds.")
+            return render_template("auth/login.html"), 503, {"Retry-After": "5"}
+
+        if ok:
+            record_login_success("admin", email)
+            if new_hash:
+                db.execute(
+                    "UPDATE admins SET password = ? WHERE id = ? AND password = ?",
+                    (new_hash, admin["id"], admin["password"])
+                )
+                db.commit()
             session["admin_id"] = admin["id"]
             session["admin_name"] = admin["nickname"]
             return redirect(url_for("auth.dashboard"))
+        record_login_failure("admin", email)
         flash("Invalid email or password")
     return render_template("auth/login.html")
 
@@ -97,7 +118,7 @@ def reset_password():
             return redirect(url_for("auth.reset_password"))
 
         # Update password
-        db.execute("UPDATE admins SET password = ? WHERE email = ?", (generate_password_hash(new_pass), email))
+        db.execute("UPDATE admins SET password = ? WHERE email = ?", (hash_password(new_pass), email))
         db.execute("DELETE FROM password_resets WHERE email = ?", (email,))
         db.commit()
         session.pop("reset_email", None)
@@ -1,7 +1,9 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from extensions import get_db
 from routes.decorators import admin_login_required
-import time
+from models.notification_model import invalidate_notification_count
+from models.request_decision_model import parse_decision_form, summarize_decisions
+from models.cancellation_model import decide_cancellation_requests
 
 cancellation_bp = Blueprint("cancellation", __name__)
 
@@ -10,59 +12,29 @@ cancellation_bp = Blueprint("cancellation", __name__)
 def cancellation_requests():
     db = get_db()
 
-    # ---------- POST: approve/reject ----------
+    # ---------- POST: approve/reject (one or many) ----------
     if request.method == "POST":
-        req_id = request.form.get("request_id", "").strip()
-        action = request.form.get("action", "").strip().lower()
-
-        if not req_id.isdigit() or action not in ("approve", "reject"):
-            flash("Invalid action.")
-            return redirect(url_for("cancellation.cancellation_requests"))
-
-        req_row = db.execute(
-            "SELECT * FROM cancellation_requests WHERE id=?",
-            (int(req_id),)
-        ).fetchone()
-
-        if not req_row:
-            flash("Cancellation request not found.")
-            return redirect(url_for("cancellation.cancellation_requests"))
-
-        if req_row["status"] != "pending":
-            flash("This request has already been processed.")
-            return redirect(url_for("cancellation.cancellation_requests"))
-
-        if action == "reject":
-            db.execute(
-                "UPDATE cancellation_requests SET status=?, decided_at=? WHERE id=?",
-                ("rejected", int(time.time()), int(req_id))
-            )
-            db.commit()
-            flash("Cancellation request rejected.")
-            return redirect(url_for("cancellation.cancellation_requests"))
-
-        # ---------- APPROVE: free student's bunk ----------
-        student_id = req_row["student_id"]
-
-        # Find the bunk currently occupied by this student
-        bunk = db.execute(
-            "SELECT * FROM bunks WHERE student_id=? AND occupied=1 LIMIT 1",
-            (student_id,)
-        ).fetchone()
-
-        if bunk:
-            db.execute(
-                "UPDATE bunks SET occupied=0, student_id=NULL WHERE id=?",
-                (bunk["id"],)
-            )
-
-        db.execute(
-            "UPDATE cancellation_requests SET status=?, decided_at=? WHERE id=?",
-            ("approved", int(time.time()), int(req_id))
-        )
-        db.commit()
-
-        flash("Cancellation approved. Student allocation cleared.")
+        if request.is_json:
+            body = request.get_json(silent=True) or {}
+            action = str(body.get("action", "")).lower()
+            ids = sorted({int(i) for i in body.get("request_ids", []) if str(i).isdigit()})
+            if action not in ("approve", "reject") or not ids:
+                return jsonify({"error": "Invalid action."}), 400
+        else:
+            action, ids = parse_decision_form(request.form)
+            if not ids:
+                flash("Select at least one request and an action.")
+                return redirect(url_for("cancellation.cancellation_requests"))
+
+        outcomes, students = decide_cancellation_requests(ids, action)
+        for student_id in students:
+            invalidate_notification_count(student_id)
+
+        if request.is_json:
+            return jsonify([o._asdict() for o in outcomes])
+
+        for line in summarize_decisions(outcomes, "cancellation request"):
+            flash(line)
         return redirect(url_for("cancellation.cancellation_requests"))
 
     # ---------- GET: show requests ----------
@@ -1,5 +1,5 @@
 from functools import wraps
-from flask import session, redirect, url_for, flash, request
+from flask import session, redirect, url_for, flash, request, current_app, jsonify, render_template
 
 def admin_login_required(f):
     @wraps(f)
@@ -18,3 +18,47 @@ def student_login_required(f):
             return redirect(url_for("student.login_page", next=request.path))
         return f(*args, **kwargs)
     return decorated_function
+
+def booking_admission_required(f):
+    """
+    Booking-rush waiting room. Use under @student_login_required.
+    Students not yet admitted get the waiting page (GET pages), a 429 JSON
+    body with their position (API calls) or a redirect back to the queue (POST).
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_app.config.get("BOOKING_QUEUE_ENABLED"):
+            return f(*args, **kwargs)
+
+        from models.admission_model import admission_status
+        from models.booking_model import student_has_active_booking
+
+        student_id = session["student_id"]
+
+        # students who already hold a bunk (e.g. browsing rooms for a swap) skip the queue
+        if student_has_active_booking(student_id):
+            return f(*args, **kwargs)
+
+        rate = current_app.config["BOOKING_ADMIT_PER_SECOND"]
+        status = admission_status(student_id, rate, current_app.config["BOOKING_ADMISSION_WINDOW"])
+        if status["admitted"]:
+            return f(*args, **kwargs)
+
+        retry_after = str(max(1, min(status["eta_seconds"], 30)))
+
+        if request.path.startswith("/student/api/"):
+            resp = jsonify(queued=True, position=status["position"], eta_seconds=status["eta_seconds"])
+            resp.status_code = 429
+            resp.headers["Retry-After"] = retry_after
+            return resp
+
+        if request.method != "GET":
+            flash("Booking is very busy right now. You have been placed in the queue.", "error")
+            return redirect(url_for("student.book_hostel_page"))
+
+        resp = current_app.make_response(
+            render_template("student/waiting_room.html", status=status, refresh_seconds=retry_after)
+        )
+        resp.headers["Retry-After"] = retry_after
+        return resp
+    return decorated_function
@@ -1,6 +1,7 @@
-from flask import Blueprint, request, redirect, url_for, flash
+from flask import Blueprint, request, redirect, url_for, flash, jsonify
 from extensions import get_db
 from routes.decorators import admin_login_required
+from models.room_model import LayoutError, parse_layout, parse_layout_json, expand_layout_pattern, provision_hostel
 
 api = Blueprint("hostel_api", __name__)
 
@@ -53,3 +54,45 @@ def add_bunk(room_id):
 
     flash(f"Bunk {bunk_label} added successfully!")
     return redirect(url_for("hostel.manage_hostel", hostel_id=hostel_id))
+
+
+# ---------------- BULK PROVISION ----------------
+@api.route("/api/hostel/<int:hostel_id>/provision", methods=["POST"])
+@admin_login_required
+def provision(hostel_id):
+    """
+    Creates many rooms/bunks at once from a JSON body, an uploaded CSV/JSON
+    layout file or a pattern string. JSON callers get the report back;
+    the admin form gets a flash summary.
+    """
+    wants_json = request.is_json
+    dry_run = request.args.get("dry_run") == "1" or request.form.get("dry_run") == "1"
+
+    try:
+        if wants_json:
+            layout = parse_layout_json(request.get_data(as_text=True))
+        elif request.files.get("layout") and request.files["layout"].filename:
+            upload = request.files["layout"]
+            layout = parse_layout(upload.read().decode("utf-8-sig"), upload.filename)
+        elif request.form.get("pattern", "").strip():
+            layout = expand_layout_pattern(request.form["pattern"])
+        else:
+            raise LayoutError("Provide a layout file or a pattern")
+    except (LayoutError, UnicodeDecodeError) as e:
+        if wants_json:
+            return jsonify({"error": str(e)}), 400
+        flash(f"Could not read layout: {e}")
+        return redirect(url_for("hostel.manage_hostel", hostel_id=hostel_id))
+
+    report = provision_hostel(hostel_id, layout, dry_run=dry_run)
+
+    if wants_json:
+        return jsonify(report)
+
+    prefix = "Dry run: would create" if dry_run else "Created"
+    flash(f"{prefix} {report['rooms_created']} room(s) and {report['bunks_created']} bunk(s).")
+    for err in report["errors"][:10]:
+        flash(f"Row {err['row']} ({err['room_number'] or '-'}): {err['error']}")
+    if len(report["errors"]) > 10:
+        flash(f"...and {len(report['errors']) - 10} more row error(s).")
+    return redirect(url_for("hostel.manage_hostel", hostel_id=hostel_id))
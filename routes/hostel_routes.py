@@ -1,12 +1,15 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from extensions import get_db
 from routes.decorators import admin_login_required
+from models.hostel_model import get_hostels_with_occupancy, get_hostel_tree, count_hostel_rooms
 import time
 import os
 from werkzeug.utils import secure_filename
 
 hostel_bp = Blueprint("hostel", __name__)
 
+ROOMS_PER_PAGE = 50
+
 # ---------------- CREATE HOSTEL ----------------
 # ---------------- CREATE HOSTEL ----------------
 @hostel_bp.route("/admin/hostels", methods=["GET", "POST"])
@@ -67,14 +70,8 @@ def create_hostel():
 
 
 
-    # Fetch hostels and number of free bunks for each
-    hostels = db.execute("""
-        SELECT h.*,
-        (SELECT COUNT(*) FROM bunks b
-         JOIN rooms r ON b.room_id=r.id
-         WHERE r.hostel_id=h.id AND b.occupied=0) AS free_bunks
-        FROM hostels h
-    """).fetchall()
+    # Hostels carry maintained free_bunks/total_bunks counters (no per-hostel COUNT)
+    hostels = get_hostels_with_occupancy()
 
     return render_template("admin/create_hostel.html", hostels=hostels)
 
@@ -86,7 +83,7 @@ def manage_hostel(hostel_id):
     """
     Page: manage_hostels.html
     - Shows hostel details
-    - Shows all rooms + bunks
+    - Shows rooms + bunks with occupants (first page, more load as JSON)
     - Allows adding rooms/bunks dynamically
     """
     db = get_db()
@@ -97,18 +94,46 @@ def manage_hostel(hostel_id):
         flash("Hostel not found")
         return redirect(url_for("hostel.create_hostel"))
 
-    # Get rooms for this hostel
-    rooms = db.execute("SELECT * FROM rooms WHERE hostel_id=?", (hostel_id,)).fetchall()
-
-    room_data = []
-    for room in rooms:
-        # Access row columns via dict-like keys to avoid AttributeError
-        room_id = room["id"]  # <-- this fixes the 'sqlite3.Row has no attribute id'
-        bunks = db.execute("SELECT * FROM bunks WHERE room_id=?", (room_id,)).fetchall()
-        room_data.append({"room": room, "bunks": bunks})
+    # Rooms -> bunks -> occupants in one query (first page of rooms);
+    # the page pulls further rooms from hostel.hostel_tree as JSON.
+    room_data = get_hostel_tree(hostel_id, 0, ROOMS_PER_PAGE)
+    total_rooms = count_hostel_rooms(hostel_id)
 
     return render_template(
         "admin/manage_hostels.html",
         hostel=hostel,
-        room_data=room_data
+        room_data=room_data,
+        total_rooms=total_rooms,
+        next_offset=ROOMS_PER_PAGE if total_rooms > ROOMS_PER_PAGE else None
+    )
+
+
+# ---------------- HOSTEL TREE (JSON) ----------------
+@hostel_bp.route("/admin/hostel/<int:hostel_id>/tree")
+@admin_login_required
+def hostel_tree(hostel_id):
+    """
+    JSON: a page of rooms with bunks, occupants and per-room occupancy.
+    Query params: offset (default 0), limit (default ROOMS_PER_PAGE, max 500).
+    """
+    db = get_db()
+    hostel = db.execute(
+        "SELECT id, name, gender, faculty, total_bunks, free_bunks FROM hostels WHERE id=?",
+        (hostel_id,)
+    ).fetchone()
+    if not hostel:
+        return jsonify(error="Hostel not found"), 404
+
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", ROOMS_PER_PAGE, type=int), 1), 500)
+
+    tree = get_hostel_tree(hostel_id, offset, limit)
+    total_rooms = count_hostel_rooms(hostel_id)
+    next_offset = offset + limit if offset + limit < total_rooms else None
+
+    return jsonify(
+        hostel=dict(hostel),
+        total_rooms=total_rooms,
+        next_offset=next_offset,
+        rooms=[dict(block["room"], bunks=block["bunks"]) for block in tree]
     )
@@ -1,102 +1,42 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from extensions import get_db
 from routes.decorators import admin_login_required
-import time
+from models.notification_model import invalidate_notification_count
+from models.request_decision_model import parse_decision_form, summarize_decisions
+from models.room_swap_model import decide_swap_requests
+from models.swap_cycle_model import match_swap_cycles, describe_swap_cycles
 
 room_swap_bp = Blueprint("room_swap", __name__)
 
 
-def _get_free_bunk_in_room(db, room_id: int):
-    """Return a free bunk row in a room (occupied=0), else None."""
-    return db.execute(
-        "SELECT * FROM bunks WHERE room_id=? AND occupied=0 ORDER BY id ASC LIMIT 1",
-        (room_id,)
-    ).fetchone()
-
-
 @room_swap_bp.route("/admin/room-swap-requests", methods=["GET", "POST"])
 @admin_login_required
 def room_swap_requests():
     db = get_db()
 
-    # ---------------- HANDLE APPROVE/REJECT ----------------
+    # ---------------- HANDLE APPROVE/REJECT (one or many) ----------------
     if request.method == "POST":
-        req_id = request.form.get("request_id", "").strip()
-        action = request.form.get("action", "").strip().lower()
-
-        if not req_id.isdigit() or action not in ("approve", "reject"):
-            flash("Invalid request action.")
-            return redirect(url_for("room_swap.room_swap_requests"))
-
-        req_row = db.execute(
-            "SELECT * FROM room_swap_requests WHERE id=?",
-            (int(req_id),)
-        ).fetchone()
-
-        if not req_row:
-            flash("Swap request not found.")
-            return redirect(url_for("room_swap.room_swap_requests"))
-
-        if req_row["status"] != "pending":
-            flash("This request has already been processed.")
-            return redirect(url_for("room_swap.room_swap_requests"))
-
-        # Reject: simplest path
-        if action == "reject":
-            db.execute(
-                "UPDATE room_swap_requests SET status=?, decided_at=? WHERE id=?",
-                ("rejected", int(time.time()), int(req_id))
-            )
-            db.commit()
-            flash("Swap request rejected.")
-            return redirect(url_for("room_swap.room_swap_requests"))
-
-        # Approve: move student to requested room if possible
-        student_id = req_row["student_id"]
-        requested_room_id = req_row["requested_room_id"]
-
-        # Check student currently occupies a bunk
-        current_bunk = db.execute(
-            "SELECT * FROM bunks WHERE student_id=? AND occupied=1 LIMIT 1",
-            (student_id,)
-        ).fetchone()
-
-        if not current_bunk:
-            flash("Student has no current bunk allocation; cannot swap.")
-            db.execute(
-                "UPDATE room_swap_requests SET status=?, decided_at=? WHERE id=?",
-                ("rejected", int(time.time()), int(req_id))
-            )
-            db.commit()
-            return redirect(url_for("room_swap.room_swap_requests"))
-
-        # Find a free bunk in requested room
-        free_bunk = _get_free_bunk_in_room(db, requested_room_id)
-        if not free_bunk:
-            flash("Requested room is currently full. Cannot approve.")
-            return redirect(url_for("room_swap.room_swap_requests"))
-
-        # Perform swap (really: relocate student)
-        # 1) free current bunk
-        db.execute(
-            "UPDATE bunks SET occupied=0, student_id=NULL WHERE id=?",
-            (current_bunk["id"],)
-        )
-
-        # 2) occupy new bunk
-        db.execute(
-            "UPDATE bunks SET occupied=1, student_id=? WHERE id=?",
-            (student_id, free_bunk["id"])
-        )
-
-        # 3) mark request approved
-        db.execute(
-            "UPDATE room_swap_requests SET status=?, decided_at=? WHERE id=?",
-            ("approved", int(time.time()), int(req_id))
-        )
-
-        db.commit()
-        flash("Swap request approved and student moved successfully.")
+        if request.is_json:
+            body = request.get_json(silent=True) or {}
+            action = str(body.get("action", "")).lower()
+            ids = sorted({int(i) for i in body.get("request_ids", []) if str(i).isdigit()})
+            if action not in ("approve", "reject") or not ids:
+                return jsonify({"error": "Invalid request action."}), 400
+        else:
+            action, ids = parse_decision_form(request.form)
+            if not ids:
+                flash("Select at least one request and an action.")
+                return redirect(url_for("room_swap.room_swap_requests"))
+
+        outcomes, students = decide_swap_requests(ids, action)
+        for student_id in students:
+            invalidate_notification_count(student_id)
+
+        if request.is_json:
+            return jsonify([o._asdict() for o in outcomes])
+
+        for line in summarize_decisions(outcomes, "swap request"):
+            flash(line)
         return redirect(url_for("room_swap.room_swap_requests"))
 
     # ---------------- GET: SHOW REQUESTS ----------------
@@ -118,3 +58,29 @@ def room_swap_requests():
     """).fetchall()
 
     return render_template("admin/room_swap_requests.html", requests=requests)
+
+
+# ---------------- SWAP CYCLES (A->B->A, A->B->C->A ...) ----------------
+@room_swap_bp.route("/admin/room-swap-requests/cycles", methods=["GET", "POST"])
+@admin_login_required
+def swap_cycles():
+    if request.method == "POST":
+        result = match_swap_cycles(dry_run=False)
+        for cycle in result["executed"]:
+            for edge in cycle:
+                invalidate_notification_count(edge.student_id)
+
+        moved = sum(len(c) for c in result["executed"])
+        flash(f"Executed {len(result['executed'])} swap cycle(s), moving {moved} student(s).")
+        if result["stale"]:
+            flash(f"{len(result['stale'])} cycle(s) skipped because requests or bunks changed; preview again.")
+        return redirect(url_for("room_swap.room_swap_requests"))
+
+    # GET: dry run preview
+    result = match_swap_cycles(dry_run=True)
+    return render_template(
+        "admin/swap_cycles.html",
+        cycles=describe_swap_cycles(result["cycles"]),
+        pending_edges=result["pending_edges"],
+        find_ms=result["find_ms"],
+    )
@@ -1,11 +1,18 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Response, stream_with_context
 from models.student_model import get_student_by_matric, verify_student_password
+from passwords import HashPoolBusy
+from models.login_throttle_model import throttle_login, record_login_failure, record_login_success
 from models.student_reset_model import create_reset_token, get_reset_by_token, mark_token_used
 import os
-from extensions import get_db
+import json
+import random
+import threading
+import time
+from extensions import get_db, close_db
 from werkzeug.utils import secure_filename
 from flask import current_app
-from routes.decorators import student_login_required
+from routes.decorators import student_login_required, booking_admission_required
 from models.student_model import (
     get_student_by_id,
     update_student_profile,
@@ -27,14 +34,26 @@ from models.student_cancellation_submit_model import (
     get_student_cancellation_requests
 )
 from models.booking_model import get_student_current_allocation
+from models.hostel_model import (
+    get_latest_occupancy_event_id,
+    occupancy_events_pruned_after,
+    get_occupancy_events_since
+)
 from models.student_model import get_student_by_id
 from models.rating_model import (
     get_student_current_allocation_ids,
     upsert_rating,
-    get_student_ratings
+    get_student_ratings,
+    get_hostel_leaderboard,
+    get_room_leaderboard,
 )
 
-from models.notification_model import get_student_notifications
+from models.notification_model import (
+    get_student_notifications_page,
+    decode_notification_cursor,
+    mark_notifications_read,
+    LazyNotificationCount
+)
 
 
 
@@ -58,12 +77,26 @@ def login():
         flash("Matric number and password are required.", "error")
         return redirect(url_for("student.login_page"))
 
+    retry_after = throttle_login("student", matric_no)
+    if retry_after:
+        flash(f"Too many login attempts. Please wait {retry_after} seconds and try again.", "error")
+        return render_template("student/login.html"), 429, {"Retry-After": str(retry_after)}
+
     student = get_student_by_matric(matric_no)
-    if not student or not verify_student_password(student, password):
+    try:
+        ok = bool(student) and verify_student_password(student, password)
+    except HashPoolBusy:
+        # shed the login instead of tying up a worker the booking path needs
+        flash("Too many sign-ins right now. Please try again in a few seconds.", "error")
+        return render_template("student/login.html"), 503, {"Retry-After": "5"}
+
+    if not ok:
+        record_login_failure("student", matric_no)
         flash("Invalid matric number or password.", "error")
         return redirect(url_for("student.login_page"))
 
     # success: create student session
+    record_login_success("student", matric_no)
     session.clear()
     session["student_id"] = student["id"]
     session["student_matric_no"] = student["matric_no"]
@@ -267,6 +300,7 @@ def profile_update():
 # For booking management
 @student_bp.route("/book-hostel", methods=["GET"])
 @student_login_required
+@booking_admission_required
 def book_hostel_page():
     hostels = get_all_hostels()
     return render_template("student/book_hostel.html", hostels=hostels)
@@ -274,20 +308,125 @@ def book_hostel_page():
 
 @student_bp.route("/api/rooms/<int:hostel_id>", methods=["GET"])
 @student_login_required
+@booking_admission_required
 def student_rooms_api(hostel_id):
     rooms = get_rooms_by_hostel(hostel_id)
-    return jsonify([{"id": r["id"], "room_number": r["room_number"]} for r in rooms])
+    return jsonify([
+        {"id": r["id"], "room_number": r["room_number"], "free_bunks": r["free_bunks"]}
+        for r in rooms
+    ])
 
 
 @student_bp.route("/api/bunks/<int:room_id>", methods=["GET"])
 @student_login_required
+@booking_admission_required
 def student_bunks_api(room_id):
     bunks = get_available_bunks_by_room(room_id)
     return jsonify([{"id": b["id"], "bunk_label": b["bunk_label"]} for b in bunks])
 
 
+# Every open stream holds a worker thread, so each process serves at most
+# SSE_MAX_STREAMS of them; the rest of the threads stay free for bookings.
+_stream_lock = threading.Lock()
+_open_streams = 0
+
+
+def _take_stream_slot(limit):
+    global _open_streams
+    with _stream_lock:
+        if _open_streams >= limit:
+            return False
+        _open_streams += 1
+        return True
+
+
+def _release_stream_slot():
+    global _open_streams
+    with _stream_lock:
+        _open_streams -= 1
+
+
+# Not behind booking_admission_required: a 429 would make EventSource give
+# up for good, and following availability does not load the booking path.
+@student_bp.route("/api/hostels/<int:hostel_id>/availability/stream", methods=["GET"])
+@student_login_required
+def student_availability_stream(hostel_id):
+    """
+    Server-sent events with bunk occupancy deltas for one hostel.
+    Each event carries its id, so EventSource resumes from Last-Event-ID
+    after a reconnect. Streams end after SSE_STREAM_SECONDS to free the
+    worker; the browser reconnects by itself. When this worker already
+    holds SSE_MAX_STREAMS streams the reply is a short "busy" event: the
+    page refreshes its lists once and EventSource retries later.
+    """
+    if not _take_stream_slot(current_app.config["SSE_MAX_STREAMS"]):
+        retry_ms = int(current_app.config["SSE_BUSY_RETRY_SECONDS"] * 1000 * random.uniform(0.75, 1.25))
+        resp = Response(f"retry: {retry_ms}\nevent: busy\ndata: {{}}\n\n", mimetype="text/event-stream")
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
+
+    # the slot is given back when the response closes; anything that fails
+    # before that must give it back here, or the worker loses it for good
+    try:
+        raw_last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+        last_id = int(raw_last_id) if raw_last_id and raw_last_id.isdigit() else None
+
+        lifetime = current_app.config["SSE_STREAM_SECONDS"]
+        interval = current_app.config["SSE_POLL_INTERVAL"]
+
+        def events():
+            nonlocal last_id
+            yield "retry: 3000\n\n"
+
+            if last_id is None:
+                last_id = get_latest_occupancy_event_id()
+                yield f"id: {last_id}\nevent: ready\ndata: {{}}\n\n"
+            elif occupancy_events_pruned_after(last_id):
+                # too far behind: the page refetches rooms/bunks, then follows live
+                last_id = get_latest_occupancy_event_id()
+                yield f"id: {last_id}\nevent: reset\ndata: {{}}\n\n"
+
+            deadline = time.monotonic() + lifetime
+            idle = 0.0
+            while time.monotonic() < deadline:
+                rows = get_occupancy_events_since(hostel_id, last_id)
+                # give the pooled connection back between polls
+                close_db()
+
+                for r in rows:
+                    last_id = r["id"]
+                    payload = json.dumps({
+                        "room_id": r["room_id"],
+                        "bunk_id": r["bunk_id"],
+                        "bunk_label": r["bunk_label"],
+                        "occupied": bool(r["occupied"]),
+                        "room_free_bunks": r["room_free_bunks"],
+                    })
+                    yield f"id: {last_id}\nevent: bunk\ndata: {payload}\n\n"
+
+                if rows:
+                    idle = 0.0
+                    continue
+
+                idle += interval
+                if idle >= 15:
+                    yield ": keep-alive\n\n"
+                    idle = 0.0
+                time.sleep(interval)
+
+        resp = Response(stream_with_context(events()), mimetype="text/event-stream")
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["X-Accel-Buffering"] = "no"
+        resp.call_on_close(_release_stream_slot)
+    except BaseException:
+        _release_stream_slot()
+        raise
+    return resp
+
+
 @student_bp.route("/book-hostel", methods=["POST"])
 @student_login_required
+@booking_admission_required
 def book_hostel_submit():
     student_id = session.get("student_id")
     hostel_id = request.form.get("hostel_id")
@@ -422,14 +561,12 @@ def roommates_page():
         SELECT s.id,
                s.matric_no,
                s.full_name,
-               COALESCE(NULLIF(s.nickname,''), s.full_name) AS display_name,
+               s.full_name AS display_name,
                s.department
-        FROM bunks k
-        JOIN students s ON s.id = k.occupied_by
-        WHERE k.room_id = ?
-          AND k.occupied = 1
-          AND k.occupied_by IS NOT NULL
-          AND s.id != ?
+        FROM current_allocations a
+        JOIN students s ON s.id = a.student_id
+        WHERE a.room_id = ?
+          AND a.student_id != ?
         ORDER BY display_name
     """, (allocation["room_id"], student_id)).fetchall()
 
@@ -509,12 +646,57 @@ def student_logout():
 
 
 # ----------------------------NOTIFICATIONS----------------------------
+NOTIFICATIONS_PAGE_SIZE = 20
+
+
+def _notification_json(n):
+    fmt = current_app.jinja_env.filters["datetimeformat"]
+    return {
+        "type": n["type"],
+        "request_id": n["request_id"],
+        "status": n["status"],
+        "event_time": n["event_time"],
+        "event_label": fmt(n["event_time"]),
+        "created_at": n["created_at"],
+        "decided_at": n["decided_at"],
+        "hostel_name": n["hostel_name"],
+        "room_number": n["room_number"],
+        "requested_hostel_name": n["requested_hostel_name"],
+        "requested_room_number": n["requested_room_number"],
+        "requested_bunk_label": n["requested_bunk_label"],
+    }
+
+
 @student_bp.route("/notifications", methods=["GET"])
 @student_login_required
 def notifications_page():
+    """
+    HTML page with the first page of notifications. With ?cursor= (empty for
+    the first page) it returns JSON: {"items": [...], "next_cursor": ...}.
+    """
     student_id = session.get("student_id")
-    notifications = get_student_notifications(student_id)
-    return render_template("student/notifications.html", notifications=notifications)
+
+    if "cursor" in request.args:
+        raw_cursor = request.args.get("cursor", "").strip()
+        try:
+            cursor = decode_notification_cursor(raw_cursor) if raw_cursor else None
+        except ValueError:
+            return jsonify(error="Invalid cursor."), 400
+
+        items, next_cursor = get_student_notifications_page(
+            student_id, cursor, NOTIFICATIONS_PAGE_SIZE
+        )
+        return jsonify(items=[_notification_json(n) for n in items], next_cursor=next_cursor)
+
+    notifications, next_cursor = get_student_notifications_page(
+        student_id, None, NOTIFICATIONS_PAGE_SIZE
+    )
+    mark_notifications_read(student_id)
+    return render_template(
+        "student/notifications.html",
+        notifications=notifications,
+        next_cursor=next_cursor
+    )
 
 # Bell notifications counter 
 
@@ -525,9 +707,27 @@ def inject_notification_count():
     if not student_id:
         return dict(notification_count=0)
 
-    notifications = get_student_notifications(student_id)
+    # pending requests + unseen decisions, read from the maintained counter
+    # only if the template actually renders notification_count
+    return dict(notification_count=LazyNotificationCount(student_id))
+
 
-    # Count only unresolved items (pending)
-    count = sum(1 for n in notifications if n["status"] == "pending")
+# ----------------------------LEADERBOARD API----------------------------
+def _leaderboard_args():
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+    min_ratings = max(request.args.get("min_ratings", 1, type=int), 1)
+    return limit, min_ratings
 
-    return dict(notification_count=count)
+
+@student_bp.route("/api/leaderboard/hostels", methods=["GET"])
+@student_login_required
+def hostel_leaderboard_api():
+    limit, min_ratings = _leaderboard_args()
+    return jsonify(get_hostel_leaderboard(limit, min_ratings))
+
+
+@student_bp.route("/api/hostels/<int:hostel_id>/leaderboard/rooms", methods=["GET"])
+@student_login_required
+def room_leaderboard_api(hostel_id):
+    limit, min_ratings = _leaderboard_args()
+    return jsonify(get_room_leaderboard(hostel_id, limit, min_ratings))
@@ -0,0 +1,428 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import g, request
+
+
+# ------------------- PER-REQUEST SQL PROFILER ----------------------------
+# Opt-in (PROFILE_SQL=1). get_db() hands out a ProfilingConnection that
+# records every statement's normalized text, duration and row count for
+# the current request. At the end of the request the records are folded
+# into this worker's PerfStore:
+#   - per endpoint: requests, request/SQL time, queries per request;
+#   - per statement: calls, total/max time, rows;
+#   - N+1 suspects: one statement run PROFILE_SQL_REPEAT_THRESHOLD or more
+#     times in a single request.
+# Statements slower than PROFILE_SQL_SLOW_MS are logged with their
+# EXPLAIN QUERY PLAN (at most once a minute per statement).
+#
+# Every worker writes its PerfStore to instance/sql_profile/<pid>.json at
+# most every PROFILE_SQL_FLUSH_SECONDS; /admin/_perf merges all of them, so
+# the numbers do not depend on which worker serves the page. A reset drops
+# the files and leaves a marker the other workers reset themselves from.
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+MAX_STATEMENTS = 500
+
+
+def normalize_sql(sql):
+    """Collapses whitespace and replaces literals so equal statements group together."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class _Record:
+    __slots__ = ("sql", "ms", "rows")
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.ms = 0.0
+        self.rows = 0
+
+
+class ProfilingCursor:
+    """Counts fetched rows (and fetch time) into the statement's record."""
+
+    def __init__(self, cursor, record):
+        self._cursor = cursor
+        self._record = record
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self._record.ms += (time.perf_counter() - start) * 1000
+        return result
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._record.rows += 1
+        return row
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._record.rows += len(rows)
+        return rows
+
+    def fetchmany(self, size=None):
+        rows = self._timed(self._cursor.fetchmany, size or self._cursor.arraysize)
+        self._record.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ProfilingConnection:
+    """Wraps a pooled sqlite3 connection for one request."""
+
+    def __init__(self, connection, profile):
+        self.unwrapped = connection
+        self._profile = profile
+
+    def _run(self, method, sql, params, explain_params):
+        record = _Record(sql)
+        start = time.perf_counter()
+        cursor = method(sql, params)
+        record.ms = (time.perf_counter() - start) * 1000
+        if cursor.rowcount > 0:
+            record.rows = cursor.rowcount
+        self._profile.add(record, self.unwrapped, explain_params)
+        return ProfilingCursor(cursor, record)
+
+    def execute(self, sql, params=()):
+        return self._run(self.unwrapped.execute, sql, params, params)
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        return self._run(self.unwrapped.executemany, sql, seq_of_params,
+                         seq_of_params[0] if seq_of_params else None)
+
+    def __enter__(self):
+        return self.unwrapped.__enter__()
+
+    def __exit__(self, *exc):
+        return self.unwrapped.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self.unwrapped, name)
+
+
+class RequestProfile:
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.records = []
+        self.started = time.perf_counter()
+
+    def add(self, record, connection, params):
+        self.records.append(record)
+        self.profiler.check_slow(record, connection, params)
+
+
+class PerfStore:
+    """Aggregates for this worker process, shared with the others through folder."""
+
+    def __init__(self, repeat_threshold, folder=None, flush_seconds=5.0):
+        self.repeat_threshold = repeat_threshold
+        self.folder = folder
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flusher_pid = None
+        self.reset()
+
+    def _reset_local(self):
+        with self._lock:
+            self.since = time.time()
+            self.endpoints = {}
+            self.statements = {}
+
+    def reset(self):
+        """Clears this worker's figures and, through the marker file, every other worker's."""
+        if self.folder is not None:
+            os.makedirs(self.folder, exist_ok=True)
+            for name in os.listdir(self.folder):
+                if name.endswith(".json"):
+                    _remove(os.path.join(self.folder, name))
+            with open(os.path.join(self.folder, "reset"), "w") as f:
+                f.write(str(time.time()))
+        self._reset_local()
+
+    def _reset_at(self):
+        try:
+            return os.path.getmtime(os.path.join(self.folder, "reset"))
+        except OSError:
+            return 0.0
+
+    def add_request(self, endpoint, request_ms, records):
+        grouped = {}
+        for r in records:
+            key = normalize_sql(r.sql)
+            calls, ms, rows, max_ms = grouped.get(key, (0, 0.0, 0, 0.0))
+            grouped[key] = (calls + 1, ms + r.ms, rows + r.rows, max(max_ms, r.ms))
+
+        sql_ms = sum(r.ms for r in records)
+        with self._lock:
+            ep = self.endpoints.setdefault(endpoint, {
+                "endpoint": endpoint, "requests": 0, "request_ms": 0.0, "sql_ms": 0.0,
+                "queries": 0, "max_queries": 0, "max_request_ms": 0.0, "n_plus_one": Counter(),
+            })
+            ep["requests"] += 1
+            ep["request_ms"] += request_ms
+            ep["max_request_ms"] = max(ep["max_request_ms"], request_ms)
+            ep["sql_ms"] += sql_ms
+            ep["queries"] += len(records)
+            ep["max_queries"] = max(ep["max_queries"], len(records))
+
+            for key, (calls, ms, rows, max_ms) in grouped.items():
+                if calls >= self.repeat_threshold:
+                    ep["n_plus_one"][key] = max(ep["n_plus_one"][key], calls)
+
+                st = self.statements.get(key)
+                if st is None:
+                    if len(self.statements) >= MAX_STATEMENTS:
+                        continue
+                    st = self.statements[key] = {"sql": key, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+                st["calls"] += calls
+                st["total_ms"] += ms
+                st["rows"] += rows
+                st["max_ms"] = max(st["max_ms"], max_ms)
+
+            self._dirty = True
+        if self.folder is not None and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def _start_flusher(self):
+        """One thread per process (started after fork) writes the figures while they change."""
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(self.flush_seconds)
+                if self._dirty:
+                    try:
+                        self.flush()
+                    except OSError:
+                        pass   # the next round tries again
+
+        threading.Thread(target=run, name="sql-profile-flush", daemon=True).start()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "since": self.since,
+                "updated": time.time(),
+                "endpoints": {k: dict(ep, n_plus_one=dict(ep["n_plus_one"])) for k, ep in self.endpoints.items()},
+                "statements": {k: dict(st) for k, st in self.statements.items()},
+            }
+
+    def flush(self):
+        """Writes this worker's figures to its file (after catching up with a reset)."""
+        self._dirty = False
+        os.makedirs(self.folder, exist_ok=True)
+        if self._reset_at() > self.since:
+            self._reset_local()
+        path = os.path.join(self.folder, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _snapshots(self):
+        """This worker's live figures plus every other worker's last flush since the reset."""
+        own = self.snapshot()
+        if self.folder is None or not os.path.isdir(self.folder):
+            return [own]
+        if self._reset_at() > own["since"]:
+            self._reset_local()
+            own = self.snapshot()
+
+        reset_at = self._reset_at()
+        found = [own]
+        for name in os.listdir(self.folder):
+            if not name.endswith(".json") or name == f"{own['pid']}.json":
+                continue
+            try:
+                with open(os.path.join(self.folder, name)) as f:
+                    snap = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if snap["since"] >= reset_at:
+                found.append(snap)
+        return found
+
+    def report(self, top=50):
+        """All workers merged: endpoints ranked by total SQL time, statements by total time."""
+        snapshots = self._snapshots()
+        merged_endpoints, merged_statements = {}, {}
+        for snap in snapshots:
+            for key, ep in snap["endpoints"].items():
+                m = merged_endpoints.setdefault(key, {
+                    "endpoint": key, "requests": 0, "request_ms": 0.0, "sql_ms": 0.0,
+                    "queries": 0, "max_queries": 0, "max_request_ms": 0.0, "n_plus_one": Counter(),
+                })
+                for field in ("requests", "request_ms", "sql_ms", "queries"):
+                    m[field] += ep[field]
+                m["max_queries"] = max(m["max_queries"], ep["max_queries"])
+                m["max_request_ms"] = max(m["max_request_ms"], ep["max_request_ms"])
+                for sql, repeats in ep["n_plus_one"].items():
+                    m["n_plus_one"][sql] = max(m["n_plus_one"][sql], repeats)
+            for key, st in snap["statements"].items():
+                m = merged_statements.setdefault(key, {"sql": key, "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0})
+                m["calls"] += st["calls"]
+                m["total_ms"] += st["total_ms"]
+                m["rows"] += st["rows"]
+                m["max_ms"] = max(m["max_ms"], st["max_ms"])
+
+        endpoints = []
+        for ep in merged_endpoints.values():
+            n = ep["requests"]
+            endpoints.append({
+                "endpoint": ep["endpoint"],
+                "requests": n,
+                "sql_ms_total": round(ep["sql_ms"], 2),
+                "request_ms_avg": round(ep["request_ms"] / n, 2),
+                "request_ms_max": round(ep["max_request_ms"], 2),
+                "sql_ms_avg": round(ep["sql_ms"] / n, 2),
+                "queries_avg": round(ep["queries"] / n, 1),
+                "queries_max": ep["max_queries"],
+                "n_plus_one": [
+                    {"sql": sql, "repeats": repeats}
+                    for sql, repeats in ep["n_plus_one"].most_common(5)
+                ],
+            })
+        statements = [
+            dict(st, total_ms=round(st["total_ms"], 2), max_ms=round(st["max_ms"], 2),
+                 avg_ms=round(st["total_ms"] / st["calls"], 3))
+            for st in merged_statements.values()
+        ]
+        workers = sorted(
+            ({"pid": snap["pid"], "since": snap["since"], "updated": snap["updated"],
+              "requests": sum(ep["requests"] for ep in snap["endpoints"].values())} for snap in snapshots),
+            key=lambda w: w["pid"],
+        )
+
+        endpoints.sort(key=lambda e: e["sql_ms_total"], reverse=True)
+        statements.sort(key=lambda s: s["total_ms"], reverse=True)
+        return {
+            "since": min(w["since"] for w in workers),
+            "workers": workers,
+            "endpoints": endpoints,
+            "statements": statements[:top],
+        }
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _process_store(repeat_threshold, folder, flush_seconds):
+    """One PerfStore per process, shared by the admin and student apps."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PerfStore(repeat_threshold, folder, flush_seconds)
+        return _store
+
+
+class SqlProfiler:
+    def __init__(self, app):
+        self.logger = app.logger
+        self.slow_ms = app.config.get("PROFILE_SQL_SLOW_MS", 50.0)
+        self.store = _process_store(
+            app.config.get("PROFILE_SQL_REPEAT_THRESHOLD", 5),
+            os.path.join(app.instance_path, "sql_profile"),
+            app.config.get("PROFILE_SQL_FLUSH_SECONDS", 5.0),
+        )
+        self._explained = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, connection):
+        """Called by get_db(): wraps the connection when a request is being profiled."""
+        profile = g.get("sql_profile")
+        if profile is None:
+            return connection
+        return ProfilingConnection(connection, profile)
+
+    def check_slow(self, record, connection, params):
+        if record.ms < self.slow_ms:
+            return
+        key = normalize_sql(record.sql)
+        now = time.time()
+        with self._lock:
+            if now - self._explained.get(key, 0) < 60:
+                return
+            self._explained[key] = now
+
+        plan = ""
+        if key.lstrip().upper().startswith(_EXPLAINABLE) and params is not None:
+            try:
+                rows = connection.execute("EXPLAIN QUERY PLAN " + record.sql, params).fetchall()
+                plan = "\n".join(f"  {r[3]}" for r in rows)
+            except Exception as e:
+                plan = f"  (no plan: {e})"
+        self.logger.warning("Slow SQL %.1f ms on %s: %s\n%s", record.ms, request.endpoint, key, plan)
+
+    def start_request(self):
+        g.sql_profile = RequestProfile(self)
+
+    def finish_request(self):
+        profile = g.pop("sql_profile", None)
+        if profile is None:
+            return
+        request_ms = (time.perf_counter() - profile.started) * 1000
+        self.store.add_request(request.endpoint or request.path, request_ms, profile.records)
+
+
+def init_app(app):
+    """Installs the profiler when PROFILE_SQL is on; otherwise does nothing."""
+    if not app.config.get("PROFILE_SQL"):
+        return None
+
+    profiler = SqlProfiler(app)
+    app.extensions["sql_profiler"] = profiler
+
+    @app.before_request
+    def _start_sql_profile():
+        if request.endpoint != "static":
+            profiler.start_request()
+
+    @app.teardown_request
+    def _finish_sql_profile(exc=None):
+        profiler.finish_request()
+
+    return profiler
+
+
+def get_profiler(app):
+    return app.extensions.get("sql_profiler")
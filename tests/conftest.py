@@ -0,0 +1,71 @@
+import pytest
+
+from config import Config
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The combined app on a freshly migrated throwaway database."""
+    monkeypatch.setattr(Config, "DATABASE", str(tmp_path / "test.db"))
+    monkeypatch.setattr(Config, "AUTO_MIGRATE", True)
+    from app import create_app
+
+    app = create_app()
+    app.config.update(TESTING=True, PASSWORD_POOL_WORKERS=0, PASSWORD_HASH_METHOD="pbkdf2:sha256:1000")
+    app.instance_path = str(tmp_path / "instance")
+    yield app
+
+    from extensions import dispose_pools
+    dispose_pools()
+
+
+@pytest.fixture
+def db(app):
+    from extensions import get_db
+
+    with app.app_context():
+        yield get_db()
+
+
+@pytest.fixture
+def run_migration(db):
+    """run_migration(version): runs one migration's upgrade() again on the test database."""
+    from migrations import discover_migrations
+
+    def run(version):
+        module = next(m for v, _, m in discover_migrations() if v == version)
+        db.execute("BEGIN IMMEDIATE")
+        module.upgrade(db)
+        db.commit()
+
+    return run
+
+
+@pytest.fixture
+def make_campus(db):
+    """
+    make_campus(rooms, bunks_per_room, students): one hostel, its rooms and
+    bunks, and unhoused students. Returns {"hostel", "rooms", "bunks", "students"}
+    with bunks as a list per room.
+    """
+    def make(rooms=2, bunks_per_room=2, students=4, hostel_name="Hall A"):
+        hostel = db.execute("INSERT INTO hostels (name, created_at) VALUES (?, 0)", (hostel_name,)).lastrowid
+        room_ids, bunk_ids = [], []
+        for r in range(rooms):
+            room = db.execute("INSERT INTO rooms (hostel_id, room_number, capacity) VALUES (?, ?, ?)",
+                              (hostel, f"{hostel_name[-1]}{r + 1}", bunks_per_room)).lastrowid
+            room_ids.append(room)
+            bunk_ids.append([
+                db.execute("INSERT INTO bunks (room_id, bunk_label) VALUES (?, ?)", (room, f"B{b + 1}")).lastrowid
+                for b in range(bunks_per_room)
+            ])
+        first = db.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        student_ids = [
+            db.execute("INSERT INTO students (full_name, matric_no, email, password) VALUES (?, ?, ?, '')",
+                       (f"Student {first + i}", f"T{first + i:05d}", f"t{first + i}@test.edu")).lastrowid
+            for i in range(students)
+        ]
+        db.commit()
+        return {"hostel": hostel, "rooms": room_ids, "bunks": bunk_ids, "students": student_ids}
+
+    return make
@@ -0,0 +1,198 @@
+import pytest
+
+from models.allocation_model import (
+    book_bunks, move_students, release_students, rebuild_current_allocations, AllocationConflict,
+    BOOKING, SWAP, CANCELLATION,
+)
+
+
+def _in_transaction(db, fn):
+    """Runs fn(db) the way callers do: BEGIN IMMEDIATE, commit, roll back on error."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        result = fn(db)
+        db.commit()
+        return result
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _snapshot(db):
+    return {
+        table: [tuple(r) for r in db.execute(f"SELECT * FROM {table} ORDER BY 1")]
+        for table in ("bunks", "bookings", "allocation_ledger", "current_allocations")
+    }
+
+
+def _assert_consistent(db):
+    """bunks, active bookings and current_allocations describe the same placements."""
+    holders = {r[0]: r[1] for r in db.execute("SELECT occupied_by, id FROM bunks WHERE occupied = 1")}
+    booked = {r[0]: r[1] for r in db.execute("SELECT student_id, bunk_id FROM bookings WHERE status = 'active'")}
+    current = {r[0]: r[1] for r in db.execute("SELECT student_id, bunk_id FROM current_allocations")}
+    assert holders == booked == current
+    assert rebuild_current_allocations(fix=False) == []
+
+
+def _ledger(db, student_id):
+    return [tuple(r) for r in db.execute(
+        "SELECT action, bunk_id, from_bunk_id, source, ref_id FROM allocation_ledger WHERE student_id = ? ORDER BY id",
+        (student_id,)
+    )]
+
+
+def test_book_bunks_writes_booking_ledger_and_read_model(db, make_campus):
+    campus = make_campus()
+    s1, s2 = campus["students"][:2]
+    b1, b2 = campus["bunks"][0]
+
+    booking_ids = _in_transaction(db, lambda db: book_bunks(db, [(s1, b1, 7), (s2, b2, None)], BOOKING))
+
+    assert set(booking_ids) == {s1, s2}
+    assert _ledger(db, s1) == [("book", b1, None, BOOKING, 7)]
+    row = db.execute("SELECT * FROM current_allocations WHERE student_id = ?", (s1,)).fetchone()
+    assert (row["booking_id"], row["hostel_name"], row["room_number"], row["bunk_label"]) == \
+        (booking_ids[s1], "Hall A", "A1", "B1")
+    assert db.execute("SELECT free_bunks FROM rooms WHERE id = ?", (campus["rooms"][0],)).fetchone()[0] == 0
+    _assert_consistent(db)
+
+
+def test_book_bunks_on_a_taken_bunk_conflicts_and_writes_nothing(db, make_campus):
+    campus = make_campus()
+    s1, s2, s3 = campus["students"][:3]
+    b1, b2 = campus["bunks"][0]
+    _in_transaction(db, lambda db: book_bunks(db, [(s1, b1, None)], BOOKING))
+    before = _snapshot(db)
+
+    # s2's bunk is free, s3's is taken: the whole batch must fail
+    with pytest.raises(AllocationConflict):
+        _in_transaction(db, lambda db: book_bunks(db, [(s2, b2, None), (s3, b1, None)], BOOKING))
+
+    assert _snapshot(db) == before
+    _assert_consistent(db)
+
+
+def test_move_students_swaps_bunks_and_logs_both_moves(db, make_campus):
+    campus = make_campus()
+    s1, s2 = campus["students"][:2]
+    a, b = campus["bunks"][0][0], campus["bunks"][1][0]
+    _in_transaction(db, lambda db: book_bunks(db, [(s1, a, None), (s2, b, None)], BOOKING))
+
+    moved = _in_transaction(db, lambda db: move_students(db, [(s1, b, 11), (s2, a, 12)], SWAP))
+
+    assert moved == 2
+    assert _ledger(db, s1)[-1] == ("move", b, a, SWAP, 11)
+    assert _ledger(db, s2)[-1] == ("move", a, b, SWAP, 12)
+    room_of_s1 = db.execute("SELECT room_id, hostel_id FROM bookings WHERE student_id = ? AND status = 'active'",
+                            (s1,)).fetchone()
+    assert tuple(room_of_s1) == (campus["rooms"][1], campus["hostel"])
+    _assert_consistent(db)
+
+
+def test_move_with_a_stale_holder_conflicts_and_writes_nothing(db, make_campus):
+    campus = make_campus()
+    s1, s2 = campus["students"][:2]
+    a, spare = campus["bunks"][0]
+    _in_transaction(db, lambda db: book_bunks(db, [(s1, a, None)], BOOKING))
+    # someone else took s1's bunk behind the service's back
+    db.execute("UPDATE bunks SET occupied_by = ? WHERE id = ?", (s2, a))
+    db.commit()
+    before = _snapshot(db)
+
+    with pytest.raises(AllocationConflict):
+        _in_transaction(db, lambda db: move_students(db, [(s1, spare, None)], SWAP))
+
+    assert _snapshot(db) == before
+
+
+def test_move_of_an_unhoused_student_or_onto_a_taken_bunk_conflicts(db, make_campus):
+    campus = make_campus()
+    s1, s2, s3 = campus["students"][:3]
+    a, b = campus["bunks"][0]
+    _in_transaction(db, lambda db: book_bunks(db, [(s1, a, None), (s2, b, None)], BOOKING))
+    before = _snapshot(db)
+
+    with pytest.raises(AllocationConflict):
+        _in_transaction(db, lambda db: move_students(db, [(s3, campus["bunks"][1][0], None)], SWAP))
+    with pytest.raises(AllocationConflict):
+        _in_transaction(db, lambda db: move_students(db, [(s1, b, None)], SWAP))
+
+    assert _snapshot(db) == before
+    _assert_consistent(db)
+
+
+def test_release_students_frees_bunks_and_reports_only_holders(db, make_campus):
+    campus = make_campus()
+    s1, s2, s3 = campus["students"][:3]
+    a, b = campus["bunks"][0]
+    _in_transaction(db, lambda db: book_bunks(db, [(s1, a, None), (s2, b, None)], BOOKING))
+
+    freed = _in_transaction(db, lambda db: release_students(db, [s1, s3], CANCELLATION, refs={s1: 5}))
+
+    assert freed == {s1}
+    assert _ledger(db, s1)[-1] == ("release", a, None, CANCELLATION, 5)
+    assert _ledger(db, s3) == []
+    assert db.execute("SELECT status FROM bookings WHERE student_id = ?", (s1,)).fetchone()[0] == "cancelled"
+    assert db.execute("SELECT occupied FROM bunks WHERE id = ?", (a,)).fetchone()[0] == 0
+    _assert_consistent(db)
+
+
+def test_rebuild_current_allocations_finds_and_repairs_drift(db, make_campus):
+    campus = make_campus()
+    s1, s2, s3 = campus["students"][:3]
+    a, b = campus["bunks"][0]
+    _in_transaction(db, lambda db: book_bunks(db, [(s1, a, None), (s2, b, None)], BOOKING))
+    db.execute("UPDATE current_allocations SET bunk_label = 'wrong' WHERE student_id = ?", (s1,))
+    db.execute("DELETE FROM current_allocations WHERE student_id = ?", (s2,))
+    db.execute("""
+        INSERT INTO current_allocations (student_id, hostel_id, room_id, bunk_id)
+        VALUES (?, ?, ?, ?)
+    """, (s3, campus["hostel"], campus["rooms"][1], campus["bunks"][1][0]))
+    db.commit()
+
+    assert sorted(rebuild_current_allocations(fix=False)) == sorted([s1, s2, s3])
+    assert sorted(rebuild_current_allocations()) == sorted([s1, s2, s3])
+    _assert_consistent(db)
+
+
+def test_0013_reconciles_bunks_and_bookings(db, make_campus, run_migration):
+    campus = make_campus(rooms=3, bunks_per_room=2, students=5)
+    dup, moved, orphan_free, orphan_taken, unbooked = campus["students"]
+    (r1a, r1b), (r2a, r2b), (r3a, r3b) = campus["bunks"]
+    hostel, (room1, room2, room3) = campus["hostel"], campus["rooms"]
+
+    def hold(bunk, student):
+        db.execute("UPDATE bunks SET occupied = 1, occupied_by = ? WHERE id = ?", (student, bunk))
+
+    def book(student, room, bunk):
+        return db.execute("INSERT INTO bookings (student_id, hostel_id, room_id, bunk_id, status) "
+                          "VALUES (?, ?, ?, ?, 'active')", (student, hostel, room, bunk)).lastrowid
+
+    # holds two bunks, booked on the second: keeps the booked one
+    hold(r1a, dup)
+    hold(r1b, dup)
+    book(dup, room1, r1b)
+    # booking points at a bunk the student does not hold; holds another
+    hold(r2a, moved)
+    book(moved, room3, r3b)
+    # booking on a free bunk: the bunk is re-occupied
+    book(orphan_free, room3, r3a)
+    # booking on a bunk someone else holds: cancelled
+    taken_booking = book(orphan_taken, room2, r2a)
+    # holds a bunk without a booking: gets one
+    hold(r2b, unbooked)
+    db.execute("DELETE FROM current_allocations")
+    db.commit()
+
+    run_migration(13)
+
+    held = {r[0]: r[1] for r in db.execute("SELECT id, occupied_by FROM bunks WHERE occupied = 1")}
+    assert held == {r1b: dup, r2a: moved, r3a: orphan_free, r2b: unbooked}
+    assert db.execute("SELECT status FROM bookings WHERE id = ?", (taken_booking,)).fetchone()[0] == "cancelled"
+    booked = {r[0]: (r[1], r[2]) for r in db.execute(
+        "SELECT student_id, bunk_id, room_id FROM bookings WHERE status = 'active'")}
+    assert booked == {dup: (r1b, room1), moved: (r2a, room2), orphan_free: (r3a, room3), unbooked: (r2b, room2)}
+    assert db.execute("SELECT COUNT(*) FROM allocation_ledger WHERE source = 'backfill'").fetchone()[0] == 4
+    _assert_consistent(db)
+    free = db.execute("SELECT SUM(free_bunks) FROM rooms WHERE hostel_id = ?", (hostel,)).fetchone()[0]
+    assert free == 2
@@ -0,0 +1,50 @@
+import pytest
+
+from models.auto_allocation_model import (
+    plan_allocation, preview_allocation, run_allocation, AllocationStale, NO_MATCHING_HOSTEL,
+)
+
+
+def _hostel(hostel_id, gender, faculty=None):
+    return {"id": hostel_id, "name": f"Hall {hostel_id}", "gender": gender, "faculty": faculty}
+
+
+def test_mixed_hostel_takes_either_gender():
+    students = [(1, "male", "science", "physics"), (2, "female", "arts", "english")]
+    hostels = {10: _hostel(10, "mixed")}
+    bunks = [(10, 100, 1000, None, ""), (10, 100, 1001, None, "")]
+
+    plan = plan_allocation(students, hostels, bunks)
+
+    assert sorted(s for s, *_ in plan["assignments"]) == [1, 2]
+    assert plan["unplaced"] == {}
+
+
+def test_open_gender_spellings_are_not_a_gender():
+    students = [(1, "male", "", ""), (2, "female", "", "")]
+    for gender in ("Mixed", "any", "ALL", "", None):
+        plan = plan_allocation(students, {10: _hostel(10, gender)}, [(10, 100, 1000, None, ""), (10, 100, 1001, None, "")])
+        assert len(plan["assignments"]) == 2, gender
+
+
+def test_single_gender_hostel_still_refuses_the_other_gender():
+    students = [(1, "female", "", "")]
+    plan = plan_allocation(students, {10: _hostel(10, "male")}, [(10, 100, 1000, None, "")])
+
+    assert plan["assignments"] == []
+    assert plan["unplaced"] == {1: NO_MATCHING_HOSTEL}
+
+
+def test_changed_hostel_rule_makes_the_preview_stale(db, make_campus):
+    campus = make_campus(rooms=1, bunks_per_room=2, students=2)
+    db.execute("UPDATE hostels SET gender = 'mixed'")
+    db.execute("UPDATE students SET gender = 'female'")
+    db.commit()
+    token = preview_allocation()["token"]
+
+    db.execute("UPDATE hostels SET gender = 'male' WHERE id = ?", (campus["hostel"],))
+    db.commit()
+
+    with pytest.raises(AllocationStale):
+        run_allocation(token)
+    assert db.execute("SELECT COUNT(*) FROM bookings").fetchone()[0] == 0
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import pytest
+
+from models import login_throttle_model
+from models.login_throttle_model import throttle_login, record_login_failure, record_login_success
+
+
+@pytest.fixture
+def clock(app, monkeypatch):
+    """Fixed time for the throttle; set clock.now to move it."""
+    app.config.update(
+        LOGIN_THROTTLE_ENABLED=True, LOGIN_WINDOW_SECONDS=100, LOGIN_MAX_PER_IDENTITY=4,
+        LOGIN_MAX_PER_IP=1000, LOGIN_LOCKOUT_AFTER=3, LOGIN_LOCKOUT_BASE=10, LOGIN_LOCKOUT_MAX=35,
+    )
+    fake = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(login_throttle_model, "time", SimpleNamespace(time=lambda: fake.now))
+    return fake
+
+
+def _row(db, scope, key):
+    return db.execute("SELECT * FROM login_throttle WHERE scope = ? AND key = ?", (scope, key)).fetchone()
+
+
+def test_window_rollover_carries_a_weighted_share_of_the_last_bucket(db, clock):
+    assert [throttle_login("student", "M1", "1.2.3.4") for _ in range(4)] == [0, 0, 0, 0]
+    assert throttle_login("student", "M1", "1.2.3.4") == 100
+
+    # halfway through the next window: 1 + 5 * 0.5 attempts, then 2 + 2.5
+    clock.now = 1150.0
+    assert throttle_login("student", "M1", "1.2.3.4") == 0
+    assert throttle_login("student", "M1", "1.2.3.4") == 50
+
+    # a whole window skipped: the old bucket no longer counts
+    clock.now = 1300.0
+    assert throttle_login("student", "M1", "1.2.3.4") == 0
+    assert tuple(_row(db, "student", "m1")[k] for k in ("window_start", "hits", "prev_hits")) == (1300, 1, 0)
+
+
+def test_lockout_starts_at_the_threshold_and_doubles_up_to_the_cap(app, db, clock):
+    app.config["LOGIN_MAX_PER_IDENTITY"] = 100
+    locks = []
+    for _ in range(5):
+        throttle_login("admin", "Boss@X.edu", "1.2.3.4")
+        record_login_failure("admin", "Boss@X.edu")
+        locked_until = _row(db, "admin", "boss@x.edu")["locked_until"]
+        locks.append(locked_until - clock.now if locked_until else 0)
+
+    assert locks == [0, 0, 10, 20, 35]
+    assert throttle_login("admin", "boss@x.edu", "1.2.3.4") == 35
+    assert _row(db, "ip", "1.2.3.4")["failures"] == 0
+
+
+def test_success_clears_failures_and_lockout(app, db, clock):
+    app.config["LOGIN_MAX_PER_IDENTITY"] = 100
+    for _ in range(3):
+        throttle_login("student", "M1", "1.2.3.4")
+        record_login_failure("student", "M1")
+    assert throttle_login("student", "M1", "1.2.3.4") == 10
+
+    record_login_success("student", "m1")
+
+    row = _row(db, "student", "m1")
+    assert (row["failures"], row["locked_until"]) == (0, 0)
+    assert throttle_login("student", "M1", "1.2.3.4") == 0
@@ -0,0 +1,56 @@
+import pytest
+
+from models.notification_model import get_student_notifications_page, decode_notification_cursor
+
+
+def _feed(db, make_campus):
+    """Cancellation and swap requests for one student, most of them sharing event times."""
+    campus = make_campus(rooms=2, bunks_per_room=1, students=2)
+    student, other = campus["students"]
+    room1, room2 = campus["rooms"]
+    expected = []
+    for i in range(14):
+        # event times 300/200/100; every third row decided later than it was created
+        created, decided = 100 * (i % 3 + 1), (300 if i % 3 == 0 else None)
+        if i % 2:
+            request_id = db.execute(
+                "INSERT INTO cancellation_requests (student_id, room_id, created_at, decided_at) VALUES (?, ?, ?, ?)",
+                (student, room1, created, decided)
+            ).lastrowid
+            kind = "cancellation"
+        else:
+            request_id = db.execute(
+                "INSERT INTO room_swap_requests (student_id, current_room_id, requested_room_id, created_at, decided_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (student, room1, room2, created, decided)
+            ).lastrowid
+            kind = "swap"
+        expected.append((decided or created, kind, request_id))
+    db.execute("INSERT INTO cancellation_requests (student_id, room_id, created_at) VALUES (?, ?, 300)",
+               (other, room2))
+    db.commit()
+    return student, sorted(expected, reverse=True)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 14])
+def test_cursor_pages_across_equal_event_times_without_gaps_or_repeats(db, make_campus, limit):
+    student, expected = _feed(db, make_campus)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, next_cursor = get_student_notifications_page(student, cursor, limit=limit)
+        assert len(items) <= limit
+        seen.extend((r["event_time"], r["type"], r["request_id"]) for r in items)
+        pages += 1
+        if next_cursor is None:
+            break
+        cursor = decode_notification_cursor(next_cursor)
+
+    assert seen == expected
+    assert pages == -(-len(expected) // limit)
+
+
+def test_bad_cursors_are_rejected():
+    for cursor in ("300:booking:1", "300:swap", "x:swap:1"):
+        with pytest.raises(ValueError):
+            decode_notification_cursor(cursor)
@@ -0,0 +1,53 @@
+import sqlite3
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, request
+from werkzeug.security import check_password_hash
+from werkzeug.serving import make_server
+
+from passwords import HashPool
+
+FAST_METHOD = "pbkdf2:sha256:1000"
+
+
+def test_pool_hashes_under_a_threaded_server(tmp_path):
+    pool = HashPool(FAST_METHOD, workers=2, max_pending=8, timeout=30)
+    app = Flask(__name__)
+    db = sqlite3.connect(tmp_path / "open.db", check_same_thread=False)
+    db.execute("CREATE TABLE t (x)")
+    held = threading.Lock()
+
+    @app.route("/hash")
+    def hash_route():
+        return pool.hash(request.args["p"])
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    serving = threading.Thread(target=server.serve_forever, daemon=True)
+    serving.start()
+    # the state a gunicorn thread holds when the pool is first started
+    held.acquire()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/hash?p="
+        with ThreadPoolExecutor(8) as clients:
+            hashes = list(clients.map(lambda i: urllib.request.urlopen(url + f"pw{i}", timeout=60).read().decode(),
+                                      range(16)))
+    finally:
+        db.rollback()
+        held.release()
+        server.shutdown()
+        pool.shutdown(wait=True)
+
+    assert all(check_password_hash(h, f"pw{i}") for i, h in enumerate(hashes))
+    assert pool.stats()["pending"] == 0
+
+
+def test_pool_processes_are_not_forked_from_the_worker():
+    pool = HashPool(FAST_METHOD, workers=1, timeout=30)
+    try:
+        assert pool.verify(pool.hash("secret"), "secret") == (True, None)
+        assert pool._executor._mp_context.get_start_method() != "fork"
+    finally:
+        pool.shutdown(wait=True)
@@ -0,0 +1,95 @@
+import pytest
+
+from models.room_model import parse_layout, expand_layout_pattern, provision_hostel, LayoutError
+
+
+def _errors(report):
+    return [(e["row"], e["error"]) for e in report["errors"]]
+
+
+def _bunks(db, hostel_id):
+    rows = db.execute("""
+        SELECT r.room_number, r.capacity, k.bunk_label
+        FROM rooms r LEFT JOIN bunks k ON k.room_id = r.id
+        WHERE r.hostel_id = ? ORDER BY r.room_number, k.bunk_label
+    """, (hostel_id,))
+    rooms = {}
+    for r in rows:
+        rooms.setdefault(r["room_number"], (r["capacity"], []))[1].append(r["bunk_label"])
+    return rooms
+
+
+def test_pattern_expands_blocks_floors_and_rooms():
+    layout = expand_layout_pattern("blocks A-B, floors 1-2; rooms 01-03, bunks A/B")
+
+    assert len(layout) == 12
+    assert [r["room_number"] for r in layout[:4]] == ["A101", "A102", "A103", "A201"]
+    assert layout[0]["capacity"] == "2" and layout[0]["bunks"] == ["A", "B"]
+
+
+@pytest.mark.parametrize("pattern", ["rooms 10-01", "floors 1-2", "rooms 1-3, wings A-B", "rooms A-10"])
+def test_bad_patterns_are_layout_errors(pattern):
+    with pytest.raises(LayoutError):
+        expand_layout_pattern(pattern)
+
+
+def test_malformed_csv_rows_are_reported_per_row(db, make_campus):
+    hostel = make_campus(rooms=0, students=0)["hostel"]
+    layout = parse_layout(
+        "\ufeffRoom_Number,Capacity,Bunks\n"
+        "101,2,\n"
+        ",2,\n"
+        "102,0,\n"
+        "103,two,\n"
+        "104,2,A/B/C\n"
+        "105,3,A/A\n"
+        "101,2,\n"
+        "106,3,X Y\n",
+        "rooms.csv",
+    )
+
+    report = provision_hostel(hostel, layout)
+
+    assert _errors(report) == [
+        (2, "room_number is required"),
+        (3, "capacity must be a positive whole number"),
+        (4, "capacity must be a positive whole number"),
+        (5, "3 bunks exceed capacity 2"),
+        (6, "duplicate bunk labels"),
+        (7, "room_number repeated in layout"),
+    ]
+    assert (report["rooms_created"], report["bunks_created"]) == (2, 4)
+    assert _bunks(db, hostel) == {"101": (2, ["A", "B"]), "106": (3, ["X", "Y"])}
+
+
+def test_json_rows_that_are_not_objects_are_row_errors(db, make_campus):
+    hostel = make_campus(rooms=0, students=0)["hostel"]
+    layout = parse_layout('{"rooms": [{"room_number": "G1", "capacity": 1}, "G2", 7]}')
+
+    report = provision_hostel(hostel, layout)
+
+    assert _errors(report) == [(2, "room_number is required"), (3, "room_number is required")]
+    assert _bunks(db, hostel) == {"G1": (1, ["A"])}
+
+
+def test_existing_rooms_keep_their_capacity(db, make_campus):
+    hostel = make_campus(rooms=0, students=0)["hostel"]
+    provision_hostel(hostel, parse_layout("room_number,capacity,bunks\n1,3,A/B\n2,2,\n"))
+
+    # room 1 has room for one more bunk, not two; room 2 is unchanged
+    report = provision_hostel(hostel, parse_layout("room_number,capacity,bunks\n1,4,A/B/C/D\n2,2,\n"))
+    assert _errors(report) == [(1, "existing room has 2 of 3 bunks; cannot add 2 more")]
+    assert report["rooms_skipped"] == 1
+
+    report = provision_hostel(hostel, parse_layout("room_number,capacity,bunks\n1,4,A/B/C\n"))
+    assert (report["errors"], report["bunks_created"]) == ([], 1)
+    assert _bunks(db, hostel) == {"1": (3, ["A", "B", "C"]), "2": (2, ["A", "B"])}
+
+
+def test_dry_run_reports_without_writing(db, make_campus):
+    hostel = make_campus(rooms=0, students=0)["hostel"]
+
+    report = provision_hostel(hostel, expand_layout_pattern("rooms 1-5, capacity 4"), dry_run=True)
+
+    assert (report["rooms_created"], report["bunks_created"]) == (5, 20)
+    assert _bunks(db, hostel) == {}
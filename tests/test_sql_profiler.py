@@ -0,0 +1,80 @@
+import json
+import os
+
+from sql_profiler import PerfStore, _Record
+
+
+def _records(*statements):
+    """(sql, ms, rows) tuples as profiler records."""
+    records = []
+    for sql, ms, rows in statements:
+        r = _Record(sql)
+        r.ms, r.rows = ms, rows
+        records.append(r)
+    return records
+
+
+def _store(folder):
+    return PerfStore(repeat_threshold=3, folder=str(folder), flush_seconds=3600)
+
+
+def _write_worker(folder, pid, store, since=None):
+    """Drops store's figures into folder as if worker pid had flushed them."""
+    snap = dict(store.snapshot(), pid=pid)
+    if since is not None:
+        snap["since"] = since
+    with open(os.path.join(folder, f"{pid}.json"), "w") as f:
+        json.dump(snap, f)
+
+
+def test_report_merges_every_workers_flush(tmp_path):
+    own = _store(tmp_path)
+    own.add_request("rooms", 10.0, _records(("SELECT * FROM rooms WHERE id = 1", 2.0, 1)))
+
+    other = PerfStore(repeat_threshold=3)
+    other.add_request("rooms", 30.0, _records(*[(f"SELECT * FROM bunks WHERE room_id = {i}", 1.0, 2) for i in range(4)]))
+    other.add_request("rooms", 5.0, _records(("SELECT * FROM rooms WHERE id = 2", 4.0, 1)))
+    _write_worker(str(tmp_path), 999001, other)
+    # a file left from before the last reset, and one caught mid-write, are skipped
+    _write_worker(str(tmp_path), 999002, other, since=own.since - 60)
+    (tmp_path / "999003.json").write_text('{"pid": 999')
+
+    report = own.report()
+
+    assert [w["pid"] for w in report["workers"]] == sorted([os.getpid(), 999001])
+    (rooms,) = report["endpoints"]
+    assert (rooms["requests"], rooms["request_ms_max"], rooms["queries_max"]) == (3, 30.0, 4)
+    assert rooms["sql_ms_total"] == 10.0
+    assert rooms["n_plus_one"] == [{"sql": "SELECT * FROM bunks WHERE room_id = ?", "repeats": 4}]
+    statements = {s["sql"]: s for s in report["statements"]}
+    assert statements["SELECT * FROM rooms WHERE id = ?"]["calls"] == 2
+    assert statements["SELECT * FROM rooms WHERE id = ?"]["max_ms"] == 4.0
+    assert statements["SELECT * FROM bunks WHERE room_id = ?"]["rows"] == 8
+
+
+def test_flush_writes_this_workers_file(tmp_path):
+    store = _store(tmp_path)
+    store.add_request("home", 3.0, _records(("SELECT 1", 0.5, 1)))
+
+    store.flush()
+
+    with open(tmp_path / f"{os.getpid()}.json") as f:
+        assert json.load(f)["endpoints"]["home"]["requests"] == 1
+
+
+def test_reset_clears_every_worker(tmp_path):
+    admin = _store(tmp_path)
+    worker = _store(tmp_path)
+    worker.add_request("home", 3.0, _records(("SELECT 1", 0.5, 1)))
+    worker.flush()
+    _write_worker(str(tmp_path), 999001, worker)
+
+    admin.reset()
+    marker = tmp_path / "reset"
+    os.utime(marker, (worker.since + 1, worker.since + 1))
+
+    assert sorted(os.listdir(tmp_path)) == ["reset"]
+    assert admin.report()["endpoints"] == []
+    # the other worker drops its figures at its next flush
+    worker.flush()
+    assert worker.snapshot()["endpoints"] == {}
@@ -0,0 +1,74 @@
+import io
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from models.student_import_model import import_students_csv, enqueue_import, purge_import_reports, _report_path
+from models.student_model import create_student
+
+
+def _import(text):
+    report = io.StringIO()
+    with ThreadPoolExecutor(1) as pool:
+        summary = import_students_csv(io.StringIO(text), report, pool=pool)
+    return summary, report.getvalue().splitlines()
+
+
+def test_email_differing_only_in_case_is_a_duplicate(db):
+    db.execute("INSERT INTO students (full_name, matric_no, email, password) VALUES ('Old', 'M0', 'Foo@X.edu', '')")
+    db.commit()
+
+    summary, report = _import("full_name,matric_no,email,password\nNew,M1,foo@x.edu,secret99\n")
+
+    assert (summary["created"], summary["duplicates"]) == (0, 1)
+    assert "email already exists" in report[1]
+    assert db.execute("SELECT COUNT(*) FROM students WHERE lower(email) = 'foo@x.edu'").fetchone()[0] == 1
+
+
+def test_imported_emails_are_lowercased(db):
+    summary, _ = _import("full_name,matric_no,email,password\nNew,M1,New.Person@X.EDU,secret99\n")
+
+    assert summary["created"] == 1
+    assert db.execute("SELECT email FROM students WHERE matric_no = 'M1'").fetchone()[0] == "new.person@x.edu"
+
+
+def test_create_student_lowercases_and_case_duplicates_are_refused(db):
+    create_student("M1", "One", " Mixed@Case.EDU ", "secret99")
+
+    assert db.execute("SELECT email FROM students WHERE matric_no = 'M1'").fetchone()[0] == "mixed@case.edu"
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute("INSERT INTO students (full_name, matric_no, email, password) VALUES ('Two', 'M2', 'MIXED@case.edu', '')")
+
+
+def test_migration_lowercases_and_tags_case_duplicates(db, run_migration):
+    db.execute("DROP INDEX uq_students_email_lower")
+    ids = [
+        db.execute("INSERT INTO students (full_name, matric_no, email, password) VALUES (?, ?, ?, '')",
+                   (f"S{i}", f"M{i}", email)).lastrowid
+        for i, email in enumerate(["Ann@X.edu", "ann@x.EDU", "Bob@Y.edu", "no-at-sign"])
+    ]
+    db.commit()
+
+    run_migration(15)
+
+    emails = [db.execute("SELECT email FROM students WHERE id = ?", (i,)).fetchone()[0] for i in ids]
+    assert emails == ["ann@x.edu", f"ann+duplicate-{ids[1]}@x.edu", "bob@y.edu", "no-at-sign"]
+    with pytest.raises(sqlite3.IntegrityError):
+        db.execute("INSERT INTO students (full_name, matric_no, email, password) VALUES ('C', 'M9', 'BOB@y.edu', '')")
+
+
+def test_purge_removes_expired_and_legacy_reports(app, db):
+    legacy = os.path.join(app.instance_path, "import_reports")
+    os.makedirs(legacy)
+    open(os.path.join(legacy, "old.csv"), "w").close()
+    token = enqueue_import(io.BytesIO(b"full_name,matric_no,email\n"), "s.csv")
+    open(_report_path(token), "w").close()
+    db.execute("UPDATE student_import_jobs SET status = 'done', report_expires_at = ?", (int(time.time()) - 1,))
+    db.commit()
+
+    assert purge_import_reports() == 1
+    assert not os.path.exists(legacy)
+    assert not os.path.exists(_report_path(token))
@@ -0,0 +1,24 @@
+import pytest
+
+from routes.student import student_routes
+
+
+def _stream(client, hostel_id):
+    with client.session_transaction() as sess:
+        sess["student_id"] = 1
+    return client.get(f"/student/api/hostels/{hostel_id}/availability/stream")
+
+
+def test_stream_slot_is_released_when_building_the_stream_fails(app, monkeypatch):
+    app.config.update(SSE_MAX_STREAMS=1)
+
+    def broken(generator):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(student_routes, "stream_with_context", broken)
+    client = app.test_client()
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            _stream(client, 1)
+
+    assert student_routes._open_streams == 0
@@ -0,0 +1,83 @@
+from models.allocation_model import book_bunks, BOOKING
+from models.swap_cycle_model import SwapEdge, find_swap_cycles, execute_swap_cycles, load_swap_edges
+
+
+def _edge(request_id, from_room, to_room, bunk_id=None, requested_bunk_id=None):
+    return SwapEdge(request_id, request_id, from_room, to_room, bunk_id or 100 + request_id, requested_bunk_id)
+
+
+def _ids(cycles):
+    return [[e.request_id for e in cycle] for cycle in cycles]
+
+
+def test_two_cycle():
+    assert _ids(find_swap_cycles([_edge(1, "A", "B"), _edge(2, "B", "A")])) == [[1, 2]]
+
+
+def test_three_cycle():
+    edges = [_edge(1, "A", "B"), _edge(2, "B", "C"), _edge(3, "C", "A")]
+    assert _ids(find_swap_cycles(edges)) == [[1, 2, 3]]
+
+
+def test_dead_end_is_skipped_and_the_room_still_cycles():
+    # 1 walks into D, which nobody leaves; 2 then closes A->C->A
+    edges = [_edge(1, "A", "D"), _edge(2, "A", "C"), _edge(3, "C", "A"), _edge(4, "E", "F")]
+    assert _ids(find_swap_cycles(edges)) == [[2, 3]]
+
+
+def test_room_with_several_leavers_prefers_the_wanted_bunk():
+    # 1 asked for bunk 203, held by 3 (the newer request out of B)
+    edges = [
+        _edge(1, "A", "B", requested_bunk_id=203),
+        _edge(2, "B", "A", bunk_id=202),
+        _edge(3, "B", "A", bunk_id=203),
+    ]
+    assert _ids(find_swap_cycles(edges)) == [[1, 3]]
+
+
+def test_every_request_is_used_at_most_once():
+    edges = [_edge(i, "A", "B") for i in range(1, 4)] + [_edge(i, "B", "A") for i in range(4, 6)]
+    cycles = find_swap_cycles(edges)
+    used = [r for c in _ids(cycles) for r in c]
+    assert len(cycles) == 2 and len(used) == len(set(used))
+
+
+def _request(db, student_id, current_room, requested_room, requested_bunk):
+    request_id = db.execute(
+        "INSERT INTO room_swap_requests (student_id, current_room_id, requested_room_id) VALUES (?, ?, ?)",
+        (student_id, current_room, requested_room)
+    ).lastrowid
+    db.execute("INSERT INTO room_swap_details (swap_request_id, requested_bunk_id) VALUES (?, ?)",
+               (request_id, requested_bunk))
+    return request_id
+
+
+def test_stale_cycle_rolls_back_to_its_savepoint(db, make_campus):
+    campus = make_campus(rooms=2, bunks_per_room=2, students=4)
+    s1, s2, s3, s4 = campus["students"]
+    room1, room2 = campus["rooms"]
+    (a, b), (c, d) = campus["bunks"]
+    db.execute("BEGIN IMMEDIATE")
+    book_bunks(db, [(s1, a, None), (s2, c, None), (s3, b, None), (s4, d, None)], BOOKING)
+    db.commit()
+    stale_request = _request(db, s1, room1, room2, c)
+    _request(db, s2, room2, room1, a)
+    _request(db, s3, room1, room2, d)
+    _request(db, s4, room2, room1, b)
+    db.commit()
+
+    cycles = find_swap_cycles(load_swap_edges(db))
+    assert sorted(sorted(e.student_id for e in cycle) for cycle in cycles) == [[s1, s2], [s3, s4]]
+    # decided by an admin after planning: that cycle's moves must be undone
+    db.execute("UPDATE room_swap_requests SET status = 'rejected' WHERE id = ?", (stale_request,))
+    db.commit()
+
+    executed, stale = execute_swap_cycles(cycles)
+
+    assert [sorted(e.student_id for e in cyc) for cyc in stale] == [[s1, s2]]
+    assert len(executed) == 1
+    holders = {r[0]: r[1] for r in db.execute("SELECT occupied_by, id FROM bunks WHERE occupied = 1")}
+    assert holders == {s1: a, s2: c, s3: d, s4: b}
+    assert db.execute("SELECT COUNT(*) FROM allocation_ledger WHERE action = 'move'").fetchone()[0] == 2
+    statuses = [r[0] for r in db.execute("SELECT status FROM room_swap_requests ORDER BY id")]
+    assert statuses == ["rejected", "pending", "approved", "approved"]
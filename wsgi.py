@@ -1 +1,16 @@
-# render / gunicorn entry point
\ No newline at end of file
+# render / gunicorn entry point: `gunicorn wsgi:app` (settings in gunicorn.conf.py)
+#
+# APP_MODE=admin or APP_MODE=student serves one side, so each side can run
+# as its own service with its own WEB_CONCURRENCY; APP_MODE=all (default)
+# serves both from one service, dispatched by host (ADMIN_HOST/STUDENT_HOST).
+import os
+
+from app import create_admin_app, create_student_app, create_host_dispatcher
+
+mode = os.getenv("APP_MODE", "all")
+if mode == "admin":
+    app = create_admin_app()
+elif mode == "student":
+    app = create_student_app()
+else:
+    app = create_host_dispatcher()